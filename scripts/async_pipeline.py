@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+异步流水线模式（python scripts/generate_digest.py --async）
+- 生产者：所有数据源并发抓取，条目写入有界队列（队列满时抓取线程阻塞，形成背压）
+- 分批器：某个板块的所有供稿数据源都抓取结束后，对整个板块打分取前 BATCH_SIZE 条发给 LLM
+  （不是先到先得，慢数据源的高分条目同样参与排名）
+- 写入器：LLM 结果到达即并入译文表，全部完成后合并、分析、写出，再记录增量水位
+总耗时接近 max(采集, LLM) 而不是两者之和。任一环节出错时抓取线程不再入队，不会卡死。
+
+与同步模式的差别：打分筛选按板块进行（全局上限和预算降级都按发送顺序扣减），不做全局排序；
+只生成主日报，不生成 DIGEST_EDITIONS 中的额外版本。
+检查点只保存采集结果：LLM 阶段中途失败后重跑时改用同步模式，从采集检查点继续
+（已发送的批次会重新翻译）。
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+from collections import defaultdict
+
+from profiling import profiler
+from scoring import EngagementScorer, select_top
+from topics import MAIN
+
+QUEUE_SIZE = 200
+BATCH_SIZE = 15  # 与同步模式一致，同时也是每个板块的条目上限
+
+
+class AsyncDigestPipeline:
+    def __init__(self, generator):
+        self.gen = generator
+        self.local = threading.local()
+        self.loop = None
+        self.items_q = None
+        self.stop = threading.Event()   # 出错后抓取线程不再入队
+        self.ckpt = None
+
+    def run(self):
+        gen = self.gen
+        if not gen.siliconflow_key:
+            # 没有 LLM 可并行，直接走同步流程（会写出错误提示）
+            return gen.run()
+        self.ckpt = gen.checkpoints()
+        if self.ckpt.has("collect"):
+            print("  ↪️ 异步模式不能从检查点继续，改用同步模式")
+            return gen.run()
+        return asyncio.run(self._run())
+
+    async def _run(self):
+        gen = self.gen
+        print("=" * 50)
+        print(f"🚀 AI 资讯聚合器（异步模式）- {gen.today_str}")
+        print("=" * 50)
+        gen.print_status()
+        if gen.editions:
+            print("⚠️ 异步模式只生成主日报，额外版本请用同步模式")
+
+        from openai import OpenAI
+        client = OpenAI(
+            api_key=gen.siliconflow_key,
+            base_url="https://api.siliconflow.cn/v1"
+        )
+
+        self.loop = asyncio.get_running_loop()
+        self.items_q = asyncio.Queue(maxsize=QUEUE_SIZE)
+        results_q = asyncio.Queue()
+        scorer = EngagementScorer(gen.state_dir)
+        gen.item_sink = self._sink
+
+        producer = asyncio.create_task(self.produce())
+        batcher = asyncio.create_task(self.batch(results_q, client, scorer))
+        writer = asyncio.create_task(self.write(results_q))
+        try:
+            await asyncio.gather(producer, batcher)
+            await results_q.put(None)
+            selected, translations = await writer
+        except BaseException:
+            # 放行阻塞在队列上的抓取线程（之后的条目直接丢弃），再取消其余任务
+            self.stop.set()
+            while not self.items_q.empty():
+                self.items_q.get_nowait()
+            for task in (producer, batcher, writer):
+                task.cancel()
+            raise
+        finally:
+            gen.item_sink = None
+        # 分批打分不更新基线，采集结束后用全量条目更新一次（与同步模式一致）
+        scorer.score(gen.all_items, update=True)
+        scorer.save()
+
+        print(f"\n📦 共采集 {len(gen.all_items)} 条，发送 {len(selected)} 条")
+        if not selected:
+            print("\n⚠️ 没有数据")
+            return None
+
+        result = await asyncio.to_thread(gen.merge, client, selected, translations)
+        result["usage"] = gen.governor.summary()
+        gen.write_output(result)
+        gen.commit_run(self.ckpt)
+
+        print("\n" + "=" * 50)
+        print("✨ 完成!")
+        return result
+
+    # ---------- 生产者 ----------
+
+    def _sink(self, item):
+        """在抓取线程中调用：记录板块并把条目放入队列（队列满则阻塞）"""
+        if self.stop.is_set():
+            return
+        sections = getattr(self.local, "sections", None)
+        if sections is not None:
+            sections.add(item.section)
+        source = getattr(self.local, "source", None)
+        asyncio.run_coroutine_threadsafe(self.items_q.put(("item", (source, item))), self.loop).result()
+
+    def _fetch(self, name, func):
+        self.local.sections = set()
+        self.local.source = name
+        try:
+            self.gen.safe_fetch(name, func)
+            return self.local.sections
+        finally:
+            self.local.sections = self.local.source = None
+
+    async def produce(self):
+        gen = self.gen
+        gen.collect_started = datetime.now(timezone.utc)
+        gen.health.start_budget(gen.collect_budget)
+
+        async def one(name, func):
+            sections = await asyncio.to_thread(self._fetch, name, func)
+            await self.items_q.put(("flush", (name, sections)))
+
+        await asyncio.gather(*(one(name, func) for name, func in gen.sources()))
+        gen.report_health()
+        gen.health.start_budget(0)
+        self.ckpt.save("collect", [it.to_record() for it in gen.all_items])
+        await self.items_q.put(("done", None))
+
+    # ---------- 分批器 ----------
+
+    async def batch(self, results_q, client, scorer):
+        """
+        板块条目一直缓存到为它供稿的数据源全部抓取结束，再对整个板块打分取前 BATCH_SIZE 条；
+        板块发送后才有新数据源供稿时，新条目按剩余名额另发一批
+        """
+        gen = self.gen
+        buffers = defaultdict(list)
+        feeding = defaultdict(set)   # 板块 → 已为它供稿、还没抓取结束的数据源
+        sent = defaultdict(int)      # 板块 → 已发送条数
+        tasks = []
+        sem = asyncio.Semaphore(gen.llm_concurrency)
+        budget = [gen.max_llm_items]
+
+        def dispatch(section):
+            items = buffers.pop(section, [])
+            quota = min(BATCH_SIZE - sent[section], budget[0])
+            if not items or quota <= 0:
+                return
+            scores = scorer.score(items)
+            gen.item_scores.update({it.id: round(float(sc), 6) for it, sc in zip(items, scores)})
+            # 与同步模式相同：预算紧张时减少送翻译的条数（剩余额度已扣除进行中批次的预留）
+            chosen = gen.fit_budget({MAIN.key: select_top(items, scores, per_section=quota)})[MAIN.key]
+            if not chosen:
+                return
+            sent[section] += len(chosen)
+            budget[0] -= len(chosen)
+            tasks.append(asyncio.create_task(self.translate(client, chosen, sem, results_q)))
+
+        while True:
+            kind, payload = await self.items_q.get()
+            if kind == "item":
+                source, item = payload
+                if gen.editions and not MAIN.accepts(item):
+                    continue  # 搜索词被专题放宽后抓到的非 AI 条目
+                buffers[item.section].append(item)
+                feeding[item.section].add(source)
+            elif kind == "flush":
+                source, sections = payload
+                for section in sections:
+                    feeding[section].discard(source)
+                    if not feeding[section]:
+                        dispatch(section)
+            else:
+                for section in list(buffers):
+                    dispatch(section)
+                break
+
+        await asyncio.gather(*tasks)
+        gen.save_enrichment()
+
+    async def translate(self, client, batch, sem, results_q):
+        async with sem:
+            try:
+                await asyncio.to_thread(self.gen.enrich, batch)
+                translate = profiler.wrap(f"llm:{batch[0].section}", self.gen.translate_batch)
+                result = await asyncio.to_thread(translate, client, batch)
+                print(f"  🔄 {batch[0].section}: {len(batch)} 条翻译完成")
+            except Exception as e:
+                print(f"  ❌ {batch[0].section} 批次请求失败: {e}")
+                result = {}
+        await results_q.put((batch, result))
+
+    # ---------- 写入器 ----------
+
+    async def write(self, results_q):
+        selected, translations = [], {}
+        while True:
+            entry = await results_q.get()
+            if entry is None:
+                return selected, translations
+            batch, result = entry
+            selected.extend(batch)
+            translations.update(result)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+本地语义分类（不调用 LLM、无需 GPU/网络）
+- 文本 → 哈希 n-gram TF-IDF 向量（中文字 bigram + 英文词 unigram/bigram）
+- 固定分类体系，每类一个质心，最近质心即分类
+- 质心从 data/digest_*.json 历史存档学习，增量吸收新的存档文件
+- 仅新闻类板块需要按话题分类，其余板块（GitHub、HuggingFace…）分类即板块名
+"""
+
+import json
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+DIM = 1 << 14
+
+# 需要按话题细分的板块；其他板块直接用板块名作为分类
+TOPIC_SECTIONS = {"新闻", "Twitter热点"}
+
+# 历史文件中不是话题的分类名（板块名、兜底分类）
+NON_TOPIC_CATEGORIES = {
+    "新闻", "油管博主", "YouTube热点", "Twitter热点", "明星公司动态", "TikTok热点",
+    "GitHub热门", "GitHub今日热门", "GitHub本周热门", "AI Agent热门", "MCP工具热门",
+    "AI Skills热门", "HuggingFace热门", "ModelScope热门", "原始数据",
+}
+
+# 固定分类体系：名称 → 种子关键词（中英混合，翻译失败的英文条目也能分）
+TAXONOMY = {
+    "模型与产品发布": "模型 发布 推出 新功能 产品 升级 版本 大模型 聊天机器人 GPT Gemini Claude Llama model launch release feature update chatbot",
+    "研究与技术突破": "研究 论文 技术 突破 算法 训练 推理 科学 实验室 基准 research paper breakthrough benchmark algorithm training reasoning",
+    "商业与投融资": "融资 投资 收购 估值 营收 市场 公司 股价 上市 交易 funding investment acquisition valuation revenue startup IPO deal market",
+    "政策与监管": "政府 政策 监管 法律 法案 诉讼 版权 国会 禁令 法院 policy regulation law lawsuit court government ban copyright congress",
+    "芯片与算力": "芯片 英伟达 算力 数据中心 半导体 硬件 能源 电力 GPU chip Nvidia datacenter semiconductor hardware compute energy",
+    "社会与伦理": "就业 伦理 安全 隐私 教育 儿童 社会 风险 争议 工作 jobs ethics safety privacy education children society risk",
+    "行业应用": "应用 医疗 汽车 自动驾驶 金融 机器人 企业 办公 场景 healthcare robotics autonomous driving enterprise application finance",
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CJK = re.compile(r"[一-鿿]+")
+
+
+def tokens(text):
+    text = (text or "").lower()
+    words = _WORD.findall(text)
+    out = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for run in _CJK.findall(text):
+        out.extend(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+    return out
+
+
+def hashed_counts(texts):
+    """文本列表 → 词频矩阵 (n, DIM)"""
+    m = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        idx = [zlib.crc32(t.encode("utf-8")) % DIM for t in tokens(text)]
+        if idx:
+            m[row] = np.bincount(idx, minlength=DIM)
+    return m
+
+
+def _normalize(m):
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.where(norms == 0, 1, norms)
+
+
+class CategoryIndex:
+    def __init__(self, data_dir, state_dir):
+        self.data_dir = Path(data_dir)
+        self.index_file = Path(state_dir) / "category_index.npz"
+        self.names = list(TAXONOMY)
+        self.sums = None      # (类数, DIM) 已归一化向量之和
+        self.counts = None    # (类数,)
+        self.df = None        # (DIM,) 文档频率
+        self.n_docs = 0
+        self.seen_files = set()
+
+    # ---------- 向量化 ----------
+
+    def idf(self):
+        return np.log((self.n_docs + 1) / (self.df + 1)) + 1
+
+    def vectors(self, texts):
+        return _normalize(np.log1p(hashed_counts(texts)) * self.idf())
+
+    # ---------- 学习 ----------
+
+    def load_or_build(self):
+        """读取索引并吸收新的存档文件"""
+        if self.index_file.exists():
+            z = np.load(self.index_file, allow_pickle=False)
+            if list(z["names"]) == self.names:
+                self.sums, self.counts, self.df = z["sums"], z["counts"], z["df"]
+                self.n_docs = int(z["n_docs"])
+                self.seen_files = set(z["seen_files"].tolist())
+        if self.sums is None:
+            self.sums = np.zeros((len(self.names), DIM), dtype=np.float32)
+            self.counts = np.zeros(len(self.names), dtype=np.float32)
+            self.df = np.zeros(DIM, dtype=np.float32)
+
+        new_files = sorted(
+            f for f in self.data_dir.glob("digest_*.json") if f.name not in self.seen_files
+        )
+        if new_files:
+            self.learn_archive(new_files)
+            self.save()
+        return self
+
+    def learn_archive(self, files):
+        """历史文件中 LLM 起的分类名映射到最近的固定分类，条目计入该类质心"""
+        texts, labels = [], []
+        seed_vecs = None
+        for f in files:
+            try:
+                data = json.loads(f.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if data.get("error"):
+                continue  # 错误占位（之后成功重跑会覆盖），先不标记为已学习
+            self.seen_files.add(f.name)
+            for cat, items in data.get("categories", {}).items():
+                if cat in NON_TOPIC_CATEGORIES:
+                    continue
+                # 旧文件没有 板块 字段：带 额外 的是 GitHub/HuggingFace 等结构化来源
+                topic_items = [
+                    it for it in items
+                    if isinstance(it, dict) and not it.get("额外")
+                    and it.get("板块", "新闻") in TOPIC_SECTIONS
+                ]
+                if not topic_items:
+                    continue
+                if cat in self.names:
+                    label = self.names.index(cat)
+                else:
+                    if seed_vecs is None:
+                        seed_vecs = _normalize(hashed_counts(list(TAXONOMY.values())))
+                    name_vec = _normalize(hashed_counts([cat]))
+                    if not name_vec.any():
+                        continue
+                    sims = name_vec @ seed_vecs.T
+                    if sims.max() <= 0:
+                        continue  # 分类名和任何种子都不沾边（如"娱乐与文化"），不作为监督信号
+                    label = int(sims.argmax())
+                for it in topic_items:
+                    texts.append(f"{it.get('标题', '')} {it.get('内容', '')}")
+                    labels.append(label)
+
+        if not texts:
+            return
+        counts = hashed_counts(texts)
+        self.df += (counts > 0).sum(axis=0)
+        self.n_docs += len(texts)
+        vecs = self.vectors(texts)
+        np.add.at(self.sums, np.array(labels), vecs)
+        np.add.at(self.counts, np.array(labels), 1)
+
+    def save(self):
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            self.index_file,
+            names=np.array(self.names),
+            sums=self.sums,
+            counts=self.counts,
+            df=self.df,
+            n_docs=np.array(self.n_docs),
+            seen_files=np.array(sorted(self.seen_files), dtype=str),
+        )
+
+    # ---------- 分类 ----------
+
+    def centroids(self):
+        """质心 = 种子向量 + 已学习条目向量之和（保证空类也有方向）"""
+        seeds = self.vectors(list(TAXONOMY.values()))
+        return _normalize(seeds + self.sums)
+
+    def classify(self, texts):
+        """返回每条文本的分类名"""
+        if not texts:
+            return []
+        sims = self.vectors(texts) @ self.centroids().T
+        return [self.names[i] for i in sims.argmax(axis=1)]
+
+    def categorize(self, sections, texts):
+        """新闻类板块按话题分类，其他板块分类即板块名"""
+        need = [i for i, sec in enumerate(sections) if sec in TOPIC_SECTIONS]
+        result = list(sections)
+        for i, name in zip(need, self.classify([texts[i] for i in need])):
+            result[i] = name
+        return result
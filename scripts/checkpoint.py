@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+流水线检查点：每个阶段的产出保存在 data/.checkpoints/<日期>/，
+同一天重跑时从最后完成的阶段/批次继续
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+from state import atomic_write
+
+
+class CheckpointStore:
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, stage):
+        return self.root / f"{stage}.json"
+
+    def has(self, stage):
+        return self._path(stage).exists()
+
+    def load(self, stage):
+        return json.loads(self._path(stage).read_text(encoding="utf-8"))
+
+    def save(self, stage, data):
+        """原子写入（见 state.atomic_write），中途被杀或断电也不会留下半个检查点"""
+        atomic_write(self._path(stage), json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def stages(self):
+        return sorted(p.stem for p in self.root.glob("*.json")) if self.root.exists() else []
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
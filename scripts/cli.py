@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+统一命令行入口（重模块只在需要的子命令里导入）
+
+    python scripts/cli.py run [--fresh] [--async]   完整流程（采集 + AI 处理）
+    python scripts/cli.py collect [--fresh]         只采集，写入今日检查点
+    python scripts/cli.py process                   从今日检查点继续 AI 处理并写出
+    python scripts/cli.py update                    日内增量更新（只处理新条目并入今日日报）
+    python scripts/cli.py render [--date YYYY-MM-DD] [--edition KEY]
+                                                    渲染 latest.json 或指定日期（可指定额外版本）
+    python scripts/cli.py rebuild                   从存档重新生成所有页面
+    python scripts/cli.py rollup [--all]            更新周报/月报（--all 重算所有存档周期）
+    python scripts/cli.py stats                     存档统计
+    python scripts/cli.py health                    数据源健康表（成功率、延迟分位数、熔断状态）
+    python scripts/cli.py profile-diff A B          对比两次性能剖析结果
+
+加 --timing 打印耗时：启动（导入 cli 到子命令开始）与总计（含子命令自身的导入和执行）。
+加 --profile 分阶段剖析子命令（cProfile + tracemalloc），结果写入 data/profiles/。
+轻量子命令（render/stats）总耗时超过 STARTUP_BUDGET_MS 时给出警告。
+"""
+
+import time
+
+_T0 = time.perf_counter()
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+STARTUP_BUDGET_MS = 100
+LIGHT_COMMANDS = {"render", "stats"}
+
+
+def cmd_run(args):
+    from generate_digest import AIDigestGenerator
+    generator = AIDigestGenerator()
+    if args.use_async:
+        from async_pipeline import AsyncDigestPipeline
+        AsyncDigestPipeline(generator).run()
+    else:
+        generator.run(fresh=args.fresh)
+
+
+def cmd_collect(args):
+    from generate_digest import AIDigestGenerator
+    generator = AIDigestGenerator()
+    generator.print_status()
+    generator.collect_stage(generator.checkpoints(fresh=args.fresh))
+
+
+def cmd_process(args):
+    from generate_digest import AIDigestGenerator
+    generator = AIDigestGenerator()
+    ckpt = generator.checkpoints()
+    if not ckpt.has("collect"):
+        print("❌ 今日还没有采集数据，请先运行 collect")
+        return 1
+    generator.collect_stage(ckpt)
+    generator.process_stage(ckpt)
+
+
+def cmd_update(args):
+    from generate_digest import AIDigestGenerator
+    AIDigestGenerator().run_incremental()
+
+
+def cmd_render(args):
+    from digest_io import latest_path
+    from generate_html import render_file
+    data_dir, docs_dir = Path("data"), Path("docs")
+    if args.edition:
+        data_dir, docs_dir = data_dir / args.edition, docs_dir / args.edition
+    if args.date:
+        data_file = data_dir / f"digest_{args.date}.json"
+        index = False
+    else:
+        data_file = latest_path(data_dir) or data_dir / "latest.json"
+        index = True
+    if not data_file.exists():
+        print(f"❌ 没有数据文件: {data_file}")
+        return 1
+    out = render_file(data_file, docs_dir, index=index, site_dir=Path("docs"))
+    print(f"✅ HTML 生成完成: {out}")
+
+
+def cmd_rebuild(args):
+    from generate_html import rebuild
+    rebuild()
+
+
+def cmd_rollup(args):
+    from rollups import main
+    main(["--all"] if args.all else [])
+
+
+def cmd_stats(args):
+    files = sorted(Path("data").glob("digest_*.json"))
+    if not files:
+        print("❌ 没有存档")
+        return 1
+    per_day = {}
+    categories = Counter()
+    sources = Counter()
+    for f in files:
+        try:
+            data = json.loads(f.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        n = 0
+        for cat, items in data.get("categories", {}).items():
+            categories[cat] += len(items)
+            sources.update(it.get("来源", "") for it in items if isinstance(it, dict))
+            n += len(items)
+        per_day[f.stem[len("digest_"):]] = n
+
+    total = sum(per_day.values())
+    empty = sum(1 for n in per_day.values() if n == 0)
+    print(f"📚 存档 {len(per_day)} 天（{min(per_day)} ~ {max(per_day)}），共 {total} 条，空白 {empty} 天")
+    print(f"   平均每天 {total / max(len(per_day), 1):.1f} 条")
+    print("\n📅 最近 7 天:")
+    for date in sorted(per_day)[-7:]:
+        print(f"   {date}  {per_day[date]:>4}")
+    print("\n🗂️ 分类 Top 10:")
+    for cat, n in categories.most_common(10):
+        print(f"   {n:>5}  {cat}")
+    print("\n📡 来源 Top 10:")
+    for src, n in sources.most_common(10):
+        print(f"   {n:>5}  {src}")
+
+
+def cmd_health(args):
+    from source_health import SourceHealth
+    rows = SourceHealth(Path("data") / ".state").report()
+    if not rows:
+        print("❌ 还没有健康记录")
+        return 1
+    short = lambda key: key if len(key) <= 52 else f"{key[:24]}…{key[-27:]}"
+    print(f"{'端点':<52} {'调用':>5} {'成功率':>6} {'p50':>7} {'p90':>7} {'p99':>7} {'超时':>5}  最后成功 / 熔断")
+    for r in rows:
+        ms = lambda v: f"{v}ms" if v is not None else "-"
+        state = f"⚡ 熔断至 {r['open_until']}" if r["open_until"] else (r["last_ok"] or "-")
+        print(f"{short(r['endpoint']):<52} {r['calls']:>5} {r['success']:>6.0%} "
+              f"{ms(r['p50']):>7} {ms(r['p90']):>7} {ms(r['p99']):>7} {r['read_timeout']:>4.0f}s  {state}")
+
+
+def cmd_profile_diff(args):
+    from profiling import diff
+    for d in (args.a, args.b):
+        if not (Path(d) / "summary.json").exists():
+            print(f"❌ 不是剖析结果目录: {d}")
+            return 1
+    diff(args.a, args.b)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="AI 资讯日报")
+    parser.add_argument("--timing", action="store_true", help="打印启动耗时")
+    parser.add_argument("--profile", action="store_true", help="分阶段性能剖析，写入 data/profiles/")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="完整流程")
+    p.add_argument("--fresh", action="store_true", help="忽略今日检查点")
+    p.add_argument("--async", dest="use_async", action="store_true", help="异步流水线")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("collect", help="只采集")
+    p.add_argument("--fresh", action="store_true", help="忽略今日检查点")
+    p.set_defaults(func=cmd_collect)
+
+    sub.add_parser("process", help="从检查点继续 AI 处理").set_defaults(func=cmd_process)
+    sub.add_parser("update", help="日内增量更新").set_defaults(func=cmd_update)
+
+    p = sub.add_parser("render", help="渲染网页")
+    p.add_argument("--date", help="渲染指定日期（默认 latest.json 并更新首页）")
+    p.add_argument("--edition", help="额外版本目录名（如 robotics、ai-en）")
+    p.set_defaults(func=cmd_render)
+
+    sub.add_parser("rebuild", help="重新生成所有页面").set_defaults(func=cmd_rebuild)
+    p = sub.add_parser("rollup", help="更新周报/月报")
+    p.add_argument("--all", action="store_true", help="重算所有存档周期（默认只看最近 35 天）")
+    p.set_defaults(func=cmd_rollup)
+
+    sub.add_parser("stats", help="存档统计").set_defaults(func=cmd_stats)
+    sub.add_parser("health", help="数据源健康表").set_defaults(func=cmd_health)
+    p = sub.add_parser("profile-diff", help="对比两次性能剖析")
+    p.add_argument("a", help="较早的剖析目录")
+    p.add_argument("b", help="较新的剖析目录")
+    p.set_defaults(func=cmd_profile_diff)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    startup_ms = (time.perf_counter() - _T0) * 1000
+    if args.profile:
+        from profiling import profile_dir, profiler
+        profiler.start(profile_dir(args.command))
+        try:
+            code = args.func(args)
+        finally:
+            profiler.finish()
+    else:
+        code = args.func(args)
+    total_ms = (time.perf_counter() - _T0) * 1000
+    if args.timing:
+        print(f"⏱️ 启动 {startup_ms:.1f} ms，总计 {total_ms:.1f} ms")
+    if args.command in LIGHT_COMMANDS and total_ms > STARTUP_BUDGET_MS and not args.profile:
+        print(f"⚠️ {args.command} 耗时 {total_ms:.0f} ms 超出预算 {STARTUP_BUDGET_MS} ms")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+日报 JSON 的写出与读取（日报、额外版本、周报/月报共用）
+- 写出前按预编译的结构校验（顶层字段、分析、用量、每个条目的字段类型），不合格抛
+  DigestSchemaError，坏数据不会落盘
+- 只序列化一次：digest_<日期>.json 与 latest.json 是同一份字节，各自先写临时文件再原子改名
+  （不用硬链接/符号链接：git 和 GitHub Pages 都不保留）
+- 先写当日文件再写 latest.json；中途被打断时 latest_path() 以更新的当日文件为准，
+  网页生成不会读到半个文件或前后不一致的两份数据
+"""
+
+import json
+import re
+from pathlib import Path
+
+from state import atomic_write
+
+_TEXT = (str, type(None))
+_NUMBER = (int, float)
+
+# {字段: (类型, 是否必填)}；未列出的字段不检查（兼容以后新增的字段）
+DIGEST_FIELDS = {
+    "date": (str, True),
+    "categories": (dict, True),
+    "analysis": (dict, True),
+    "error": (str, False),
+    "topic": (str, False),
+    "locale": (str, False),
+    "title": (str, False),
+    "usage": (dict, False),
+    "period": (str, False),
+    "start": (str, False),
+    "end": (str, False),
+}
+ITEM_FIELDS = {
+    "标题": (str, True),
+    "链接": (str, True),
+    "内容": (_TEXT, False),
+    "来源": (_TEXT, False),
+    "日期": (_TEXT, False),
+    "板块": (_TEXT, False),
+    "额外": (_TEXT, False),
+    "id": (str, False),
+}
+ANALYSIS_FIELDS = {
+    "summary": (str, True),
+    "trends": (list, False),
+    "trend_signals": (list, False),
+}
+USAGE_FIELDS = {
+    "prompt_tokens": (int, True),
+    "completion_tokens": (int, True),
+    "calls": (int, True),
+    "cost_cny": (_NUMBER, True),
+    "degraded": (list, False),
+}
+
+# 日期 / 周期键会拼进文件名：2026-03-01、2026-W10、2026-03
+_DATE = re.compile(r"\d{4}-(?:\d{2}(?:-\d{2})?|W\d{2})")
+
+
+class DigestSchemaError(ValueError):
+    """日报数据不符合结构约定"""
+
+
+def _compile(fields):
+    """{字段: (类型, 必填)} → 校验函数（必填集合和类型表只算一次）"""
+    required = frozenset(k for k, (_, req) in fields.items() if req)
+    types = {k: t for k, (t, _) in fields.items()}
+
+    def check(obj, where):
+        if not isinstance(obj, dict):
+            raise DigestSchemaError(f"{where}: 应为对象，实际 {type(obj).__name__}")
+        missing = required - obj.keys()
+        if missing:
+            raise DigestSchemaError(f"{where}: 缺少字段 {', '.join(sorted(missing))}")
+        for key, value in obj.items():
+            t = types.get(key)
+            if t is not None and not isinstance(value, t):
+                raise DigestSchemaError(f"{where}.{key}: 类型不符（{type(value).__name__}）")
+    return check
+
+
+_check_digest = _compile(DIGEST_FIELDS)
+_check_item = _compile(ITEM_FIELDS)
+_check_analysis = _compile(ANALYSIS_FIELDS)
+_check_usage = _compile(USAGE_FIELDS)
+
+
+def validate_digest(data):
+    """校验一份日报数据，不合格时抛 DigestSchemaError"""
+    _check_digest(data, "digest")
+    if not _DATE.fullmatch(data["date"]):
+        raise DigestSchemaError(f"digest.date: 无效的日期 {data['date']!r}")
+    _check_analysis(data["analysis"], "analysis")
+    if "usage" in data:
+        _check_usage(data["usage"], "usage")
+    for cat, items in data["categories"].items():
+        if not isinstance(items, list):
+            raise DigestSchemaError(f"categories[{cat}]: 应为列表")
+        for i, item in enumerate(items):
+            _check_item(item, f"categories[{cat}][{i}]")
+
+
+def write_digest(data_dir, data, latest=True):
+    """校验并写出 digest_<日期>.json（latest=True 时 latest.json 写同一份字节），返回当日文件路径"""
+    validate_digest(data)
+    raw = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    out = Path(data_dir) / f"digest_{data['date']}.json"
+    atomic_write(out, raw)
+    if latest:
+        atomic_write(out.parent / "latest.json", raw)
+    return out
+
+
+def latest_path(data_dir):
+    """
+    要渲染的最新数据文件：通常是 latest.json；最新的存档文件比它新（写完当日文件、
+    还没写 latest.json 时被打断）时取存档文件。都没有时返回 None
+    """
+    data_dir = Path(data_dir)
+    latest = data_dir / "latest.json"
+    newest = max(data_dir.glob("digest_*.json"), default=None)
+    if newest is None or not latest.exists():
+        return latest if latest.exists() else newest
+    raw = latest.read_bytes()
+    if raw == newest.read_bytes():
+        return latest
+    try:
+        date = json.loads(raw).get("date", "")
+    except ValueError:
+        date = ""
+    if date > newest.stem[len("digest_"):]:
+        return latest  # 旧版本只写 latest.json 的错误占位
+    print(f"⚠️ {latest} 与 {newest.name} 不一致，使用 {newest.name}")
+    return newest
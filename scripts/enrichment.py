@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+文章正文补全
+- RSS 条目只有 200 字的摘要，LLM 只能对着引子写总结；这里并发下载原文并用 lxml 抽取正文
+- 每个域名并发受限，整次运行有下载字节预算（下载前先预留、结束后退回没用完的部分），单页超过上限就截断
+- 健康记录按域名汇总，只有连接错误和 5xx 计为失败；单篇文章 404/410 只缓存该链接的失败
+- 抽取结果按链接哈希缓存在 data/.cache/articles/（zlib 压缩，总大小超限按最久未用淘汰），
+  每篇文章跨运行只下载解析一次；下载失败也缓存一段时间，不会每次重试
+- 送进 LLM 前按 token 预算截断
+"""
+
+import json
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import lxml.html
+from lxml import etree
+
+from items import url_hash
+from source_health import BudgetExhausted, CircuitOpenError
+from state import atomic_write
+from token_estimate import truncate_tokens
+
+# 需要补全正文的板块（其他板块的内容本身就是完整的）
+ENRICH_SECTIONS = {"新闻"}
+
+PAGE_MAX_BYTES = 2 * 1024 * 1024
+PER_HOST = 2
+WORKERS = 8
+FAIL_RETRY_SECONDS = 3 * 24 * 3600
+
+_DROP_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form",
+              "figure", "iframe", "svg", "button")
+
+
+def extract_text(html):
+    """HTML → 正文：优先 <article>，否则取段落文字最多的容器"""
+    try:
+        doc = lxml.html.fromstring(html)
+    except (ValueError, etree.ParserError):
+        return ""
+    for el in doc.xpath("//" + " | //".join(_DROP_TAGS)):
+        el.drop_tree()
+
+    containers = doc.xpath("//article") or []
+    if containers:
+        best = max(containers, key=lambda el: len(el.text_content()))
+    else:
+        scores = {}
+        for p in doc.xpath("//p"):
+            parent = p.getparent()
+            if parent is not None:
+                scores[parent] = scores.get(parent, 0) + len(p.text_content().strip())
+        if not scores:
+            return ""
+        best = max(scores, key=scores.get)
+
+    paragraphs = [" ".join(p.text_content().split()) for p in best.xpath(".//p")]
+    paragraphs = [t for t in paragraphs if len(t) >= 30]  # 去掉图注、署名等短段落
+    if not paragraphs:
+        paragraphs = [" ".join(best.text_content().split())]
+    return "\n".join(paragraphs)
+
+
+class ArticleCache:
+    """链接 → 抽取后的正文（zlib 压缩的单文件 + 索引，按总大小做 LRU 淘汰）"""
+
+    def __init__(self, cache_dir, max_bytes):
+        self.dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_file = cache_dir / "index.json"
+        try:
+            self.index = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.index = {}
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        """返回 (命中, 正文)；正文为 None 表示上次下载失败且还在重试冷却期内"""
+        h = url_hash(url)
+        with self.lock:
+            entry = self.index.get(h)
+            if not entry:
+                return False, None
+            if entry.get("failed"):
+                if time.time() - entry["fetched_at"] < FAIL_RETRY_SECONDS:
+                    return True, None
+                del self.index[h]
+                return False, None
+            entry["used_at"] = time.time()
+        try:
+            return True, zlib.decompress((self.dir / f"{h}.z").read_bytes()).decode("utf-8")
+        except (OSError, zlib.error):
+            with self.lock:
+                self.index.pop(h, None)
+            return False, None
+
+    def put(self, url, text):
+        h = url_hash(url)
+        now = time.time()
+        if text is None:
+            with self.lock:
+                self.index[h] = {"failed": True, "fetched_at": now, "size": 0}
+            return
+        blob = zlib.compress(text.encode("utf-8"), 9)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        (self.dir / f"{h}.z").write_bytes(blob)
+        with self.lock:
+            self.index[h] = {"fetched_at": now, "used_at": now, "size": len(blob)}
+
+    def evict(self):
+        """超出总大小时删除最久未用的条目"""
+        with self.lock:
+            total = sum(e["size"] for e in self.index.values())
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            for h, e in sorted(self.index.items(), key=lambda kv: kv[1].get("used_at", 0)):
+                if total <= self.max_bytes:
+                    break
+                (self.dir / f"{h}.z").unlink(missing_ok=True)
+                total -= e["size"]
+                del self.index[h]
+                removed += 1
+            return removed
+
+    def save(self):
+        self.evict()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            atomic_write(self.index_file, json.dumps(self.index).encode("utf-8"))
+
+
+class ArticleEnricher:
+    def __init__(self, cache, get, byte_budget, token_budget):
+        self.cache = cache
+        self.get = get                # 带健康记录/自适应超时的 get（见 source_health）
+        self.byte_budget = byte_budget
+        self.token_budget = token_budget
+        self.downloaded = 0
+        self.reserved = 0             # 进行中的下载预留的字节
+        self.hits = 0
+        self.lock = threading.Lock()
+        self.budget_changed = threading.Condition(self.lock)
+        self.host_slots = {}
+
+    def _slot(self, host):
+        with self.lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.Semaphore(PER_HOST)
+            return self.host_slots[host]
+
+    def _reserve(self):
+        """
+        预留本次下载的字节数（最多 PAGE_MAX_BYTES），预算用完返回 0；
+        剩余预算都被进行中的下载占着时，等它们结算后再看
+        """
+        with self.budget_changed:
+            while True:
+                left = self.byte_budget - self.downloaded - self.reserved
+                if left > 0 or not self.reserved:
+                    limit = max(0, min(PAGE_MAX_BYTES, left))
+                    self.reserved += limit
+                    return limit
+                self.budget_changed.wait()
+
+    def _settle(self, limit, size):
+        """结算预留：实际下载量计入预算，没用完的退回"""
+        with self.budget_changed:
+            self.reserved -= limit
+            self.downloaded += size
+            self.budget_changed.notify_all()
+
+    def _download(self, url):
+        host = urlsplit(url).netloc
+        with self._slot(host):
+            limit = self._reserve()
+            if not limit:
+                return None
+            size = 0
+            try:
+                # 按域名汇总健康：连接错误/5xx 说明站点有问题，单篇 404/410 不算
+                r = self.get(url, key=f"{host}/*", stream=True, dead_status=(),
+                             headers={"User-Agent": "Mozilla/5.0", "Accept": "text/html"})
+                try:
+                    if r.status_code != 200 or "html" not in r.headers.get("Content-Type", "html"):
+                        return ""
+                    chunks = []
+                    for chunk in r.iter_content(64 * 1024):
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size >= limit:
+                            break
+                finally:
+                    r.close()
+                size = min(size, limit)
+                return b"".join(chunks)[:limit]
+            finally:
+                self._settle(limit, size)
+
+    def _fetch(self, url):
+        """返回正文（可能为空串）；预算用完返回 None 且不写缓存"""
+        hit, text = self.cache.get(url)
+        if hit:
+            with self.lock:
+                self.hits += 1
+            return text or ""
+        try:
+            html = self._download(url)
+        except (CircuitOpenError, BudgetExhausted):
+            return None
+        except Exception:
+            self.cache.put(url, None)
+            return ""
+        if html is None:
+            return None
+        text = extract_text(html) if html else ""
+        self.cache.put(url, text if text else None)
+        return text
+
+    def enrich(self, items):
+        """返回 {条目 id: 截断后的正文}（只处理 ENRICH_SECTIONS，正文比原摘要长才采用）"""
+        todo = [it for it in items if it.section in ENRICH_SECTIONS]
+        if not todo:
+            return {}
+        urls = list(dict.fromkeys(it.url for it in todo))
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            texts = dict(zip(urls, pool.map(self._fetch, urls)))
+        result = {}
+        for it in todo:
+            text = texts.get(it.url)
+            if text and len(text) > len(it.content):
+                result[it.id] = truncate_tokens(text, self.token_budget)
+        return result
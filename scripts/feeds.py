@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+订阅源（Atom + JSON Feed）
+- 滚动窗口 data/.state/feed_window.json 保存最近 FEED_DAYS 天的条目，每次只把新落地的一天
+  （或内容变化的今天）并入，不重读整个存档
+- 条目 ID = 规范化链接，跨天、跨板块重复出现的条目只保留一条（取最近一天的内容）
+- 条目内容没变时不改时间戳，整个订阅源没变化时不重写文件，静态托管的
+  ETag / Last-Modified 保持不变，下游可以用条件请求低成本轮询
+- 输出 docs/feed.xml、docs/feed.json（及 .gz / .br 副本）
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from xml.etree import ElementTree as ET
+
+from items import canonical_url
+from state import load_state, save_state
+
+FEED_DAYS = 7
+FEED_MAX_ITEMS = 200
+FEED_TITLE = "🤖 AI 资讯日报"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+
+def _signature(entry):
+    return hashlib.blake2b(json.dumps(entry, ensure_ascii=False, sort_keys=True).encode(),
+                           digest_size=8).hexdigest()
+
+
+class FeedWindow:
+    def __init__(self, state_dir):
+        self.state_file = state_dir / "feed_window.json"
+        self.state = load_state(self.state_file, {"days": {}, "seen": {}, "written": None})
+
+    def add_day(self, data, raw):
+        """并入一天的 digest（raw 为文件原始字节，用来判断是否变化），返回窗口是否有变化"""
+        date = data.get("date")
+        if not date or data.get("error"):
+            return False
+        digest = hashlib.blake2b(raw, digest_size=8).hexdigest()
+        days = self.state["days"]
+        if days.get(date, {}).get("hash") == digest:
+            return False
+        entries, ids = [], set()
+        for cat, items in data.get("categories", {}).items():
+            for item in items:
+                if not isinstance(item, dict) or not item.get("链接"):
+                    continue
+                entry_id = "https://" + canonical_url(item["链接"])
+                if entry_id in ids:
+                    continue
+                ids.add(entry_id)
+                entries.append({
+                    "id": entry_id,
+                    "url": item["链接"],
+                    "title": item.get("标题", ""),
+                    "summary": item.get("内容", ""),
+                    "extra": item.get("额外") or "",
+                    "category": cat,
+                    "source": item.get("来源", ""),
+                })
+        days[date] = {"hash": digest, "entries": entries}
+        for old in sorted(days)[:-FEED_DAYS]:
+            del days[old]
+        self._stamp()
+        return True
+
+    def _stamp(self):
+        """记录每个条目第一次出现和内容最后变化的时间（窗口外的条目不再记录）"""
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        seen = self.state["seen"]
+        current = {}
+        for entry in self.entries(limit=None):
+            sig = _signature(entry)
+            stamp = seen.get(entry["id"]) or {"published": now, "modified": now, "sig": sig}
+            if stamp["sig"] != sig:
+                stamp = {**stamp, "modified": now, "sig": sig}
+            current[entry["id"]] = stamp
+        self.state["seen"] = current
+
+    def entries(self, limit=FEED_MAX_ITEMS):
+        """窗口内的条目，新的日期在前，同一 ID 只保留最近一天的版本"""
+        result, ids = [], set()
+        for date in sorted(self.state["days"], reverse=True):
+            for entry in self.state["days"][date]["entries"]:
+                if entry["id"] not in ids:
+                    ids.add(entry["id"])
+                    result.append(entry)
+        return result[:limit] if limit else result
+
+    def save(self):
+        save_state(self.state_file, self.state)
+
+
+def atom_feed(entries, seen, site_url, updated):
+    ET.register_namespace("", ATOM_NS)
+    q = lambda tag: f"{{{ATOM_NS}}}{tag}"
+    feed = ET.Element(q("feed"))
+    ET.SubElement(feed, q("title")).text = FEED_TITLE
+    ET.SubElement(feed, q("id")).text = f"{site_url}feed.xml" if site_url else "urn:ai-digest:feed"
+    ET.SubElement(feed, q("updated")).text = updated
+    if site_url:
+        ET.SubElement(feed, q("link"), href=site_url)
+        ET.SubElement(feed, q("link"), rel="self", href=f"{site_url}feed.xml")
+    ET.SubElement(ET.SubElement(feed, q("author")), q("name")).text = "AI Digest"
+    for e in entries:
+        entry = ET.SubElement(feed, q("entry"))
+        ET.SubElement(entry, q("id")).text = e["id"]
+        ET.SubElement(entry, q("title")).text = e["title"]
+        ET.SubElement(entry, q("link"), href=e["url"])
+        ET.SubElement(entry, q("published")).text = seen[e["id"]]["published"]
+        ET.SubElement(entry, q("updated")).text = seen[e["id"]]["modified"]
+        ET.SubElement(entry, q("category"), term=e["category"])
+        ET.SubElement(ET.SubElement(entry, q("author")), q("name")).text = e["source"] or "AI Digest"
+        summary = " | ".join(filter(None, [e["summary"], e["extra"]]))
+        if summary:
+            ET.SubElement(entry, q("summary")).text = summary
+    return ET.tostring(feed, encoding="utf-8", xml_declaration=True)
+
+
+def json_feed(entries, seen, site_url):
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": FEED_TITLE,
+        "language": "zh-CN",
+        "items": [
+            {
+                "id": e["id"],
+                "url": e["url"],
+                "title": e["title"],
+                "content_text": " | ".join(filter(None, [e["summary"], e["extra"]])) or e["title"],
+                "date_published": seen[e["id"]]["published"],
+                "date_modified": seen[e["id"]]["modified"],
+                "tags": [e["category"]],
+                "authors": [{"name": e["source"]}] if e["source"] else [],
+            }
+            for e in entries
+        ],
+    }
+    if site_url:
+        feed.update(home_page_url=site_url, feed_url=f"{site_url}feed.json")
+    return json.dumps(feed, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_feeds(window, docs_dir, site_url, write):
+    """窗口条目有变化时重写 feed.xml / feed.json（write 负责写文件及压缩副本），返回是否写出"""
+    entries = window.entries()
+    seen = window.state["seen"]
+    digest = _signature([[e["id"], seen[e["id"]]["modified"]] for e in entries] + [site_url])
+    if digest == window.state.get("written") and (docs_dir / "feed.xml").exists():
+        return False
+    updated = max((seen[e["id"]]["modified"] for e in entries),
+                  default=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    write(docs_dir / "feed.xml", atom_feed(entries, seen, site_url, updated))
+    write(docs_dir / "feed.json", json_feed(entries, seen, site_url))
+    window.state["written"] = digest
+    return True
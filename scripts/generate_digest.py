@@ -5,12 +5,31 @@ AI 资讯聚合器 - 热加载版本
 """
 
 import os
+import sys
 import json
-import requests
+import threading
 import feedparser
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from categorizer import CategoryIndex
+from checkpoint import CheckpointStore
+from digest_io import write_digest
+from enrichment import ENRICH_SECTIONS, ArticleCache, ArticleEnricher
+from incremental import REANALYZE_MIN_NEW, DigestWatermark, merge_delta
+from items import DigestItem, dumps_prompt
+from llm_budget import (BATCH_OVERHEAD, COMPLETION_CAP_PER_ITEM, MIN_PER_SECTION, TRANSLATION_MAX_TOKENS,
+                        TokenGovernor, trim_per_section)
+from profiling import profile_dir, profiler
+from scoring import EngagementScorer, select_top
+from source_health import SourceHealth, endpoint_key
+from state import load_state
+from topics import MAIN, merged_queries, parse_editions
+from trends import TrendEngine
+from twitter_incremental import TwitterIncrementalFetcher
+from youtube_planner import YouTubeFetchPlanner
+
 
 class AIDigestGenerator:
     def __init__(self):
@@ -19,31 +38,126 @@ class AIDigestGenerator:
         self.twitter_key = os.environ.get("TWITTER_API_KEY")
         self.rapidapi_key = os.environ.get("RAPIDAPI_KEY")
         
+        # 两级模型：小模型批量翻译摘要，强模型做一次整体分析
         self.model = os.environ.get("SILICONFLOW_MODEL", "deepseek-ai/DeepSeek-V3")
+        self.fast_model = os.environ.get("SILICONFLOW_FAST_MODEL", "THUDM/glm-4-9b-chat")
+        self.llm_concurrency = int(os.environ.get("LLM_CONCURRENCY", "4"))
         
         self.today = datetime.now()
         self.today_str = self.today.strftime("%Y-%m-%d")
         self.yesterday = self.today - timedelta(days=1)
         
         self.data_dir = Path("data")
-        self.data_dir.mkdir(exist_ok=True)
+        self.state_dir = self.data_dir / ".state"
+        
+        # YouTube 搜索词（逗号分隔）与单次运行配额上限
+        self.youtube_queries = [q.strip() for q in os.environ.get("YOUTUBE_QUERIES", "AI").split(",") if q.strip()]
+        self.youtube_quota = int(os.environ.get("YOUTUBE_QUOTA_PER_RUN", "1000"))
+        
+        # Twitter 搜索词、关注账号（逗号分隔）与全局限速（每秒请求数）
+        self.twitter_query = os.environ.get("TWITTER_QUERY", "AI")
+        self.twitter_accounts = [u.strip() for u in os.environ.get(
+            "TWITTER_ACCOUNTS", "OpenAI,GoogleDeepMind,GoogleAIStudio").split(",") if u.strip()]
+        self.twitter_qps = float(os.environ.get("TWITTER_QPS", "1"))
+        self._twitter = None
+        self._twitter_lock = threading.Lock()
+        
+        # 送入 LLM 的全局条目上限（按热度分数取前 N）
+        self.max_llm_items = int(os.environ.get("DIGEST_MAX_ITEMS", "120"))
+        
+        # 额外的专题/语言版本（如 "robotics,chips,ai:en"），共用采集和译文
+        self.editions = parse_editions(os.environ.get("DIGEST_EDITIONS", ""))
+        self.topic_max_items = int(os.environ.get("DIGEST_TOPIC_MAX_ITEMS", "40"))
+        self.need_en = any(ed.locale == "en" for ed in self.editions)
+        self.youtube_queries = merged_queries(self.youtube_queries, self.editions)
+        self.tiktok_keywords = merged_queries(["AI"], self.editions)
+        self._category_index = None
+        
+        self.all_items = []   # DigestItem 列表
+        self.seen_urls = set()
+        self.item_scores = {}      # id -> 热度分数（增量更新时用于重排）
+        self.collect_started = None
+        self.item_sink = None  # 异步模式下每条新条目的回调
+        self.health = SourceHealth(self.state_dir)  # 端点健康表 + 熔断器 + 自适应超时
+        # 采集阶段总预算（秒，0 表示不限）
+        self.collect_budget = float(os.environ.get("COLLECT_BUDGET_SECONDS", "300"))
         
-        self.all_items = []
+        # 正文补全：每条送 LLM 的正文 token 上限（0 关闭）、单次下载字节预算、缓存大小
+        self.enrich_tokens = int(os.environ.get("ENRICH_TOKENS", "400"))
+        self.enrich_max_bytes = int(float(os.environ.get("ENRICH_MAX_MB", "8")) * 1024 * 1024)
+        self.enrich_cache_bytes = int(float(os.environ.get("ENRICH_CACHE_MB", "50")) * 1024 * 1024)
+        self.article_text = {}  # id -> 截断后的正文
+        self._enricher = None
+        self._enricher_lock = threading.Lock()
         
-        # 打印 API 状态
+        # LLM 成本预算（元，0 表示不限）：单次运行 / 每日（含日内增量更新），用量记在 data/.state/llm_usage.json
+        self.governor = TokenGovernor(
+            self.state_dir,
+            run_budget=float(os.environ.get("LLM_RUN_BUDGET", "0.5")),
+            day_budget=float(os.environ.get("LLM_DAY_BUDGET", "1")),
+        )
+
+    def print_status(self):
+        """打印 API 状态"""
         print("📋 API 状态:")
         print(f"  - 硅基流动: {'✅' if self.siliconflow_key else '❌ 未配置'}")
         print(f"  - YouTube: {'✅' if self.youtube_key else '⚠️ 跳过'}")
         print(f"  - Twitter: {'✅' if self.twitter_key else '⚠️ 跳过'}")
         print(f"  - TikTok: {'✅' if self.rapidapi_key else '⚠️ 跳过'}")
+        if self.editions:
+            print(f"📚 额外版本: {', '.join(ed.key for ed in self.editions)}")
+        left = self.governor.remaining()
+        if left is not None:
+            print(f"💰 LLM 预算剩余: ¥{left:.2f}（单次 ¥{self.governor.run_budget:g} / 每日 ¥{self.governor.day_budget:g}）")
 
     def safe_fetch(self, name, func):
         """安全执行数据获取，失败不影响其他"""
         try:
-            func()
+            with profiler.stage(f"fetch:{name}"):
+                func()
         except Exception as e:
             print(f"  ❌ {name} 失败: {e}")
 
+    def http_get(self, url, **kwargs):
+        """所有 HTTP 请求都经过健康表（自适应超时、熔断、总预算；hedge=True 时对冲慢请求）"""
+        return self.health.get(url, **kwargs)
+
+    def fetch_feed(self, url):
+        """先用 http_get 下载（每个 feed 地址单独记录、受超时控制），再交给 feedparser 解析"""
+        r = self.http_get(url, key=endpoint_key(url, with_query=True),
+                          headers={"User-Agent": "Mozilla/5.0"})
+        return feedparser.parse(r.content)
+
+    def report_health(self):
+        """保存健康表并列出熔断中的端点"""
+        self.health.save()
+        left = self.health.remaining()
+        if left is not None and left < 1:
+            print(f"\n⏱️ 采集预算 {self.collect_budget:.0f} 秒已用完，之后的请求被跳过")
+        if self.health.hedges:
+            print(f"\n🪃 对冲请求 {self.health.hedges} 次")
+        opened = [r for r in self.health.report() if r["open_until"]]
+        if opened:
+            print(f"\n⚡ 熔断中的端点 {len(opened)} 个（到期后自动探测）:")
+            for r in opened:
+                print(f"  - {r['endpoint']}  成功率 {r['success']:.0%}，下次探测 {r['open_until']}")
+
+    def add_item(self, **fields):
+        """构造并校验条目，同一板块内按链接去重；无效条目只打印警告"""
+        try:
+            item = DigestItem(**fields)
+        except ValueError as e:
+            print(f"      ⚠️ 跳过无效条目: {e}")
+            return False
+        key = (item.section, item.url_hash)
+        if key in self.seen_urls:
+            return False
+        self.seen_urls.add(key)
+        self.all_items.append(item)
+        if self.item_sink:
+            self.item_sink(item)
+        return True
+
     # ==================== RSS（无需 API）====================
     
     def fetch_rss(self):
@@ -58,22 +172,21 @@ class AIDigestGenerator:
         
         for url, name in sources:
             try:
-                feed = feedparser.parse(url)
+                feed = self.fetch_feed(url)
                 count = 0
                 for entry in feed.entries[:10]:
                     pub = entry.get("published_parsed") or entry.get("updated_parsed")
                     if pub:
                         dt = datetime(*pub[:6])
                         if dt > self.yesterday:
-                            self.all_items.append({
-                                "标题": entry.get("title", ""),
-                                "内容": entry.get("summary", "")[:200],
-                                "日期": dt.isoformat(),
-                                "来源": name,
-                                "板块": "新闻",
-                                "链接": entry.get("link", "")
-                            })
-                            count += 1
+                            count += self.add_item(
+                                title=entry.get("title", ""),
+                                content=entry.get("summary", "")[:200],
+                                published=dt.replace(tzinfo=timezone.utc),
+                                source=name,
+                                section="新闻",
+                                url=entry.get("link", "")
+                            )
                 print(f"  ✅ {name}: {count} 条")
             except Exception as e:
                 print(f"  ❌ {name}: {e}")
@@ -92,7 +205,7 @@ class AIDigestGenerator:
         
         for cid in channels:
             try:
-                feed = feedparser.parse(f"https://www.youtube.com/feeds/videos.xml?channel_id={cid}")
+                feed = self.fetch_feed(f"https://www.youtube.com/feeds/videos.xml?channel_id={cid}")
                 name = feed.feed.get("author", "YouTube")
                 count = 0
                 for entry in feed.entries[:3]:
@@ -100,15 +213,14 @@ class AIDigestGenerator:
                     if pub:
                         dt = datetime(*pub[:6])
                         if dt > self.yesterday:
-                            self.all_items.append({
-                                "标题": entry.get("title", ""),
-                                "内容": "",
-                                "日期": dt.isoformat(),
-                                "来源": name,
-                                "板块": "油管博主",
-                                "链接": entry.get("link", "")
-                            })
-                            count += 1
+                            count += self.add_item(
+                                title=entry.get("title", ""),
+                                content="",
+                                published=dt.replace(tzinfo=timezone.utc),
+                                source=name,
+                                section="油管博主",
+                                url=entry.get("link", "")
+                            )
                 print(f"  ✅ {name}: {count} 条")
             except Exception as e:
                 print(f"  ❌ 频道 {cid[:8]}: {e}")
@@ -122,51 +234,49 @@ class AIDigestGenerator:
         
         print("\n🔥 YouTube 热门...")
         
+        planner = YouTubeFetchPlanner(self.youtube_key, self.state_dir, run_budget=self.youtube_quota,
+                                      get=self.http_get)
+        queries = planner.plan(self.youtube_queries)
+        if not queries:
+            print(f"  ⚠️ 配额不足（今日已用 {planner.ledger['used']}），跳过")
+            return
+        
         try:
-            # 搜索
-            r = requests.get("https://www.googleapis.com/youtube/v3/search", params={
-                "key": self.youtube_key,
-                "part": "snippet",
-                "q": "AI",
-                "order": "relevance",
-                "maxResults": 10,
-                "regionCode": "US",
-                "type": "video",
-                "publishedAfter": self.yesterday.isoformat() + "Z"
-            }, timeout=30)
-            data = r.json()
-            
-            if "items" not in data:
-                print(f"  ❌ {data.get('error', {}).get('message', '错误')}")
-                return
-            
-            ids = [i["id"]["videoId"] for i in data["items"]]
+            # 搜索（每个词 100 单位），合并所有视频 ID
+            published_after = self.yesterday.isoformat() + "Z"
+            found = {}  # videoId -> (query, snippet)
+            for q in queries:
+                try:
+                    for item in planner.search(q, published_after):
+                        found.setdefault(item["id"]["videoId"], (q, item["snippet"]))
+                except Exception as e:
+                    print(f"  ❌ 搜索 {q}: {e}")
             
-            # 统计
-            r2 = requests.get("https://www.googleapis.com/youtube/v3/videos", params={
-                "key": self.youtube_key,
-                "part": "statistics",
-                "id": ",".join(ids)
-            }, timeout=30)
-            stats = {i["id"]: i["statistics"] for i in r2.json().get("items", [])}
+            # 统计（50 个一批，命中缓存的不再请求）
+            stats = planner.statistics(list(found))
             
             count = 0
-            for item in data["items"]:
-                vid = item["id"]["videoId"]
+            passed = dict.fromkeys(queries, 0)
+            for vid, (q, snippet) in found.items():
                 views = int(stats.get(vid, {}).get("viewCount", 0))
                 if views > 200000:
-                    self.all_items.append({
-                        "标题": item["snippet"]["title"],
-                        "内容": item["snippet"]["description"][:150],
-                        "日期": item["snippet"]["publishTime"],
-                        "来源": "YouTube",
-                        "板块": "YouTube热点",
-                        "链接": f"https://youtube.com/watch?v={vid}"
-                    })
-                    count += 1
-            print(f"  ✅ {count} 条 (播放量>20万)")
+                    count += self.add_item(
+                        title=snippet["title"],
+                        content=snippet["description"][:150],
+                        published=snippet["publishTime"],
+                        source="YouTube",
+                        section="YouTube热点",
+                        url=f"https://youtube.com/watch?v={vid}",
+                        engagement=views
+                    )
+                    passed[q] += 1
+            for q in queries:
+                planner.record_yield(q, passed[q])
+            print(f"  ✅ {count} 条 (播放量>20万，{len(queries)} 个搜索词，配额 {planner.run_used})")
         except Exception as e:
             print(f"  ❌ {e}")
+        finally:
+            planner.save()
 
     # ==================== Twitter（需要 API）====================
     
@@ -177,63 +287,88 @@ class AIDigestGenerator:
         
         print("\n🐦 Twitter 热门...")
         
+        fetcher = self._twitter_fetcher()
+        boundary = self._twitter_boundary()
+        query = self._twitter_search_query()
         try:
-            r = requests.get("https://api.twitterapi.io/twitter/tweet/advanced_search",
-                headers={"x-api-key": self.twitter_key},
-                params={"query": "AI", "queryType": "Top"},
-                timeout=30)
-            data = r.json()
+            tweets = fetcher.search(query, boundary)
             
             count = 0
-            for t in data.get("tweets", []):
+            kept = []
+            for t in tweets:
                 views = t.get("viewCount", 0)
                 heat = t.get("likeCount", 0) + t.get("retweetCount", 0) * 2
                 if views > 10000 and heat > 1000:
-                    self.all_items.append({
-                        "标题": t.get("text", "")[:100],
-                        "内容": t.get("text", ""),
-                        "日期": t.get("createdAt", ""),
-                        "来源": "Twitter",
-                        "板块": "Twitter热点",
-                        "链接": t.get("url", "")
-                    })
-                    count += 1
-            print(f"  ✅ {count} 条")
+                    count += self.add_item(
+                        title=t.get("text", "")[:100],
+                        content=t.get("text", ""),
+                        published=t.get("createdAt", ""),
+                        source="Twitter",
+                        section="Twitter热点",
+                        url=t.get("url", ""),
+                        engagement=heat
+                    )
+                    kept.append(t)
+            # 只标记已输出的推文：暂未达标的下次还有机会
+            fetcher.mark_seen(query, kept)
+            print(f"  ✅ {count} 条（新推文 {len(tweets)}）")
         except Exception as e:
             print(f"  ❌ {e}")
+        finally:
+            fetcher.save()
 
     def fetch_twitter_accounts(self):
-        """获取明星公司动态"""
+        """获取明星公司动态（增量，只取上次之后的新推文）"""
         if not self.twitter_key:
             return
         
         print("\n🌟 明星公司动态...")
         
-        for user in ["OpenAI", "GoogleDeepMind", "GoogleAIStudio"]:
-            try:
-                r = requests.get("https://api.twitterapi.io/twitter/user/last_tweets",
-                    headers={"x-api-key": self.twitter_key},
-                    params={"userName": user},
-                    timeout=30)
-                data = r.json()
+        fetcher = self._twitter_fetcher()
+        try:
+            results = fetcher.fetch_accounts(self.twitter_accounts, self._twitter_boundary())
+            for user in self.twitter_accounts:
+                tweets = results.get(user, [])
+                if isinstance(tweets, Exception):
+                    print(f"  ❌ @{user}: {tweets}")
+                    continue
                 
                 count = 0
-                for t in data.get("data", {}).get("tweets", [])[:5]:
+                for t in tweets:
                     text = t.get("text", "")
                     if t.get("retweeted_tweet"):
                         text = f"(转发) {t['retweeted_tweet'].get('text', '')}"
-                    self.all_items.append({
-                        "标题": text[:100],
-                        "内容": text,
-                        "日期": t.get("createdAt", ""),
-                        "来源": user,
-                        "板块": "明星公司动态",
-                        "链接": t.get("url", "")
-                    })
-                    count += 1
+                    count += self.add_item(
+                        title=text[:100],
+                        content=text,
+                        published=t.get("createdAt", ""),
+                        source=user,
+                        section="明星公司动态",
+                        url=t.get("url", ""),
+                        engagement=t.get("likeCount", 0) + t.get("retweetCount", 0) * 2
+                    )
                 print(f"  ✅ @{user}: {count} 条")
-            except Exception as e:
-                print(f"  ❌ @{user}: {e}")
+        finally:
+            fetcher.save()
+
+    def _twitter_fetcher(self):
+        """两个 Twitter 数据源共用一个实例（共享游标状态和限速，异步模式下会并发调用）"""
+        with self._twitter_lock:
+            if self._twitter is None:
+                self._twitter = TwitterIncrementalFetcher(self.twitter_key, self.state_dir,
+                                                          qps=self.twitter_qps, get=self.http_get)
+            return self._twitter
+
+    def _twitter_search_query(self):
+        """主搜索词与各专题搜索词用 OR 合并成一次搜索"""
+        queries = merged_queries([self.twitter_query], self.editions)
+        if len(queries) == 1:
+            return queries[0]
+        return " OR ".join(f'"{q}"' if " " in q else q for q in queries)
+
+    def _twitter_boundary(self):
+        """24 小时窗口边界（UTC）"""
+        return datetime.now(timezone.utc) - timedelta(days=1)
 
     # ==================== TikTok（需要 API）====================
     
@@ -244,14 +379,17 @@ class AIDigestGenerator:
         
         print("\n🎵 TikTok 热门...")
         
+        for keyword in self.tiktok_keywords:
+            self._fetch_tiktok_keyword(keyword)
+
+    def _fetch_tiktok_keyword(self, keyword):
         try:
-            r = requests.get("https://tiktok-api23.p.rapidapi.com/api/search/general",
+            r = self.http_get("https://tiktok-api23.p.rapidapi.com/api/search/general",
                 headers={
                     "x-rapidapi-key": self.rapidapi_key,
                     "x-rapidapi-host": "tiktok-api23.p.rapidapi.com"
                 },
-                params={"keyword": "AI", "cursor": "0"},
-                timeout=30)
+                params={"keyword": keyword, "cursor": "0"})
             data = r.json()
             
             count = 0
@@ -264,18 +402,18 @@ class AIDigestGenerator:
                     ts = d.get("createTime", 0)
                     if ts and datetime.fromtimestamp(ts) > self.today - timedelta(days=14):
                         author = d.get("author", {})
-                        self.all_items.append({
-                            "标题": d.get("desc", "")[:100],
-                            "内容": d.get("desc", ""),
-                            "日期": datetime.fromtimestamp(ts).isoformat(),
-                            "来源": "TikTok",
-                            "板块": "TikTok热点",
-                            "链接": f"https://tiktok.com/@{author.get('uniqueId', '')}/video/{d.get('id', '')}"
-                        })
-                        count += 1
-            print(f"  ✅ {count} 条")
+                        count += self.add_item(
+                            title=d.get("desc", "")[:100],
+                            content=d.get("desc", ""),
+                            published=datetime.fromtimestamp(ts),
+                            source="TikTok",
+                            section="TikTok热点",
+                            url=f"https://tiktok.com/@{author.get('uniqueId', '')}/video/{d.get('id', '')}",
+                            engagement=plays
+                        )
+            print(f"  ✅ {keyword}: {count} 条")
         except Exception as e:
-            print(f"  ❌ {e}")
+            print(f"  ❌ {keyword}: {e}")
 
     # ==================== GitHub（无需 API）====================
     
@@ -310,10 +448,18 @@ class AIDigestGenerator:
                 f"https://api.github.com/search/repositories?q=stars:>{stars_req}+{search_field}:>{date_range}&sort=stars&order=desc&per_page=10",
             ]
             
+            # GitHub Search 与其他调用方共用地址，按调用方单独熔断
+            keys = {apis[2]: endpoint_key(apis[2], tag="trending")}
+            # 按历史成功率/延迟重排，熔断中的端点跳过
+            ordered = self.health.order(apis, keys)
             for api_url in apis:
+                if api_url not in ordered:
+                    print(f"      ⏭️ {api_url.split('/')[2]} 熔断中，跳过")
+            
+            for api_url in ordered:
                 try:
                     headers = {"User-Agent": "Mozilla/5.0"}
-                    r = requests.get(api_url, headers=headers, timeout=30)
+                    r = self.http_get(api_url, key=keys.get(api_url), headers=headers, hedge=True)
                     if r.status_code != 200:
                         print(f"      ⚠️ {api_url[:50]}... -> HTTP {r.status_code}")
                         continue
@@ -353,16 +499,16 @@ class AIDigestGenerator:
                         )
                         stars_today = repo.get("starsSince", 0) or repo.get("starsToday", 0)
                         
-                        self.all_items.append({
-                            "标题": f"{author}/{name}",
-                            "内容": desc[:200] if desc else f"{lang} 项目",
-                            "日期": self.today.isoformat(),
-                            "来源": f"GitHub {label}",
-                            "板块": f"GitHub{label}",
-                            "链接": repo.get("url") or repo.get("html_url") or f"https://github.com/{author}/{name}",
-                            "额外": f"⭐ {stars:,} | 🔥 +{stars_today:,} | 💻 {lang}" if stars_today else f"⭐ {stars:,} | 💻 {lang}"
-                        })
-                        count += 1
+                        count += self.add_item(
+                            title=f"{author}/{name}",
+                            content=desc[:200] if desc else f"{lang} 项目",
+                            published=self.today,
+                            source=f"GitHub {label}",
+                            section=f"GitHub{label}",
+                            url=repo.get("html_url") or repo.get("url") or f"https://github.com/{author}/{name}",
+                            extra=f"⭐ {stars:,} | 🔥 +{stars_today:,} | 💻 {lang}" if stars_today else f"⭐ {stars:,} | 💻 {lang}",
+                            engagement=stars_today or stars
+                        )
                     
                     if count > 0:
                         print(f"  ✅ {label}: {count} 条（使用 {api_url.split('/')[2]}）")
@@ -383,11 +529,11 @@ class AIDigestGenerator:
         
         try:
             # 使用 HuggingFace 官方 API（实测可用）
-            r = requests.get(
+            r = self.http_get(
                 "https://huggingface.co/api/models",
                 params={"limit": 10},  # 按 trendingScore 默认排序
                 headers={"User-Agent": "Mozilla/5.0"},
-                timeout=30
+                hedge=True
             )
             
             if r.status_code != 200:
@@ -416,16 +562,16 @@ class AIDigestGenerator:
                 tags = model.get("tags", [])
                 task = next((t for t in tags if not t.startswith(("license:", "region:", "arxiv:"))), "模型")
                 
-                self.all_items.append({
-                    "标题": model_id,
-                    "内容": f"{task} | 热度: {trending}",
-                    "日期": self.today.isoformat(),
-                    "来源": "HuggingFace",
-                    "板块": "HuggingFace热门",
-                    "链接": f"https://huggingface.co/{model_id}",
-                    "额外": f"📥 {downloads:,} 下载 | ❤️ {likes} 点赞 | 🔥 热度 {trending}"
-                })
-                count += 1
+                count += self.add_item(
+                    title=model_id,
+                    content=f"{task} | 热度: {trending}",
+                    published=self.today,
+                    source="HuggingFace",
+                    section="HuggingFace热门",
+                    url=f"https://huggingface.co/{model_id}",
+                    extra=f"📥 {downloads:,} 下载 | ❤️ {likes} 点赞 | 🔥 热度 {trending}",
+                    engagement=trending or likes
+                )
             
             print(f"  ✅ {count} 条")
         except Exception as e:
@@ -434,25 +580,29 @@ class AIDigestGenerator:
     # ==================== ModelScope（无需 API）====================
     
     def fetch_modelscope_trending(self):
-        """获取 ModelScope 热门模型（API 已验证失效，暂时跳过）"""
+        """获取 ModelScope 热门模型
+        注：经实测 https://modelscope.cn/api/v1/models 返回 404（可能需要认证或 API 已迁移），
+        连续失败后由熔断器跳过，按退避周期探测，接口恢复后自动启用
+        """
         print("\n🔮 ModelScope Trending...")
-        print("  ⚠️ ModelScope API 已废弃（实测 404），跳过此数据源")
-        # 注：经实测 https://modelscope.cn/api/v1/models 返回 404
-        # ModelScope 可能需要认证或 API 已迁移
-        return
-
-    def _fetch_modelscope_old(self):
-        """旧的 ModelScope 获取代码（已废弃，保留作参考）"""
-        for url, params in [("https://modelscope.cn/api/v1/models", {"PageSize": 10})]:
+        
+        endpoints = [("https://modelscope.cn/api/v1/models", {"PageSize": 10})]
+        ordered = self.health.order([url for url, _ in endpoints])
+        if not ordered:
+            print("  ⏭️ 接口熔断中，跳过")
+            return
+        
+        for url, params in endpoints:
+            if url not in ordered:
+                continue
             try:
-                r = requests.get(
+                r = self.http_get(
                     url, 
                     params=params, 
                     headers={
                         "User-Agent": "Mozilla/5.0",
                         "Referer": "https://modelscope.cn/"
-                    },
-                    timeout=30
+                    }
                 )
                 
                 if r.status_code != 200:
@@ -498,16 +648,15 @@ class AIDigestGenerator:
                     
                     downloads = model.get("Downloads", 0) or model.get("DownloadCount", 0) or 0
                     
-                    self.all_items.append({
-                        "标题": model_name,
-                        "内容": desc,
-                        "日期": self.today.isoformat(),
-                        "来源": "ModelScope",
-                        "板块": "ModelScope热门",
-                        "链接": f"https://modelscope.cn/models/{model_name}",
-                        "额外": f"📥 {downloads:,} 下载"
-                    })
-                    count += 1
+                    count += self.add_item(
+                        title=model_name,
+                        content=desc,
+                        published=self.today,
+                        source="ModelScope",
+                        section="ModelScope热门",
+                        url=f"https://modelscope.cn/models/{model_name}",
+                        extra=f"📥 {downloads:,} 下载"
+                    )
                 
                 if count > 0:
                     print(f"  ✅ {count} 条（使用 {url.split('/')[2]}）")
@@ -528,7 +677,7 @@ class AIDigestGenerator:
         try:
             # 搜索 AI agent 相关的热门仓库
             # 使用更简单的查询格式，避免 URL 编码问题
-            r = requests.get(
+            r = self.http_get(
                 "https://api.github.com/search/repositories",
                 params={
                     "q": "ai agent llm autonomous stars:>1000",
@@ -536,8 +685,9 @@ class AIDigestGenerator:
                     "order": "desc",
                     "per_page": 10
                 },
+                key=endpoint_key("https://api.github.com/search/repositories", tag="agents"),
                 headers={"User-Agent": "Mozilla/5.0"},
-                timeout=30
+                hedge=True
             )
             
             if r.status_code != 200:
@@ -553,16 +703,16 @@ class AIDigestGenerator:
                 if not full_name:
                     continue
                 
-                self.all_items.append({
-                    "标题": full_name,
-                    "内容": (repo.get("description") or "AI Agent 项目")[:200],
-                    "日期": self.today.isoformat(),
-                    "来源": "GitHub AI Agent",
-                    "板块": "AI Agent热门",
-                    "链接": repo.get("html_url", f"https://github.com/{full_name}"),
-                    "额外": f"⭐ {repo.get('stargazers_count', 0):,} | 💻 {repo.get('language', 'Unknown')}"
-                })
-                count += 1
+                count += self.add_item(
+                    title=full_name,
+                    content=(repo.get("description") or "AI Agent 项目")[:200],
+                    published=self.today,
+                    source="GitHub AI Agent",
+                    section="AI Agent热门",
+                    url=repo.get("html_url") or f"https://github.com/{full_name}",
+                    extra=f"⭐ {repo.get('stargazers_count', 0):,} | 💻 {repo.get('language', 'Unknown')}",
+                    engagement=repo.get("stargazers_count", 0)
+                )
             
             print(f"  ✅ {count} 条")
         except Exception as e:
@@ -574,10 +724,9 @@ class AIDigestGenerator:
         
         try:
             # 使用 Smithery.ai 官方 API 获取热门 MCP servers
-            r = requests.get(
+            r = self.http_get(
                 "https://registry.smithery.ai/servers?limit=10",
-                headers={"User-Agent": "Mozilla/5.0"},
-                timeout=30
+                headers={"User-Agent": "Mozilla/5.0"}
             )
             
             if r.status_code != 200:
@@ -596,16 +745,16 @@ class AIDigestGenerator:
                 use_count = server.get("useCount", 0)
                 desc = server.get("description", "MCP Server")
                 
-                self.all_items.append({
-                    "标题": name,
-                    "内容": desc[:200] if desc else "MCP 工具",
-                    "日期": self.today.isoformat(),
-                    "来源": "Smithery.ai",
-                    "板块": "MCP工具热门",
-                    "链接": server.get("homepage", f"https://smithery.ai/server/{server.get('qualifiedName', '')}"),
-                    "额外": f"🔥 {use_count:,} 使用次数 | {'✅ 官方验证' if server.get('verified') else ''}"
-                })
-                count += 1
+                count += self.add_item(
+                    title=name,
+                    content=desc[:200] if desc else "MCP 工具",
+                    published=self.today,
+                    source="Smithery.ai",
+                    section="MCP工具热门",
+                    url=server.get("homepage") or f"https://smithery.ai/server/{server.get('qualifiedName', '')}",
+                    extra=f"🔥 {use_count:,} 使用次数 | {'✅ 官方验证' if server.get('verified') else ''}",
+                    engagement=use_count
+                )
             
             print(f"  ✅ {count} 条")
         except Exception as e:
@@ -621,14 +770,13 @@ class AIDigestGenerator:
         # 方案1: Smithery API（需要 API Key）
         if smithery_key:
             try:
-                r = requests.get(
+                r = self.http_get(
                     "https://registry.smithery.ai/skills",
                     params={"limit": 10},
                     headers={
                         "Authorization": f"Bearer {smithery_key}",
                         "User-Agent": "Mozilla/5.0"
-                    },
-                    timeout=30
+                    }
                 )
                 
                 if r.status_code == 200:
@@ -643,16 +791,16 @@ class AIDigestGenerator:
                         use_count = skill.get("useCount", 0)
                         desc = skill.get("description", "AI Skill")
                         
-                        self.all_items.append({
-                            "标题": name,
-                            "内容": desc[:200] if desc else "AI Skill",
-                            "日期": self.today.isoformat(),
-                            "来源": "Smithery Skills",
-                            "板块": "AI Skills热门",
-                            "链接": skill.get("homepage", f"https://smithery.ai/skill/{skill.get('qualifiedName', '')}"),
-                            "额外": f"🔥 {use_count:,} 使用次数 | {'✅ 官方验证' if skill.get('verified') else ''}"
-                        })
-                        count += 1
+                        count += self.add_item(
+                            title=name,
+                            content=desc[:200] if desc else "AI Skill",
+                            published=self.today,
+                            source="Smithery Skills",
+                            section="AI Skills热门",
+                            url=skill.get("homepage") or f"https://smithery.ai/skill/{skill.get('qualifiedName', '')}",
+                            extra=f"🔥 {use_count:,} 使用次数 | {'✅ 官方验证' if skill.get('verified') else ''}",
+                            engagement=use_count
+                        )
                     
                     if count > 0:
                         print(f"  ✅ {count} 条（来自 Smithery API）")
@@ -666,14 +814,13 @@ class AIDigestGenerator:
         
         # 方案2: 尝试 skillsmp.com（GitHub Actions 环境应可访问）
         try:
-            r = requests.get(
+            r = self.http_get(
                 "https://skillsmp.com/api/skills",
                 params={"limit": 10, "sort": "popular"},
                 headers={
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
                     "Accept": "application/json"
-                },
-                timeout=30
+                }
             )
             
             if r.status_code == 200:
@@ -685,16 +832,16 @@ class AIDigestGenerator:
                     if not name:
                         continue
                     
-                    self.all_items.append({
-                        "标题": name,
-                        "内容": (skill.get("description") or "AI Skill")[:200],
-                        "日期": self.today.isoformat(),
-                        "来源": "SkillsMP",
-                        "板块": "AI Skills热门",
-                        "链接": skill.get("url") or skill.get("link") or f"https://skillsmp.com/skill/{skill.get('id', '')}",
-                        "额外": f"🔥 {skill.get('downloads', 0) or skill.get('uses', 0):,} 使用"
-                    })
-                    count += 1
+                    count += self.add_item(
+                        title=name,
+                        content=(skill.get("description") or "AI Skill")[:200],
+                        published=self.today,
+                        source="SkillsMP",
+                        section="AI Skills热门",
+                        url=skill.get("url") or skill.get("link") or f"https://skillsmp.com/skill/{skill.get('id', '')}",
+                        extra=f"🔥 {skill.get('downloads', 0) or skill.get('uses', 0):,} 使用",
+                        engagement=skill.get("downloads", 0) or skill.get("uses", 0)
+                    )
                 
                 if count > 0:
                     print(f"  ✅ {count} 条（来自 skillsmp.com）")
@@ -706,7 +853,7 @@ class AIDigestGenerator:
         
         # 方案2: GitHub 备用 - 搜索 agent skills 相关项目
         try:
-            r = requests.get(
+            r = self.http_get(
                 "https://api.github.com/search/repositories",
                 params={
                     "q": "awesome-chatgpt-prompts awesome-prompts prompt-engineering stars:>1000",
@@ -714,8 +861,8 @@ class AIDigestGenerator:
                     "order": "desc",
                     "per_page": 10
                 },
-                headers={"User-Agent": "Mozilla/5.0"},
-                timeout=30
+                key=endpoint_key("https://api.github.com/search/repositories", tag="skills"),
+                headers={"User-Agent": "Mozilla/5.0"}
             )
             
             if r.status_code != 200:
@@ -730,16 +877,16 @@ class AIDigestGenerator:
                 if not full_name:
                     continue
                 
-                self.all_items.append({
-                    "标题": full_name,
-                    "内容": (repo.get("description") or "AI Skills 项目")[:200],
-                    "日期": self.today.isoformat(),
-                    "来源": "GitHub Skills",
-                    "板块": "AI Skills热门",
-                    "链接": repo.get("html_url", f"https://github.com/{full_name}"),
-                    "额外": f"⭐ {repo.get('stargazers_count', 0):,} | 💻 {repo.get('language', 'Unknown')}"
-                })
-                count += 1
+                count += self.add_item(
+                    title=full_name,
+                    content=(repo.get("description") or "AI Skills 项目")[:200],
+                    published=self.today,
+                    source="GitHub Skills",
+                    section="AI Skills热门",
+                    url=repo.get("html_url") or f"https://github.com/{full_name}",
+                    extra=f"⭐ {repo.get('stargazers_count', 0):,} | 💻 {repo.get('language', 'Unknown')}",
+                    engagement=repo.get("stargazers_count", 0)
+                )
             
             print(f"  ✅ {count} 条（来自 GitHub 备用）")
         except Exception as e:
@@ -747,6 +894,7 @@ class AIDigestGenerator:
 
     # ==================== AI 处理 ====================
     
+    
     def clean_json(self, text):
         """清洗并提取有效的 JSON"""
         import re
@@ -799,8 +947,304 @@ class AIDigestGenerator:
                                 pass
         return None
 
-    def ai_process(self):
-        """AI 翻译和摘要（分批处理）"""
+    def translate_batch(self, client, batch):
+        """小模型翻译+摘要一个批次，返回 {id: 译文}（有英文版时同一次调用顺带英文摘要）"""
+        requirements = [
+            'Translate "标题" to Chinese as title_zh',
+            'Summarize "内容" to 60-80 Chinese characters as summary_zh',
+        ]
+        en_field = ""
+        if self.need_en:
+            requirements.append('Summarize "内容" to one English sentence (max 30 words) as summary_en')
+            en_field = ', "summary_en":"..."'
+        requirements += [
+            'Return every input "id" unchanged, one entry per input item',
+            "JSON Output ONLY.",
+        ]
+        numbered = "\n".join(f"{i}. {r}" for i, r in enumerate(requirements, 1))
+        prompt = f"""You are a JSON formatter. Process the following AI news data and return ONLY valid JSON.
+
+Input data:
+{dumps_prompt(batch, self.article_text)}
+
+Requirements:
+{numbered}
+
+Output Format:
+{{"items":[{{"id":"...", "title_zh":"...", "summary_zh":"..."{en_field}}}]}}
+"""
+        resp = self.governor.create(
+            client,
+            model=self.fast_model,
+            messages=[
+                {"role": "system", "content": "You are a JSON formatter. Return valid JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=min(TRANSLATION_MAX_TOKENS, BATCH_OVERHEAD + COMPLETION_CAP_PER_ITEM * len(batch)),
+            temperature=0.1
+        )
+        content = resp.choices[0].message.content.strip()
+        
+        # 使用增强的 JSON 解析
+        with profiler.stage("clean_json"):
+            result = self.clean_json(content)
+        if not result:
+            raise ValueError(f"解析彻底失败，原始内容预览: {content[:100]}...")
+        
+        # 按 id 收集译文（未知 id 直接忽略）
+        batch_ids = {it.id for it in batch}
+        return {
+            r["id"]: r for r in result.get("items", [])
+            if isinstance(r, dict) and r.get("id") in batch_ids
+        }
+
+    def _article_enricher(self):
+        """各批次共用一个补全器（共享缓存和下载预算，异步模式下会并发调用）"""
+        with self._enricher_lock:
+            if self._enricher is None:
+                cache = ArticleCache(self.data_dir / ".cache" / "articles", self.enrich_cache_bytes)
+                self._enricher = ArticleEnricher(cache, self.http_get, self.enrich_max_bytes, self.enrich_tokens)
+            return self._enricher
+
+    def enrich(self, items):
+        """下载原文补全 RSS 条目的正文，结果写入 self.article_text"""
+        todo = [it for it in items if it.section in ENRICH_SECTIONS and it.id not in self.article_text]
+        if not self.enrich_tokens or not todo:
+            return
+        enricher = self._article_enricher()
+        texts = enricher.enrich(todo)
+        self.article_text.update(texts)
+        print(f"  📄 正文补全 {len(texts)}/{len(todo)} 条（累计缓存命中 {enricher.hits}，下载 {enricher.downloaded // 1024} KB）")
+
+    def save_enrichment(self):
+        if self._enricher is not None:
+            self._enricher.cache.save()
+            self.health.save()
+
+    def analyze(self, client, categories, locale="zh", span="day"):
+        """强模型基于全部条目的一行摘要生成今日总结和趋势（span 为 week/month 时用于周报/月报）"""
+        default = {"summary": "Today's digest" if locale == "en" else "今日 AI 摘要", "trends": []}
+        heading = {"day": "today's news items", "week": "this week's top items", "month": "this month's top items"}[span]
+        # 存档里的条目（周报/月报直接送进来）可能没有 内容 或为 null
+        digest_lines = [
+            f"[{cat}] {it.get('标题', '')}：{(it.get('内容') or '')[:60]}"
+            for cat, items in categories.items() for it in items
+        ]
+        if not digest_lines:
+            return default
+        
+        # 预算不够时先换小模型，再不够就跳过
+        model = self.model
+        if not self.governor.affords(self.governor.analysis_cost(model)):
+            if self.fast_model != model and self.governor.affords(self.governor.analysis_cost(self.fast_model)):
+                self.governor.degrade(f"整体分析改用 {self.fast_model}")
+                model = self.fast_model
+            else:
+                self.governor.degrade("跳过整体分析")
+                return default
+        
+        print(f"  🧠 整体分析 ({model}，{len(digest_lines)} 条)...")
+        if locale == "en":
+            task = f"Write a 60-100 word English overview of the {span} and list 3-6 short English trend keywords."
+        else:
+            task = f"Write a 100-150 Chinese character overview of the {span} and list 3-6 short Chinese trend keywords."
+        prompt = f"""Below are {heading} (one per line).
+
+{chr(10).join(digest_lines)}
+
+{task}
+Return ONLY valid JSON: {{"summary":"...", "trends":["..."]}}
+"""
+        try:
+            with profiler.stage("llm:analyze"):
+                resp = self.governor.create(
+                    client,
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are an AI industry analyst. Return valid JSON only."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=1024,
+                    temperature=0.3
+                )
+            with profiler.stage("clean_json"):
+                result = self.clean_json(resp.choices[0].message.content.strip())
+            if isinstance(result, dict) and result.get("summary"):
+                return {"summary": result["summary"], "trends": result.get("trends", [])}
+            print("  ⚠️ 分析结果解析失败，使用默认摘要")
+        except Exception as e:
+            print(f"  ❌ 分析请求失败: {e}")
+        return default
+
+    def sources(self):
+        """所有数据源（名称, 抓取函数）"""
+        return [
+            ("RSS", self.fetch_rss),
+            ("YouTube博主", self.fetch_youtube_rss),
+            ("YouTube热门", self.fetch_youtube_trending),
+            ("Twitter热门", self.fetch_twitter),
+            ("Twitter账号", self.fetch_twitter_accounts),
+            ("TikTok", self.fetch_tiktok),
+            ("GitHub热门", self.fetch_github_trending),
+            ("AI Agent热门", self.fetch_github_agents),
+            ("MCP工具热门", self.fetch_github_mcp_tools),
+            ("AI Skills热门", self.fetch_github_ai_skills),
+            ("HuggingFace", self.fetch_huggingface_trending),
+            ("ModelScope", self.fetch_modelscope_trending),
+        ]
+
+    def collect(self):
+        """数据采集（每个独立，失败不影响其他）"""
+        self.collect_started = datetime.now(timezone.utc)
+        self.health.start_budget(self.collect_budget)
+        for name, func in self.sources():
+            self.safe_fetch(name, func)
+        self.report_health()
+        self.health.start_budget(0)  # 预算只约束采集阶段
+
+    def select_items(self):
+        """统一热度打分（只算一次），每个版本各自按关键词过滤后，每个板块取前15条、全局取前 N 条"""
+        scorer = EngagementScorer(self.state_dir)
+        scores = scorer.score(self.all_items, update=True)
+        scorer.save()
+        self.item_scores = {it.id: round(float(sc), 6) for it, sc in zip(self.all_items, scores)}
+        
+        widened = bool(self.editions)
+        selections = {}
+        for ed in [MAIN] + self.editions:
+            idx = [i for i, it in enumerate(self.all_items) if ed.accepts(it, widened)]
+            total = self.max_llm_items if ed.is_main else self.topic_max_items
+            selections[ed.key] = select_top([self.all_items[i] for i in idx], scores[idx],
+                                            per_section=15, total=total)
+        print(f"  打分筛选后: {len(selections[MAIN.key])}/{len(self.all_items)} 条 (每类最多15条，全局最多{self.max_llm_items}条)")
+        for ed in self.editions:
+            print(f"  📚 {ed.key}: {len(selections[ed.key])} 条")
+        return selections
+
+    def fit_budget(self, selections):
+        """预算不够时逐步减少每个板块送翻译的条目数（先为各版本的整体分析预留额度）"""
+        left = self.governor.remaining()
+        if left is None:
+            return selections
+        reserve = self.governor.analysis_cost(self.model) * (1 + len(self.editions))
+        text_tokens = {it.id: self.enrich_tokens for items in selections.values() for it in items
+                       if it.section in ENRICH_SECTIONS} if self.enrich_tokens else {}
+        
+        def cost(sel):
+            union = list({it.id: it for items in sel.values() for it in items}.values())
+            return self.governor.translation_cost(self.fast_model, union, text_tokens)
+        
+        limit, fitted = 15, selections
+        while cost(fitted) > 0 and cost(fitted) + reserve > left and limit > MIN_PER_SECTION:
+            limit -= 2
+            fitted = {k: trim_per_section(v, limit) for k, v in selections.items()}
+        before, after = (sum(len(v) for v in sel.values()) for sel in (selections, fitted))
+        if after < before:
+            self.governor.degrade(f"每个板块最多翻译 {limit} 条（{before} → {after} 条，"
+                                  f"预估 ¥{cost(fitted):.3f}，剩余 ¥{left:.3f}）")
+        return fitted
+
+    def edition_dirs(self, edition):
+        """版本的数据目录和状态目录（主日报为 data/ 本身）"""
+        if edition.is_main:
+            return self.data_dir, self.state_dir
+        return self.data_dir / edition.key, self.state_dir / edition.key
+
+    def category_index(self):
+        """各版本共用一个分类索引"""
+        if self._category_index is None:
+            self._category_index = CategoryIndex(self.data_dir, self.state_dir).load_or_build()
+        return self._category_index
+
+    def localize(self, selected, translations, edition=MAIN):
+        """按 id 拼回原字段，返回 [(分类, 输出条目)]（保持分数顺序）"""
+        outputs = []
+        missing = 0
+        for item in selected:
+            out = item.to_dict()
+            t = translations.get(item.id)
+            if not t:
+                missing += 1  # 模型漏掉的条目保留原文
+            elif edition.locale == "en":
+                out["内容"] = t.get("summary_en") or out["内容"]  # 标题保留原文
+            else:
+                out["标题"] = t.get("title_zh") or out["标题"]
+                out["内容"] = t.get("summary_zh") or out["内容"]
+            outputs.append(out)
+        if missing:
+            print(f"  ⚠️ {missing} 条未返回译文，保留原文")
+        
+        cats = self.category_index().categorize(
+            [it.section for it in selected],
+            [f"{o['标题']} {o['内容']}" for o in outputs]
+        )
+        return [(edition.category(cat), out) for cat, out in zip(cats, outputs)]
+
+    def merge(self, client, selected, translations, edition=MAIN):
+        """本地分类，整体分析和趋势信号"""
+        # 按分数顺序，每类最多10条
+        localized = self.localize(selected, translations, edition)
+        outputs = [out for _, out in localized]
+        final_categories = {}
+        for cat, out in localized:
+            bucket = final_categories.setdefault(cat, [])
+            if len(bucket) < 10:
+                bucket.append(out)
+        
+        # 第二层：强模型基于全部条目的精简摘要做一次整体分析
+        final_analysis = self.analyze(client, final_categories, edition.locale)
+        
+        # 趋势信号：基于历史存档的实体突发度（本地计算，不走 LLM）
+        data_dir, state_dir = self.edition_dirs(edition)
+        engine = TrendEngine(data_dir, state_dir)
+        engine.update(self.today_str, outputs)
+        engine.save()
+        final_analysis["trend_signals"] = engine.top(self.today_str)
+        
+        result = {
+            "date": self.today_str,
+            "categories": final_categories,
+            "analysis": final_analysis
+        }
+        if not edition.is_main:
+            result.update(topic=edition.topic.key, locale=edition.locale, title=edition.title)
+        return result
+
+    def add_usage(self, usage):
+        """已有的用量 + 本次运行的用量（日内增量更新累加到同一份日报上，检查点续跑累加中断前的用量）"""
+        run = self.governor.summary()
+        if not usage:
+            return run
+        total = {k: usage.get(k, 0) + run[k] for k in ("prompt_tokens", "completion_tokens", "calls")}
+        total["cost_cny"] = round(usage.get("cost_cny", 0) + run["cost_cny"], 4)
+        degraded = usage.get("degraded", []) + [d for d in run.get("degraded", []) if d not in usage.get("degraded", [])]
+        if degraded:
+            total["degraded"] = degraded
+        return total
+
+    def write_fallback(self, fallback):
+        """出错时当日文件和 latest.json 都写错误占位，网页显示错误信息（今日已有正常日报时保留不动）"""
+        today_file = self.data_dir / f"digest_{self.today_str}.json"
+        if not load_state(today_file, {"error": True}).get("error"):
+            print(f"  ⚠️ 今日已有日报，保留 {today_file}，不写错误占位")
+            return
+        with profiler.stage("write_json"):
+            write_digest(self.data_dir, fallback)
+
+    def write_output(self, result, data_dir=None):
+        """校验后原子写出当日文件和 latest.json（只序列化一次，两个文件字节相同）"""
+        with profiler.stage("write_json"):
+            write_digest(data_dir or self.data_dir, result)
+        
+        total = sum(len(v) for v in result.get("categories", {}).values())
+        label = f"{result['topic']}:{result['locale']}" if result.get("topic") else "主日报"
+        print(f"  ✅ {label} 完成，共 {total} 条（每分类最多10条）")
+        if usage := result.get("usage"):
+            tokens = usage["prompt_tokens"] + usage["completion_tokens"]
+            print(f"  💰 LLM 用量: {usage['calls']} 次调用，{tokens:,} tokens，约 ¥{usage['cost_cny']:.4f}")
+
+    def ai_process(self, ckpt):
+        """AI 翻译和摘要（分批处理，每个阶段/批次写检查点）"""
         if not self.siliconflow_key:
             error_msg = "❌ 未配置 SILICONFLOW_API_KEY，无法进行 AI 处理"
             print(f"\n{error_msg}")
@@ -809,48 +1253,47 @@ class AIDigestGenerator:
             fallback = {
                 "date": self.today_str,
                 "error": error_msg,
-                "categories": {"原始数据": self.all_items[:5]},
+                "categories": {"原始数据": [it.to_dict() for it in self.all_items[:5]]},
                 "analysis": {
                     "summary": "⚠️ 未配置 API Key，请在 GitHub Secrets 中添加 SILICONFLOW_API_KEY（显示前5条）",
                     "trends": []
                 }
             }
-            (self.data_dir / "latest.json").write_text(
-                json.dumps(fallback, ensure_ascii=False, indent=2), encoding="utf-8")
+            self.write_fallback(fallback)
             return fallback
         
         if not self.all_items:
             print("\n⚠️ 没有数据")
             return None
         
-        print(f"\n🤖 AI 处理 ({self.model})...")
+        print(f"\n🤖 AI 处理 (翻译 {self.fast_model} / 分析 {self.model})...")
         
         try:
-            # 1. 预处理：按分类分组并限制数量（减少输入 token）
-            # 每个分类最多取前15条发给 AI 筛选
-            grouped = {}
-            for item in self.all_items:
-                cat = item.get("板块", "其他")
-                if cat not in grouped:
-                    grouped[cat] = []
-                if len(grouped[cat]) < 15:
-                    grouped[cat].append(item)
-            
-            filtered_items = []
-            for items in grouped.values():
-                filtered_items.extend(items)
-                
-            print(f"  无需处理的数据: {len(self.all_items) - len(filtered_items)} 条 (每类限制15条输入)")
-            
-            # 2. 分批处理
-            print(f"  无需处理的数据: {len(self.all_items) - len(filtered_items)} 条 (每类限制15条输入)")
+            by_id = {it.id: it for it in self.all_items}
+            # 中断前已完成的调用的用量（随批次/合并检查点保存），续跑时加回本次运行的用量
+            prior_usage = ckpt.load("usage") if ckpt.has("usage") else None
             
-            # 2. 分批处理
-            BATCH_SIZE = 15  # 降低 Batch Size 防止截断
-            batches = [filtered_items[i:i + BATCH_SIZE] for i in range(0, len(filtered_items), BATCH_SIZE)]
+            # 1. 打分筛选（主日报 + 各版本）
+            if ckpt.has("select"):
+                selections = {k: [by_id[i] for i in ids if i in by_id]
+                              for k, ids in ckpt.load("select").items()}
+                print(f"  ♻️ 复用筛选结果: {len(selections.get(MAIN.key, []))} 条")
+            else:
+                with profiler.stage("select"):
+                    selections = self.fit_budget(self.select_items())
+                ckpt.save("select", {k: [it.id for it in v] for k, v in selections.items()})
             
-            final_categories = {}
-            final_analysis = {"summary": "今日 AI 摘要", "trends": []}
+            # 2. 分批（各版本选中条目的并集，重复条目只翻译一次）
+            if ckpt.has("batches"):
+                batches = [[by_id[i] for i in ids if i in by_id] for ids in ckpt.load("batches")]
+            else:
+                union = list({it.id: it for items in selections.values() for it in items}.values())
+                if self.editions:
+                    total = sum(len(v) for v in selections.values())
+                    print(f"  📚 各版本共 {total} 条，去重后翻译 {len(union)} 条")
+                BATCH_SIZE = 15  # 降低 Batch Size 防止截断
+                batches = [union[i:i + BATCH_SIZE] for i in range(0, len(union), BATCH_SIZE)]
+                ckpt.save("batches", [[it.id for it in b] for b in batches])
             
             from openai import OpenAI
             client = OpenAI(
@@ -858,82 +1301,64 @@ class AIDigestGenerator:
                 base_url="https://api.siliconflow.cn/v1"
             )
 
-            for i, batch in enumerate(batches):
-                print(f"  🔄 处理批次 {i+1}/{len(batches)} ({len(batch)} 条)...")
-                
-                prompt = f"""You are a JSON formatter. Process the following AI news data and return ONLY valid JSON.
-
-Input data:
-{json.dumps(batch, ensure_ascii=False)}
-
-Requirements:
-1. Translate English to Chinese
-2. Summarize content to 60-80 Chinese characters
-3. Group by category
-4. Keep "额外" field
-5. JSON Output ONLY.
-
-Output Format:
-{{"categories":{{"CategoryName":[{{ "标题":"...", "内容":"...", "链接":"...", "日期":"...", "来源":"...", "额外":"..." }}]}}, "analysis":{{"summary":"...", "trends":["..."]}}}}
-"""
+            # 3. 第一层：小模型并发翻译+摘要（已完成的批次直接复用）
+            translations = {}  # id -> {"title_zh", "summary_zh"}
+            pending = []
+            for i in range(len(batches)):
+                if ckpt.has(f"batch_{i}"):
+                    translations.update(ckpt.load(f"batch_{i}"))
+                else:
+                    pending.append(i)
+            if len(pending) < len(batches):
+                print(f"  ♻️ 复用已完成批次: {len(batches) - len(pending)}/{len(batches)}")
+            
+            with profiler.stage("enrich"):
+                self.enrich([it for i in pending for it in batches[i]])
+                self.save_enrichment()
+            
+            print(f"  ⚡ 翻译摘要 ({self.fast_model}，并发 {self.llm_concurrency})...")
+            with ThreadPoolExecutor(max_workers=self.llm_concurrency) as pool:
+                futures = {i: pool.submit(profiler.wrap(f"llm:batch_{i+1}", self.translate_batch), client, batches[i])
+                           for i in pending}
+                for i, future in futures.items():
+                    try:
+                        batch_result = future.result()
+                        ckpt.save(f"batch_{i}", batch_result)
+                        ckpt.save("usage", self.add_usage(prior_usage))
+                        translations.update(batch_result)
+                        print(f"  🔄 批次 {i+1}/{len(batches)} 完成 ({len(batches[i])} 条)")
+                    except Exception as e:
+                        print(f"  ❌ 批次 {i+1} 请求失败: {e}")
 
+            # 4. 合并（每个版本一次本地分类 + 一次整体分析）
+            result = None
+            for ed in [MAIN] + self.editions:
+                stage = f"merge_{ed.key}" if ed.key else "merge"
+                selected = selections.get(ed.key, [])
+                if not ed.is_main and not selected:
+                    print(f"  ⚠️ {ed.key}: 没有匹配的条目，跳过")
+                    continue
                 try:
-                    resp = client.chat.completions.create(
-                        model=self.model,
-                        messages=[
-                            {"role": "system", "content": "You are a JSON formatter. Return valid JSON only."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=8192,
-                        temperature=0.1
-                    )
-                    
-                    content = resp.choices[0].message.content.strip()
-                    
-                    # 使用增强的 JSON 解析
-                    batch_result = self.clean_json(content)
+                    if ckpt.has(stage):
+                        merged = ckpt.load(stage)
+                        print(f"  ♻️ 复用合并结果{f' ({ed.key})' if ed.key else ''}")
+                    else:
+                        with profiler.stage(f"merge:{ed.key or 'main'}"):
+                            merged = self.merge(client, selected, translations, ed)
+                        ckpt.save(stage, merged)
+                        ckpt.save("usage", self.add_usage(prior_usage))
                     
-                    if not batch_result:
-                        print(f"  ❌ 批次 {i+1} 解析彻底失败，原始内容预览: {content[:100]}...")
-                        continue
-
-                    # 合并结果
-                    if batch_result:
-                        # 合并分类
-                        cats = batch_result.get("categories", {})
-                        for cat_name, items in cats.items():
-                            if cat_name not in final_categories:
-                                final_categories[cat_name] = []
-                            final_categories[cat_name].extend(items)
-                        
-                        # 仅使用第一批的分析结果（通常包含新闻）
-                        if i == 0 and "analysis" in batch_result:
-                            final_analysis = batch_result["analysis"]
-                            
+                    # 5. 保存（主日报附带本次运行的 LLM 用量和成本，含中断前已花掉的部分）
+                    if ed.is_main:
+                        merged["usage"] = self.add_usage(prior_usage)
+                    self.write_output(merged, self.edition_dirs(ed)[0])
                 except Exception as e:
-                    print(f"  ❌ 批次 {i+1} 请求失败: {e}")
-
-            # 3. 最终组装
-            result = {
-                "date": self.today_str,
-                "categories": final_categories,
-                "analysis": final_analysis
-            }
-            
-            # 再次确保每类不超过10条
-            total = 0
-            for cat in result["categories"]:
-                result["categories"][cat] = result["categories"][cat][:10]
-                total += len(result["categories"][cat])
-            
-            # 保存
-            (self.data_dir / f"digest_{self.today_str}.json").write_text(
-                json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
-            (self.data_dir / "latest.json").write_text(
-                json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
-            
-            total = sum(len(v) for v in result.get("categories", {}).values())
-            print(f"  ✅ 完成，共 {total} 条（每分类最多10条）")
+                    if ed.is_main:
+                        raise
+                    print(f"  ❌ {ed.key} 生成失败: {e}")  # 额外版本失败不影响主日报
+                    continue
+                if ed.is_main:
+                    result = merged
             return result
             
         except Exception as e:
@@ -945,44 +1370,188 @@ Output Format:
             fallback = {
                 "date": self.today_str,
                 "error": error_msg,
-                "categories": {"原始数据": self.all_items[:5]},
+                "categories": {"原始数据": [it.to_dict() for it in self.all_items[:5]]},
                 "analysis": {
                     "summary": f"⚠️ AI 处理失败，显示原始数据（前5条）。错误：{str(e)}",
                     "trends": []
                 }
             }
-            (self.data_dir / "latest.json").write_text(
-                json.dumps(fallback, ensure_ascii=False, indent=2), encoding="utf-8")
+            self.write_fallback(fallback)
             return fallback
 
-    def run(self):
+    def checkpoints(self, fresh=False):
+        """今日检查点目录（fresh=True 时先清空）"""
+        ckpt = CheckpointStore(self.data_dir / ".checkpoints" / self.today_str)
+        if fresh:
+            ckpt.clear()
+        elif ckpt.stages():
+            print(f"♻️ 发现今日检查点，继续上次运行: {', '.join(ckpt.stages())}")
+        return ckpt
+
+    def collect_stage(self, ckpt):
+        """数据采集（已有检查点则直接复用）"""
+        if ckpt.has("collect"):
+            self.all_items = [DigestItem(**r) for r in ckpt.load("collect")]
+            print(f"\n📦 复用已采集数据 {len(self.all_items)} 条")
+        else:
+            self.collect()
+            ckpt.save("collect", [it.to_record() for it in self.all_items])
+            print(f"\n📦 共采集 {len(self.all_items)} 条")
+
+    def process_stage(self, ckpt):
+        """AI 处理并写出，成功后清理检查点（同日再次手动运行会重新采集）"""
+        result = self.ai_process(ckpt)
+        if result and not result.get("error"):
+            self.commit_run(ckpt)
+        return result
+
+    def commit_run(self, ckpt):
+        """日报写出成功后：清理检查点，记录增量水位（本次采集到的条目在日内更新中不再重复处理），推进 Twitter 游标"""
+        ckpt.clear()
+        mark = DigestWatermark(self.state_dir, self.today_str)
+        mark.advance(self.all_items, self.collect_started, self.item_scores)
+        mark.save()
+        self.commit_twitter()
+
+    def commit_twitter(self, retry_urls=()):
+        """日报落盘后再推进 Twitter 游标（检查点续跑时从状态文件里的 pending 推进）"""
+        if self.twitter_key:
+            fetcher = self._twitter_fetcher()
+            fetcher.commit(self._twitter_boundary(), retry_urls)
+            fetcher.save()
+
+    def run(self, fresh=False):
         print("=" * 50)
         print(f"🚀 AI 资讯聚合器 - {self.today_str}")
         print("=" * 50)
+        self.print_status()
         
-        # 数据采集（每个独立，失败不影响其他）
-        self.safe_fetch("RSS", self.fetch_rss)
-        self.safe_fetch("YouTube博主", self.fetch_youtube_rss)
-        self.safe_fetch("YouTube热门", self.fetch_youtube_trending)
-        self.safe_fetch("Twitter热门", self.fetch_twitter)
-        self.safe_fetch("Twitter账号", self.fetch_twitter_accounts)
-        self.safe_fetch("TikTok", self.fetch_tiktok)
-        self.safe_fetch("GitHub热门", self.fetch_github_trending)
-        self.safe_fetch("AI Agent热门", self.fetch_github_agents)
-        self.safe_fetch("MCP工具热门", self.fetch_github_mcp_tools)
-        self.safe_fetch("AI Skills热门", self.fetch_github_ai_skills)
-        self.safe_fetch("HuggingFace", self.fetch_huggingface_trending)
-        self.safe_fetch("ModelScope", self.fetch_modelscope_trending)
-        
-        print(f"\n📦 共采集 {len(self.all_items)} 条")
-        
-        # AI 处理
-        result = self.ai_process()
+        ckpt = self.checkpoints(fresh)
+        self.collect_stage(ckpt)
+        result = self.process_stage(ckpt)
         
         print("\n" + "=" * 50)
         print("✨ 完成!")
         return result
 
 
+    def run_incremental(self):
+        """日内增量更新：只处理水位之后的新条目，并入今日 digest"""
+        print("=" * 50)
+        print(f"🚀 AI 资讯聚合器（增量更新）- {self.today_str}")
+        print("=" * 50)
+        self.print_status()
+        
+        today_file = self.data_dir / f"digest_{self.today_str}.json"
+        if not today_file.exists():
+            print("\n⚠️ 今日还没有日报，改为完整运行")
+            return self.run()
+        if not self.siliconflow_key:
+            print("\n❌ 未配置 SILICONFLOW_API_KEY，跳过增量更新")
+            return None
+        if self.editions:
+            print("⚠️ 增量更新只更新主日报，额外版本在每日完整运行时生成")
+        
+        digest = json.loads(today_file.read_text(encoding="utf-8"))
+        if digest.get("error"):
+            print("\n⚠️ 今日日报是错误占位，改为完整运行")
+            return self.run(fresh=True)
+        
+        mark = DigestWatermark(self.state_dir, self.today_str)
+        known = {v for items in digest.get("categories", {}).values() for it in items
+                 for v in (it.get("id"), it.get("链接"))}
+        self.collect()
+        fresh = mark.fresh(self.all_items, known)
+        print(f"\n📦 共采集 {len(self.all_items)} 条，水位之后的新条目 {len(fresh)} 条")
+        
+        widened = bool(self.editions)
+        fresh = [it for it in fresh if MAIN.accepts(it, widened)]
+        if not fresh:
+            mark.advance(self.all_items, self.collect_started)
+            mark.save()
+            self.commit_twitter()
+            print("\n✨ 没有新条目，日报保持不变")
+            return digest
+        
+        scorer = EngagementScorer(self.state_dir)
+        scores = scorer.score(fresh)
+        picked = select_top(fresh, scores, per_section=15, total=self.max_llm_items)
+        selected = self.fit_budget({MAIN.key: picked})[MAIN.key]
+        new_scores = {it.id: round(float(sc), 6) for it, sc in zip(fresh, scores)}
+        
+        from openai import OpenAI
+        client = OpenAI(
+            api_key=self.siliconflow_key,
+            base_url="https://api.siliconflow.cn/v1"
+        )
+        
+        self.enrich(selected)
+        self.save_enrichment()
+        print(f"\n🤖 增量翻译 {len(selected)} 条 ({self.fast_model})...")
+        BATCH_SIZE = 15
+        batches = [selected[i:i + BATCH_SIZE] for i in range(0, len(selected), BATCH_SIZE)]
+        translations = {}
+        with ThreadPoolExecutor(max_workers=self.llm_concurrency) as pool:
+            futures = [pool.submit(profiler.wrap(f"llm:batch_{i+1}", self.translate_batch), client, b)
+                       for i, b in enumerate(batches)]
+            for i, future in enumerate(futures):
+                try:
+                    translations.update(future.result())
+                except Exception as e:
+                    print(f"  ❌ 批次 {i+1} 请求失败: {e}")
+        
+        # 没拿到译文的条目（批次失败或模型漏掉）不以原文并入，下次更新重试
+        additions = {}
+        for cat, out in self.localize([it for it in selected if it.id in translations], translations):
+            additions.setdefault(cat, []).append(out)
+        scores_all = {**mark.scores, **new_scores}
+        categories, changed = merge_delta(digest.get("categories", {}), additions, scores_all)
+        print(f"  🔀 并入新条目，变化的分类: {', '.join(changed) or '无'}")
+        
+        # 翻译批次失败、模型漏掉、因预算被裁掉的条目不计入水位，下次更新重试（发布时间早于水位宽限期后
+        # 自然不再参与）；已翻译但排名没进前 10、没被热度筛选选中的条目计入水位，不再重复付费
+        retry = {it.id for it in picked if it.id not in translations}
+        if retry:
+            print(f"  ↩️ {len(retry)} 条未翻译（批次失败、模型漏掉或预算不够），下次更新重试")
+        mark.advance([it for it in self.all_items if it.id not in retry], self.collect_started, new_scores)
+        if changed:
+            digest["categories"] = categories
+            outputs = [it for items in categories.values() for it in items]
+            # 整体分析只在新并入条目足够多时重做（失败时保留原分析），趋势信号本地重算
+            added = sum(1 for it in outputs if it.get("id") in new_scores)
+            print(f"  ➕ 新并入 {added} 条")
+            if added >= REANALYZE_MIN_NEW:
+                analysis = self.analyze(client, categories)
+                if analysis.get("trends"):
+                    digest["analysis"].update(analysis)
+            engine = TrendEngine(self.data_dir, self.state_dir)
+            engine.update(self.today_str, outputs)
+            engine.save()
+            digest["analysis"]["trend_signals"] = engine.top(self.today_str)
+            digest["updated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        if changed or self.governor.run["calls"]:
+            # 没有并入任何条目时也记下本次花掉的用量
+            digest["usage"] = self.add_usage(digest.get("usage"))
+            self.write_output(digest)
+        mark.save()
+        self.commit_twitter(it.url for it in fresh if it.id in retry)
+        
+        print("\n" + "=" * 50)
+        print("✨ 完成!")
+        return digest
+
+
 if __name__ == "__main__":
-    AIDigestGenerator().run()
+    if "--profile" in sys.argv:
+        profiler.start(profile_dir("digest"))
+    generator = AIDigestGenerator()
+    try:
+        if "--incremental" in sys.argv:
+            generator.run_incremental()
+        elif "--async" in sys.argv:
+            from async_pipeline import AsyncDigestPipeline
+            AsyncDigestPipeline(generator).run()
+        else:
+            generator.run(fresh="--fresh" in sys.argv)
+    finally:
+        profiler.finish()
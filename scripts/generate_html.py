@@ -1,58 +1,97 @@
 #!/usr/bin/env python3
-"""HTML 报告生成器"""
+"""
+HTML 报告生成器
+- 样式表按内容哈希写成 docs/assets/digest.<哈希>.css，所有页面共用（浏览器长期缓存）
+- 页面压缩空白后输出，并为每个页面写 .gz / .br 预压缩副本（装了 brotli 才写 .br）
+- 每次构建结束打印站点总大小
+- 主日报同时输出 Atom / JSON Feed 订阅源（docs/feed.xml、docs/feed.json，见 feeds.py）
+"""
 
+import gzip
+import hashlib
 import json
+import os
+import re
+import sys
 from datetime import datetime
 from pathlib import Path
-from jinja2 import Template
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
+
+from digest_io import latest_path
+from feeds import FEED_DAYS, FeedWindow, write_feeds
+from profiling import profile_dir, profiler
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 所有页面共用的样式表（内容哈希命名，见 write_css）
+CSS = """
+:root { --primary: #6366f1; --bg: #0f172a; --card: #1e293b; --text: #e2e8f0; --muted: #94a3b8; }
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; background: var(--bg); color: var(--text); line-height: 1.6; }
+.container { max-width: 1200px; margin: 0 auto; padding: 20px; }
+header { background: linear-gradient(135deg, #6366f1, #8b5cf6); padding: 40px 20px; text-align: center; border-radius: 16px; margin-bottom: 30px; }
+h1 { font-size: 2em; margin-bottom: 10px; }
+.summary { background: var(--card); border-radius: 12px; padding: 25px; margin-bottom: 30px; border-left: 4px solid var(--primary); }
+.summary h2 { color: var(--primary); margin-bottom: 15px; }
+.trends { display: flex; flex-wrap: wrap; gap: 10px; margin-top: 15px; }
+.trend { background: rgba(99,102,241,0.2); color: var(--primary); padding: 6px 14px; border-radius: 20px; font-size: 0.9em; }
+.signals { display: grid; grid-template-columns: repeat(auto-fill, minmax(220px, 1fr)); gap: 8px 20px; margin-top: 20px; font-size: 0.85em; color: var(--muted); }
+.signal { display: flex; align-items: center; justify-content: space-between; gap: 10px; }
+.signal svg { flex: none; stroke: var(--primary); fill: none; stroke-width: 1.5; }
+.section { margin-bottom: 40px; }
+.section-title { font-size: 1.5em; margin-bottom: 20px; padding-left: 15px; border-left: 4px solid var(--primary); }
+.grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 20px; }
+.card { display: block; color: inherit; background: var(--card); border-radius: 10px; padding: 20px; border: 1px solid #334155; transition: all 0.2s; }
+.card:hover { transform: translateY(-3px); border-color: var(--primary); }
+.card-title { font-size: 1.1em; font-weight: 600; margin-bottom: 10px; }
+.card-content { color: var(--muted); font-size: 0.95em; margin-bottom: 15px; }
+.card-content.extra { color: #fbbf24; }
+.card-meta { display: flex; justify-content: space-between; font-size: 0.85em; color: var(--muted); padding-top: 15px; border-top: 1px solid #334155; }
+.source { color: var(--primary); font-weight: 500; }
+footer { text-align: center; padding: 40px 20px; color: var(--muted); }
+a { color: var(--primary); text-decoration: none; }
+@media (max-width: 768px) { .grid { grid-template-columns: 1fr; } h1 { font-size: 1.5em; } }
+"""
 
 TEMPLATE = """<!DOCTYPE html>
-<html lang="zh-CN">
+<html lang="{{ t.lang }}">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{ date }} AI 资讯日报</title>
-    <style>
-        :root { --primary: #6366f1; --bg: #0f172a; --card: #1e293b; --text: #e2e8f0; --muted: #94a3b8; }
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; background: var(--bg); color: var(--text); line-height: 1.6; }
-        .container { max-width: 1200px; margin: 0 auto; padding: 20px; }
-        header { background: linear-gradient(135deg, #6366f1, #8b5cf6); padding: 40px 20px; text-align: center; border-radius: 16px; margin-bottom: 30px; }
-        h1 { font-size: 2em; margin-bottom: 10px; }
-        .summary { background: var(--card); border-radius: 12px; padding: 25px; margin-bottom: 30px; border-left: 4px solid var(--primary); }
-        .summary h2 { color: var(--primary); margin-bottom: 15px; }
-        .trends { display: flex; flex-wrap: wrap; gap: 10px; margin-top: 15px; }
-        .trend { background: rgba(99,102,241,0.2); color: var(--primary); padding: 6px 14px; border-radius: 20px; font-size: 0.9em; }
-        .section { margin-bottom: 40px; }
-        .section-title { font-size: 1.5em; margin-bottom: 20px; padding-left: 15px; border-left: 4px solid var(--primary); }
-        .grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 20px; }
-        .card { background: var(--card); border-radius: 10px; padding: 20px; border: 1px solid #334155; transition: all 0.2s; cursor: pointer; }
-        .card:hover { transform: translateY(-3px); border-color: var(--primary); }
-        .card-title { font-size: 1.1em; font-weight: 600; margin-bottom: 10px; }
-        .card-content { color: var(--muted); font-size: 0.95em; margin-bottom: 15px; }
-        .card-meta { display: flex; justify-content: space-between; font-size: 0.85em; color: var(--muted); padding-top: 15px; border-top: 1px solid #334155; }
-        .source { color: var(--primary); font-weight: 500; }
-        footer { text-align: center; padding: 40px 20px; color: var(--muted); }
-        a { color: var(--primary); text-decoration: none; }
-        @media (max-width: 768px) { .grid { grid-template-columns: 1fr; } h1 { font-size: 1.5em; } }
-    </style>
+    <title>{{ date }} {{ title }}</title>
+    <link rel="stylesheet" href="{{ css_href }}">
+    <link rel="alternate" type="application/atom+xml" title="Atom" href="{{ feed_href }}feed.xml">
+    <link rel="alternate" type="application/feed+json" title="JSON Feed" href="{{ feed_href }}feed.json">
 </head>
 <body>
     <div class="container">
         <header>
-            <h1>🤖 AI 资讯日报</h1>
+            <h1>{{ title }}</h1>
             <div>{{ date }}</div>
         </header>
 
         {% if analysis %}
         <div class="summary" style="{% if '⚠️' in analysis.summary or 'AI 处理失败' in analysis.summary %}background: #7f1d1d; border-color: #ef4444;{% endif %}">
-            <h2>{% if '⚠️' in analysis.summary %}⚠️ 错误信息{% else %}📝 今日摘要{% endif %}</h2>
+            <h2>{% if '⚠️' in analysis.summary %}⚠️ {{ t.error }}{% else %}📝 {{ t.summary }}{% endif %}</h2>
             <p style="{% if '⚠️' in analysis.summary %}color: #fca5a5; font-weight: bold;{% endif %}">{{ analysis.summary }}</p>
             {% if analysis.trends %}
             <div class="trends">
                 {% for t in analysis.trends %}<span class="trend">{{ t }}</span>{% endfor %}
             </div>
             {% endif %}
+            {% if analysis.trend_signals %}
+            <div class="signals">
+                {% for s in analysis.trend_signals %}
+                <div class="signal" title="{{ t.signal.format(count=s.count, score=s.score) }}">
+                    <span>{{ '📦' if s.kind == 'repo' else '🧠' if s.kind == 'model' else '🔹' }} {{ s.name }}</span>
+                    <svg width="60" height="16" viewBox="0 0 60 16"><polyline points="{{ s.sparkline | sparkline }}"/></svg>
+                </div>
+                {% endfor %}
+            </div>
+            {% endif %}
         </div>
         {% endif %}
 
@@ -62,15 +101,15 @@ TEMPLATE = """<!DOCTYPE html>
             <h2 class="section-title">{{ category }}</h2>
             <div class="grid">
                 {% for item in items %}
-                <div class="card" onclick="window.open('{{ item.链接 }}', '_blank')">
+                <a class="card" href="{{ item.链接 }}" target="_blank" rel="noopener">
                     <div class="card-title">{{ item.标题 }}</div>
                     {% if item.内容 %}<div class="card-content">{{ item.内容[:150] }}...</div>{% endif %}
-                    {% if item.get('额外') %}<div class="card-content" style="color: #fbbf24;">{{ item.额外 }}</div>{% endif %}
+                    {% if item.get('额外') %}<div class="card-content extra">{{ item.额外 }}</div>{% endif %}
                     <div class="card-meta">
                         <span class="source">{{ item.来源 }}</span>
                         <span>{{ item.日期[:10] if item.日期 else '' }}</span>
                     </div>
-                </div>
+                </a>
                 {% endfor %}
             </div>
         </div>
@@ -78,41 +117,216 @@ TEMPLATE = """<!DOCTYPE html>
         {% endfor %}
 
         <footer>
-            <p>🤖 由 GitHub Actions + Claude AI 自动生成</p>
-            <p>更新时间：{{ update_time }}</p>
+            <p>🤖 {{ t.footer }}</p>
+            <p>{{ t.updated }}{{ update_time }}</p>
         </footer>
     </div>
 </body>
 </html>"""
 
 
-def main():
-    data_dir = Path("data")
-    docs_dir = Path("docs")
-    docs_dir.mkdir(exist_ok=True)
-    
-    latest_file = data_dir / "latest.json"
-    if not latest_file.exists():
-        print("❌ 没有数据文件")
-        return
-    
-    with open(latest_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    template = Template(TEMPLATE)
-    html = template.render(
+# 页面文字（按 digest 的 locale 选择）
+LABELS = {
+    "zh": {
+        "lang": "zh-CN",
+        "title": "🤖 AI 资讯日报",
+        "summary": "今日摘要",
+        "error": "错误信息",
+        "signal": "今日 {count} 次 | 突发度 {score}",
+        "footer": "由 GitHub Actions + Claude AI 自动生成",
+        "updated": "更新时间：",
+    },
+    "en": {
+        "lang": "en",
+        "title": "🤖 AI Daily Digest",
+        "summary": "Today's Summary",
+        "error": "Error",
+        "signal": "{count} mentions today | burst {score}",
+        "footer": "Generated by GitHub Actions + Claude AI",
+        "updated": "Updated: ",
+    },
+}
+
+
+def sparkline(values, width=60, height=16):
+    """计数序列 → SVG polyline 坐标"""
+    if not values:
+        return ""
+    top = max(values) or 1
+    step = width / max(len(values) - 1, 1)
+    return " ".join(
+        f"{i * step:.1f},{height - 1 - (v / top) * (height - 2):.1f}" for i, v in enumerate(values)
+    )
+
+
+_template = None
+
+
+def get_template():
+    """编译一次模板，重复渲染（rebuild）时复用；编译结果缓存到临时目录，下次启动直接加载"""
+    global _template
+    if _template is None:
+        env = Environment(
+            loader=DictLoader({"digest.html": TEMPLATE}),
+            bytecode_cache=FileSystemBytecodeCache()
+        )
+        env.filters["sparkline"] = sparkline
+        _template = env.get_template("digest.html")
+    return _template
+
+
+def minify_css(css):
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_html(html):
+    """去掉标签之间的空白、把连续空白压成一个空格（页面里没有 <pre>/<textarea>，不影响显示）"""
+    html = re.sub(r">\s+<", "><", html)
+    return re.sub(r"\s{2,}", " ", html).strip()
+
+
+def write_css(docs_dir):
+    """写共享样式表（文件名带内容哈希，已存在就跳过；旧哈希的文件保留给存档页面用）"""
+    css = minify_css(CSS).encode("utf-8")
+    digest = hashlib.blake2b(css, digest_size=8).hexdigest()
+    path = docs_dir / "assets" / f"digest.{digest}.css"
+    if not path.exists():
+        write_compressed(path, css)
+    return path
+
+
+def write_compressed(path, data):
+    """写文件本身和 .gz / .br 预压缩副本"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    # mtime=0：内容不变时 .gz 字节也不变，避免无意义的 git 变更
+    Path(f"{path}.gz").write_bytes(gzip.compress(data, 9, mtime=0))
+    if brotli:
+        Path(f"{path}.br").write_bytes(brotli.compress(data, quality=11))
+
+
+def render(data, css_href="assets/digest.css", feed_href=""):
+    """digest 数据 → HTML 字符串（css_href 是共享样式表、feed_href 是站点根目录相对页面的路径）"""
+    labels = LABELS.get(data.get("locale"), LABELS["zh"])
+    return minify_html(get_template().render(
+        t=labels,
+        title=data.get("title") or labels["title"],
         date=data.get("date", datetime.now().strftime("%Y-%m-%d")),
         categories=data.get("categories", {}),
         analysis=data.get("analysis", {}),
+        css_href=css_href,
+        feed_href=feed_href,
         update_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    )
-    
-    # 保存
-    (docs_dir / "index.html").write_text(html, encoding="utf-8")
-    (docs_dir / f"digest_{data.get('date', 'latest')}.html").write_text(html, encoding="utf-8")
+    ))
+
+
+def render_file(data_file, docs_dir=Path("docs"), index=False, site_dir=None):
+    """渲染一个 digest JSON 文件，返回输出路径（site_dir 为站点根目录，版本页面在其子目录下）"""
+    with profiler.stage("load_json"), open(data_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    site_dir = site_dir or docs_dir
+    css = write_css(site_dir)
+    root = Path(os.path.relpath(site_dir, docs_dir)).as_posix()
+    with profiler.stage("render"):
+        html = render(data, Path(os.path.relpath(css, docs_dir)).as_posix(),
+                      "" if root == "." else f"{root}/").encode("utf-8")
+    out = docs_dir / f"digest_{data.get('date', 'latest')}.html"
+    with profiler.stage("write_html"):
+        write_compressed(out, html)
+        if index:
+            write_compressed(docs_dir / "index.html", html)
+    return out
+
+
+def compress_site(docs_dir=Path("docs")):
+    """给还没有预压缩副本的页面补写 .gz / .br（旧版生成器留下的存档页面）"""
+    count = 0
+    for page in docs_dir.rglob("*.html"):
+        if not Path(f"{page}.gz").exists() or (brotli and not Path(f"{page}.br").exists()):
+            write_compressed(page, page.read_bytes())
+            count += 1
+    return count
+
+
+def site_report(docs_dir=Path("docs")):
+    """站点总大小：原始 HTML/CSS 和预压缩副本分别统计"""
+    sizes = {"html": 0, "css": 0, "gz": 0, "br": 0}
+    pages = 0
+    for f in docs_dir.rglob("*"):
+        if not f.is_file():
+            continue
+        kind = f.suffix.lstrip(".")
+        if kind in sizes:
+            sizes[kind] += f.stat().st_size
+            pages += kind == "html"
+    kb = {k: v / 1024 for k, v in sizes.items()}
+    line = f"📦 站点大小: {pages} 个页面 HTML {kb['html']:.0f} KB + CSS {kb['css']:.1f} KB，gzip {kb['gz']:.0f} KB"
+    if brotli:
+        line += f"，brotli {kb['br']:.0f} KB"
+    print(line)
+    return sizes
+
+
+def update_feeds(data_files, data_dir=Path("data"), docs_dir=Path("docs")):
+    """把主日报的 digest 文件并入订阅源窗口，有变化时重写 feed.xml / feed.json"""
+    with profiler.stage("feeds"):
+        window = FeedWindow(data_dir / ".state")
+        for f in data_files:
+            raw = f.read_bytes()
+            window.add_day(json.loads(raw), raw)
+        site_url = os.environ.get("SITE_URL", "").rstrip("/")
+        if write_feeds(window, docs_dir, f"{site_url}/" if site_url else "", write_compressed):
+            print(f"📡 订阅源已更新: {docs_dir}/feed.xml, {docs_dir}/feed.json（{len(window.entries())} 条）")
+        window.save()
+
+
+def edition_dirs(data_dir=Path("data")):
+    """额外版本（专题/语言）和周报/月报的数据目录：data/<目录>/latest.json"""
+    return sorted(p.parent for p in data_dir.glob("*/latest.json") if not p.parent.name.startswith("."))
+
+
+def rebuild(data_dir=Path("data"), docs_dir=Path("docs")):
+    """从存档重新生成所有页面（含额外版本和周报/月报，输出到 docs/<目录>/）"""
+    count = 0
+    for src, dst in [(data_dir, docs_dir)] + [(d, docs_dir / d.name) for d in edition_dirs(data_dir)]:
+        files = sorted(src.glob("digest_*.json"))
+        for f in files:
+            render_file(f, dst, site_dir=docs_dir)
+        latest_file = latest_path(src)
+        if latest_file:
+            render_file(latest_file, dst, index=True, site_dir=docs_dir)
+        count += len(files)
+    print(f"✅ 重新生成 {count} 个页面")
+    update_feeds(sorted(data_dir.glob("digest_*.json"))[-FEED_DAYS:], data_dir, docs_dir)
+    site_report(docs_dir)
+
+
+def main():
+    latest_file = latest_path(Path("data"))
+    if latest_file is None:
+        print("❌ 没有数据文件")
+        return
     
+    render_file(latest_file, index=True)
     print(f"✅ HTML 生成完成: docs/index.html")
+    update_feeds([latest_file])
+    for d in edition_dirs():
+        render_file(latest_path(d), Path("docs") / d.name, index=True, site_dir=Path("docs"))
+        print(f"✅ HTML 生成完成: docs/{d.name}/index.html")
+    with profiler.stage("compress_site"):
+        compressed = compress_site()
+    if compressed:
+        print(f"🗜️ 为 {compressed} 个存档页面补写预压缩副本")
+    site_report()
 
 
 if __name__ == "__main__":
-    main()
+    if "--profile" in sys.argv:
+        profiler.start(profile_dir("html"))
+    try:
+        main()
+    finally:
+        profiler.finish()
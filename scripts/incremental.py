@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+日内增量更新（python scripts/generate_digest.py --incremental）
+- 水位：data/.state/incremental.json 记录当天已处理过的条目 id、上次采集时间和各条目热度分数
+- 只有没见过、且不早于水位（留宽限期给延迟出现的 RSS）的条目才送 LLM
+- 新条目按分类并入当天 digest，与已有条目一起按热度重排，每类仍最多 10 条
+"""
+
+from datetime import datetime, timedelta
+
+from state import load_state, save_state
+
+LATE_GRACE = timedelta(hours=6)   # 发布时间早于水位这么久的条目视为旧条目
+CATEGORY_LIMIT = 10
+REANALYZE_MIN_NEW = 5             # 新并入的条目达到这个数量才重新做整体分析
+
+
+class DigestWatermark:
+    def __init__(self, state_dir, date):
+        self.state_file = state_dir / "incremental.json"
+        state = load_state(self.state_file)
+        if state.get("date") != date:
+            state = {"date": date, "watermark": None, "seen": [], "scores": {}}
+        self.state = state
+        self.seen = set(state["seen"])
+        self.scores = state["scores"]
+
+    @property
+    def watermark(self):
+        wm = self.state.get("watermark")
+        return datetime.fromisoformat(wm) if wm else None
+
+    def fresh(self, items, known=()):
+        """上次运行之后新出现的条目（known：日报里已有条目的 id 和链接）"""
+        wm = self.watermark
+        cutoff = wm - LATE_GRACE if wm else None
+        return [
+            it for it in items
+            if it.id not in self.seen and it.id not in known and it.url not in known
+            and not (cutoff and it.published and it.published < cutoff)
+        ]
+
+    def advance(self, items, started, scores=None):
+        """记录本次处理过的条目和采集开始时间"""
+        self.seen.update(it.id for it in items)
+        if scores:
+            self.scores.update(scores)
+        if started:
+            self.state["watermark"] = started.isoformat(timespec="seconds")
+
+    def save(self):
+        self.state["seen"] = sorted(self.seen)
+        save_state(self.state_file, self.state)
+
+
+def merge_delta(categories, additions, scores, limit=CATEGORY_LIMIT):
+    """
+    把新条目 {分类: [条目]} 并入已有分类，按 id 和链接去重、按热度重排。
+    返回 (新的 categories, 发生变化的分类名列表)
+    """
+    merged = {cat: list(items) for cat, items in categories.items()}
+    changed = []
+    for cat, new_items in additions.items():
+        current = merged.get(cat, [])
+        known = {it.get("id") for it in current} | {it.get("链接") for it in current}
+        candidates = current + [it for it in new_items
+                                if it["id"] not in known and it["链接"] not in known]
+        # 已有条目没有记录分数时排在有分数的条目之后，保持原顺序
+        ranked = sorted(candidates, key=lambda it: -scores.get(it.get("id"), 0.0))[:limit]
+        if [it.get("id") for it in ranked] != [it.get("id") for it in current]:
+            merged[cat] = ranked
+            changed.append(cat)
+    return merged, changed
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+资讯条目的紧凑表示
+- __slots__ 记录，日期解析为带时区的 datetime，来源/板块字符串驻留
+- 构造时校验，坏数据在 fetcher 处就被拦下
+- to_dict() 输出与历史 data/digest_*.json 一致的中文字段（外加稳定 id）
+- 稳定 id = 板块 + 链接 的哈希，LLM 只回传 id 和译文，再按 id 拼回原字段
+"""
+
+import hashlib
+import json
+import sys
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+def parse_date(value):
+    """解析各来源混杂的日期（datetime / ISO / Twitter 格式），失败返回 None（统一为 UTC）"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                dt = datetime.strptime(value, "%a %b %d %H:%M:%S %z %Y")  # Twitter
+            except ValueError:
+                return None
+    if dt.tzinfo is None:
+        dt = dt.astimezone()  # 无时区的按本机时间（fetcher 用 datetime.now() 生成）
+    return dt.astimezone(timezone.utc)
+
+
+def url_hash(url):
+    """链接的短哈希，用于去重"""
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def canonical_url(url):
+    """规范化链接（跨天去重、订阅源条目 ID）：去掉协议、www、末尾斜杠和 utm 参数，GitHub API 地址归一到仓库页"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    path = parts.path.rstrip("/")
+    if host == "api.github.com" and path.startswith("/repos/"):
+        host, path = "github.com", path[len("/repos"):]
+    if host in ("github.com", "huggingface.co"):
+        path = path.lower()
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not k.startswith("utm_")))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def item_id(section, url):
+    """稳定条目 ID（同一链接在不同板块中是不同条目）"""
+    return hashlib.blake2b(f"{section}\n{url}".encode("utf-8"), digest_size=5).hexdigest()
+
+
+class DigestItem:
+    __slots__ = ("id", "title", "content", "published", "source", "section",
+                 "url", "extra", "engagement", "url_hash")
+
+    def __init__(self, title, url, source, section, published=None,
+                 content="", extra=None, engagement=None):
+        title = (title or "").strip()
+        url = (url or "").strip()
+        if not title:
+            raise ValueError("标题为空")
+        if not url.startswith(("http://", "https://")):
+            raise ValueError(f"链接无效: {url[:60]!r}")
+        if not section:
+            raise ValueError("板块为空")
+
+        self.title = title
+        self.content = content or ""
+        self.published = parse_date(published)
+        self.source = sys.intern(source or "")
+        self.section = sys.intern(section)
+        self.url = url
+        self.extra = extra
+        self.engagement = None if engagement is None else float(engagement)
+        self.url_hash = url_hash(url)
+        self.id = item_id(self.section, url)
+
+    @property
+    def date_str(self):
+        return self.published.isoformat(timespec="seconds") if self.published else ""
+
+    def to_dict(self):
+        d = {
+            "id": self.id,
+            "标题": self.title,
+            "内容": self.content,
+            "日期": self.date_str,
+            "来源": self.source,
+            "板块": self.section,
+            "链接": self.url,
+        }
+        if self.extra is not None:
+            d["额外"] = self.extra
+        return d
+
+    def to_record(self):
+        """完整内部字段（含热度），用于检查点，DigestItem(**record) 可还原"""
+        return {
+            "title": self.title,
+            "url": self.url,
+            "source": self.source,
+            "section": self.section,
+            "published": self.date_str or None,
+            "content": self.content,
+            "extra": self.extra,
+            "engagement": self.engagement,
+        }
+
+    def prompt_dict(self):
+        """发给 LLM 的最小字段（链接/日期/额外不经过模型）"""
+        return {"id": self.id, "标题": self.title, "内容": self.content, "来源": self.source}
+
+    def __repr__(self):
+        return f"DigestItem({self.section}: {self.title[:30]!r})"
+
+
+def dumps_prompt(items, texts=None):
+    """条目列表序列化为 LLM 输入（紧凑格式）；texts 为 {id: 正文}，有正文的条目用正文代替摘要"""
+    rows = []
+    for it in items:
+        d = it.prompt_dict()
+        if texts and texts.get(it.id):
+            d["内容"] = texts[it.id]
+        rows.append(d)
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":"))
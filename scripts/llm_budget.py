@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+LLM token 账本与成本预算
+- 所有 chat.completions 调用经过 TokenGovernor.create()，从响应的 usage 读取 token 数
+  （服务端没返回 usage 时按文本粗估），按模型单价折算成本（元）
+- 每日累计写入 data/.state/llm_usage.json（每次调用后落盘，中途崩溃也不丢账）
+- 单次运行预算与每日预算（元）取较小者作为剩余额度；每次调用前按提示词估算和 max_tokens
+  预留最坏成本，并发的调用合计也不会超出额度，额度不够时拒绝调用
+- 额度不够时按顺序降级：减少每个板块送翻译的条目数 → 整体分析改用小模型 → 跳过整体分析
+"""
+
+import os
+import threading
+from datetime import datetime
+
+from state import load_state, save_state
+from token_estimate import estimate_tokens
+
+# 元 / 百万 token（输入, 输出）；未列出的模型按 DEFAULT_PRICE 计（宁可高估），
+# 可用 LLM_PRICES="模型=输入/输出;..." 覆盖
+PRICES = {
+    "deepseek-ai/DeepSeek-V3": (2.0, 8.0),
+    "THUDM/glm-4-9b-chat": (0.0, 0.0),
+    "Qwen/Qwen2.5-7B-Instruct": (0.0, 0.0),
+}
+DEFAULT_PRICE = (2.0, 8.0)
+
+KEEP_DAYS = 30
+
+# 预估值（token）：翻译每条的输出、每批的固定提示词、一次整体分析的输入/输出
+COMPLETION_PER_ITEM = 90
+BATCH_OVERHEAD = 250
+ANALYSIS_PROMPT = 3000
+ANALYSIS_COMPLETION = 1024   # 与整体分析的 max_tokens 一致（按上限预估，和调用前的预留口径相同）
+MIN_PER_SECTION = 3
+# 翻译调用的 max_tokens 按批次条数给上限（预估值的 3 倍），调用前的预留随批次大小变化，
+# 不会让只有几条的批次按满批次的 4096 预留而被拒绝
+COMPLETION_CAP_PER_ITEM = 3 * COMPLETION_PER_ITEM
+TRANSLATION_MAX_TOKENS = 4096
+
+
+def parse_prices(spec):
+    """"model=2/8;other=0/0" → {model: (输入, 输出)}"""
+    prices = {}
+    for part in (spec or "").split(";"):
+        model, _, price = part.strip().rpartition("=")
+        if model and "/" in price:
+            p_in, _, p_out = price.partition("/")
+            prices[model] = (float(p_in), float(p_out))
+    return prices
+
+
+class LLMBudgetExceeded(RuntimeError):
+    """本次运行或今日的 LLM 预算已用完"""
+
+
+def trim_per_section(items, limit):
+    """每个板块只保留前 limit 条（items 已按分数排序）"""
+    taken = {}
+    kept = []
+    for it in items:
+        if taken.get(it.section, 0) < limit:
+            taken[it.section] = taken.get(it.section, 0) + 1
+            kept.append(it)
+    return kept
+
+
+class TokenGovernor:
+    def __init__(self, state_dir, run_budget=0.0, day_budget=0.0):
+        self.state_file = state_dir / "llm_usage.json"
+        self.state = load_state(self.state_file, {"days": {}})
+        self.run_budget = run_budget    # 元，0 表示不限
+        self.day_budget = day_budget
+        self.prices = {**PRICES, **parse_prices(os.environ.get("LLM_PRICES"))}
+        self.run = {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0, "cost_cny": 0.0}
+        self.degraded = []
+        self.reserved = 0.0             # 进行中的调用预留的成本
+        self.lock = threading.Lock()
+
+    def price(self, model, prompt_tokens, completion_tokens):
+        p_in, p_out = self.prices.get(model, DEFAULT_PRICE)
+        return (prompt_tokens * p_in + completion_tokens * p_out) / 1e6
+
+    def today(self):
+        date = datetime.now().strftime("%Y-%m-%d")
+        return self.state["days"].setdefault(
+            date, {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0, "cost_cny": 0.0, "models": {}})
+
+    def _left(self):
+        """剩余额度（已扣除进行中调用的预留；调用方持有锁）"""
+        left = []
+        if self.run_budget:
+            left.append(self.run_budget - self.run["cost_cny"] - self.reserved)
+        if self.day_budget:
+            left.append(self.day_budget - self.today()["cost_cny"] - self.reserved)
+        return max(0.0, min(left)) if left else None
+
+    def remaining(self):
+        """剩余额度（元，单次与每日预算取小；都不限时返回 None）"""
+        with self.lock:
+            return self._left()
+
+    def affords(self, cost):
+        left = self.remaining()
+        return left is None or (left > 0 and left >= cost)
+
+    def translation_cost(self, model, items, text_tokens=None):
+        """翻译这些条目的预估成本（text_tokens: {条目 id: 补全正文的 token 数}）"""
+        text_tokens = text_tokens or {}
+        prompt = sum(estimate_tokens(f"{it.title} {it.source}")
+                     + text_tokens.get(it.id, estimate_tokens(it.content)) for it in items)
+        prompt += BATCH_OVERHEAD * (len(items) // 15 + 1)
+        return self.price(model, prompt, COMPLETION_PER_ITEM * len(items))
+
+    def analysis_cost(self, model):
+        return self.price(model, ANALYSIS_PROMPT, ANALYSIS_COMPLETION)
+
+    def degrade(self, note):
+        """记录一次降级（写入运行元数据）"""
+        with self.lock:
+            if note not in self.degraded:
+                self.degraded.append(note)
+        print(f"  💸 预算紧张：{note}")
+
+    def create(self, client, **kwargs):
+        """带预算检查和用量记录的 chat.completions.create（先在锁内预留本次调用的最坏成本）"""
+        model = kwargs.get("model", "")
+        estimate = self.price(model, sum(estimate_tokens(m["content"]) for m in kwargs.get("messages", [])),
+                              kwargs.get("max_tokens") or ANALYSIS_COMPLETION)
+        with self.lock:
+            left = self._left()
+            if left is not None and (left <= 0 or left < estimate):
+                raise LLMBudgetExceeded(f"LLM 预算不足（剩余 ¥{left:.4f}，本次最多 ¥{estimate:.4f}）")
+            self.reserved += estimate
+        try:
+            resp = client.chat.completions.create(**kwargs)
+            usage = getattr(resp, "usage", None)
+            if usage and usage.prompt_tokens is not None:
+                prompt, completion = usage.prompt_tokens, usage.completion_tokens or 0
+            else:
+                prompt = sum(estimate_tokens(m["content"]) for m in kwargs.get("messages", []))
+                completion = estimate_tokens(resp.choices[0].message.content or "")
+        except BaseException:
+            with self.lock:
+                self.reserved -= estimate
+            raise
+        self.record(model, prompt, completion, reserved=estimate)
+        return resp
+
+    def record(self, model, prompt_tokens, completion_tokens, reserved=0.0):
+        """记入实际用量（reserved：同时释放的预留，实际成本入账前额度不会短暂变多）"""
+        cost = self.price(model, prompt_tokens, completion_tokens)
+        with self.lock:
+            self.reserved -= reserved
+            day = self.today()
+            per_model = day["models"].setdefault(model, {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0})
+            for bucket in (self.run, day, per_model):
+                bucket["prompt_tokens"] += prompt_tokens
+                bucket["completion_tokens"] += completion_tokens
+                bucket["calls"] += 1
+            self.run["cost_cny"] += cost
+            day["cost_cny"] += cost
+            for old in sorted(self.state["days"])[:-KEEP_DAYS]:
+                del self.state["days"][old]
+            save_state(self.state_file, self.state)
+
+    def summary(self):
+        """本次运行的用量（写入 digest 的 usage 字段）"""
+        with self.lock:
+            result = {**self.run, "cost_cny": round(self.run["cost_cny"], 4)}
+            if self.degraded:
+                result["degraded"] = list(self.degraded)
+        return result
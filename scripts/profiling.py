@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+分阶段性能剖析（generate_digest.py / generate_html.py 加 --profile）
+- 每个阶段（各数据源、LLM 批次、clean_json、JSON 写出、模板渲染……）单独跑 cProfile，
+  同名阶段多次调用累加；嵌套阶段运行时暂停外层，各阶段统计的是自身耗时
+- 每次调用前后各取一次 tracemalloc 快照，按代码行累计新增分配
+- 输出到 data/profiles/<日期>/<时间>-<脚本>/：每阶段一个 .pstats、allocations.txt、summary.json
+- 对比两次运行：python scripts/profiling.py diff <目录A> <目录B>
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+TOP_FUNCTIONS = 8
+TOP_ALLOCATIONS = 15
+FRAMES = 10
+
+
+def profile_dir(script, root=Path("data") / "profiles"):
+    """本次运行的输出目录：data/profiles/<日期>/<时间>-<脚本>/"""
+    now = datetime.now()
+    return root / now.strftime("%Y-%m-%d") / f"{now.strftime('%H%M%S')}-{script}"
+
+
+def _filename(stage):
+    return re.sub(r"[^\w.-]+", "_", stage).strip("_") or "stage"
+
+
+def _function_times(stats):
+    """pstats → {"文件名:函数名": (自身耗时, 累计耗时, 调用次数)}（不含行号，代码改动后仍可对齐）"""
+    result = {}
+    for (file, _, func), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        key = f"{os.path.basename(file)}:{func}"
+        tt, ct, n = result.get(key, (0.0, 0.0, 0))
+        result[key] = (tt + tottime, ct + cumtime, n + calls)
+    return result
+
+
+class StageProfiler:
+    def __init__(self):
+        self.out_dir = None
+        self.profiles = {}      # (阶段名, 线程 id) → cProfile.Profile（同名阶段多次调用累加）
+        self.calls = []         # 每次调用：{"stage", "seconds", "alloc_kb"}
+        self.allocs = {}        # 阶段名 → Counter(代码行 → 新增字节)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.started = None
+
+    @property
+    def enabled(self):
+        return self.out_dir is not None
+
+    def start(self, out_dir):
+        self.out_dir = out_dir
+        self.started = time.perf_counter()
+        tracemalloc.start(FRAMES)
+        print(f"🔬 性能剖析已开启，结果写入 {out_dir}")
+
+    def _snapshot(self):
+        """取快照并累计耗时（外层阶段的耗时会扣掉内层快照的开销）"""
+        t0 = time.perf_counter()
+        snapshot = tracemalloc.take_snapshot()
+        self.local.overhead = getattr(self.local, "overhead", 0.0) + time.perf_counter() - t0
+        return snapshot
+
+    def _grown(self, before, after):
+        """两次快照间按代码行的新增分配（剖析器自身的分配不计）"""
+        t0 = time.perf_counter()
+        grown = Counter()
+        for s in after.compare_to(before, "lineno"):
+            where = s.traceback[0].filename
+            if s.size_diff and where not in (tracemalloc.__file__, __file__):
+                grown[str(s.traceback[0])] += s.size_diff
+        self.local.overhead += time.perf_counter() - t0
+        return grown
+
+    @contextmanager
+    def stage(self, name):
+        """剖析一个阶段（未开启时什么都不做）"""
+        if not self.enabled:
+            yield
+            return
+        stack = self.local.__dict__.setdefault("stack", [])
+        key = (name, threading.get_ident())
+        with self.lock:
+            prof = self.profiles.setdefault(key, cProfile.Profile())
+        if stack and stack[-1]:
+            stack[-1].disable()  # 嵌套阶段：暂停外层（快照也不计入外层的 cProfile）
+        before = self._snapshot()
+        overhead = self.local.overhead
+        try:
+            prof.enable()
+        except ValueError:
+            prof = None  # 其他线程占用了全局剖析器（3.12+），本次只记录耗时和内存
+        stack.append(prof)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - t0 - (self.local.overhead - overhead)
+            if prof:
+                prof.disable()
+            stack.pop()
+            grown = self._grown(before, self._snapshot())
+            with self.lock:
+                self.allocs.setdefault(name, Counter()).update(+grown)
+                self.calls.append({"stage": name, "seconds": round(seconds, 4),
+                                   "alloc_kb": round(sum(grown.values()) / 1024, 1)})
+            if stack and stack[-1]:
+                stack[-1].enable()
+
+    def wrap(self, name, func):
+        """func 包一层阶段剖析（用于提交到线程池的任务）"""
+        def run(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return run
+
+    def finish(self):
+        """写出每阶段 pstats、内存分配报告和汇总，返回输出目录"""
+        if not self.enabled:
+            return None
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        merged = {}
+        for (name, _), prof in self.profiles.items():
+            try:
+                stats = pstats.Stats(prof)
+            except TypeError:
+                continue  # 从未成功启用过（没有数据）
+            if name in merged:
+                merged[name].add(stats)
+            else:
+                merged[name] = stats
+
+        summary = {"total_seconds": round(time.perf_counter() - self.started, 3),
+                   "peak_kb": round(tracemalloc.get_traced_memory()[1] / 1024, 1),
+                   "stages": {}}
+        for call in self.calls:
+            s = summary["stages"].setdefault(call["stage"], {"calls": 0, "seconds": 0.0, "alloc_kb": 0.0})
+            s["calls"] += 1
+            s["seconds"] = round(s["seconds"] + call["seconds"], 4)
+            s["alloc_kb"] = round(s["alloc_kb"] + call["alloc_kb"], 1)
+        for name, stats in merged.items():
+            stats.dump_stats(self.out_dir / f"{_filename(name)}.pstats")
+            top = sorted(_function_times(stats).items(), key=lambda kv: -kv[1][0])[:TOP_FUNCTIONS]
+            summary["stages"][name]["file"] = f"{_filename(name)}.pstats"
+            summary["stages"][name]["top"] = [
+                {"function": k, "tottime": round(tt, 4), "cumtime": round(ct, 4), "calls": n}
+                for k, (tt, ct, n) in top
+            ]
+        summary["calls"] = self.calls
+        (self.out_dir / "summary.json").write_text(
+            json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        lines = []
+        for name, counter in sorted(self.allocs.items(), key=lambda kv: -sum(kv[1].values())):
+            lines.append(f"== {name}（新增 {sum(counter.values()) / 1024:.1f} KB）")
+            lines += [f"  {size / 1024:>10.1f} KB  {where}" for where, size in counter.most_common(TOP_ALLOCATIONS)]
+            lines.append("")
+        (self.out_dir / "allocations.txt").write_text("\n".join(lines), encoding="utf-8")
+        tracemalloc.stop()
+
+        print(f"\n🔬 性能剖析（总计 {summary['total_seconds']:.1f}s，内存峰值 {summary['peak_kb'] / 1024:.1f} MB）")
+        for name, s in sorted(summary["stages"].items(), key=lambda kv: -kv[1]["seconds"])[:15]:
+            print(f"  {s['seconds']:>8.2f}s  {s['calls']:>4} 次  {s['alloc_kb']:>9.1f} KB  {name}")
+        print(f"  📁 {self.out_dir}")
+        return self.out_dir
+
+
+# 全局实例：各模块 `with profiler.stage(...)`，入口脚本加 --profile 时 start()/finish()
+profiler = StageProfiler()
+
+
+def diff(a_dir, b_dir, top=10):
+    """对比两次剖析：各阶段耗时变化，以及耗时增加最多的函数"""
+    a_dir, b_dir = Path(a_dir), Path(b_dir)
+    a = json.loads((a_dir / "summary.json").read_text(encoding="utf-8"))
+    b = json.loads((b_dir / "summary.json").read_text(encoding="utf-8"))
+    print(f"🔬 {a_dir} → {b_dir}")
+    print(f"  总计 {a['total_seconds']:.2f}s → {b['total_seconds']:.2f}s，"
+          f"内存峰值 {a['peak_kb'] / 1024:.1f} → {b['peak_kb'] / 1024:.1f} MB")
+
+    print(f"\n{'阶段':<32} {'A':>9} {'B':>9} {'变化':>8}")
+    names = sorted(set(a["stages"]) | set(b["stages"]),
+                   key=lambda n: -abs(b["stages"].get(n, {}).get("seconds", 0) - a["stages"].get(n, {}).get("seconds", 0)))
+    fmt = lambda v: f"{v:.3f}s" if v is not None else "-"
+    for name in names:
+        sa = a["stages"].get(name, {}).get("seconds")
+        sb = b["stages"].get(name, {}).get("seconds")
+        if sa is None:
+            change = "新增"
+        elif sb is None:
+            change = "移除"
+        else:
+            change = f"{(sb - sa) / sa:+.0%}" if sa else "-"
+        print(f"{name[:32]:<32} {fmt(sa):>9} {fmt(sb):>9} {change:>8}")
+
+    # 函数级：自身耗时增加最多的函数（跨阶段累加）
+    def functions(directory, summary):
+        total = Counter()
+        for s in summary["stages"].values():
+            if s.get("file") and (directory / s["file"]).exists():
+                for key, (tt, _, _) in _function_times(pstats.Stats(str(directory / s["file"]))).items():
+                    total[key] += tt
+        return total
+
+    fa, fb = functions(a_dir, a), functions(b_dir, b)
+    grown = sorted(((fb[k] - fa.get(k, 0.0), k) for k in fb), reverse=True)[:top]
+    grown = [(d, k) for d, k in grown if d > 0]
+    if grown:
+        print("\n自身耗时增加最多的函数:")
+        for d, k in grown:
+            print(f"  {d * 1000:>+9.1f} ms  {fa.get(k, 0.0) * 1000:>8.1f} → {fb[k] * 1000:>8.1f} ms  {k}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "diff":
+        diff(sys.argv[2], sys.argv[3])
+    else:
+        print("用法: python scripts/profiling.py diff <剖析目录A> <剖析目录B>")
+        sys.exit(1)
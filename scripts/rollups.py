@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+周报 / 月报（python scripts/rollups.py [--all]）
+- 直接读取已翻译的每日存档 data/digest_*.json，不再把条目重新送 LLM
+- 跨天按规范化链接和标题去重，按上榜天数 + 额外 里的热度（⭐ 星标、📥 下载、🔥 使用次数）排序
+- 增量：data/.state/rollups.json 记录每个周期汇总过的日期及其存档哈希，某天存档落地或变化时
+  只重算它所在的周和月，其他周期不动
+- 每个周期只有一次整体总结调用，排名靠前的条目没变时不再调用
+- 输出 data/weekly/、data/monthly/（digest_<周期>.json + latest.json），网页渲染到 docs/weekly/、docs/monthly/
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from digest_io import write_digest
+from generate_html import render_file
+from items import canonical_url
+from state import load_state, save_state
+
+CATEGORY_LIMIT = 10
+SUMMARY_ITEMS = 5            # 每类取前几条送去做总结
+ENGAGEMENT_WEIGHT = 0.5      # 热度取 log10 后的权重（上榜天数每天计 1 分）
+LOOKBACK_DAYS = 35           # 默认只检查最近这么多天的存档，更早的周期视为定稿
+STATE_KEEP_DAYS = 62         # 周期结束超过这么久后从状态文件中移除
+
+# 目录名 → (总结粒度, 标题)
+PERIODS = {
+    "weekly": ("week", "🗓️ AI 周报"),
+    "monthly": ("month", "🗓️ AI 月报"),
+}
+
+_METRIC = re.compile(r"(?:⭐|📥|🔥)\s*([\d,]+)")
+_NOT_WORD = re.compile(r"[\W_]+")
+
+
+def period_of(kind, day):
+    """日期 → (周期键, 起始日, 结束日)；周按 ISO 周计"""
+    if kind == "weekly":
+        year, week, weekday = day.isocalendar()
+        start = day - timedelta(days=weekday - 1)
+        return f"{year}-W{week:02d}", start, start + timedelta(days=6)
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start.strftime("%Y-%m"), start, end
+
+
+def title_key(title):
+    """去重用的标题（太短的标题容易误合并，不参与）"""
+    key = _NOT_WORD.sub("", title or "").lower()
+    return key if len(key) >= 8 else ""
+
+
+def engagement(item):
+    """额外 → 主热度数值（星标/下载量/使用次数，取第一个）"""
+    m = _METRIC.search(item.get("额外") or "")
+    return int(m.group(1).replace(",", "")) if m else 0
+
+
+class Rollup:
+    """
+    一个周期的汇总池：{规范化链接: {"t": 标题键, "d": {日期: [热度, 分类, 序号]}}}
+    汇总池只在内存中由本周期的存档重建（几十个本地 JSON），状态文件只记存档哈希和上次总结
+    """
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.days = state.get("days", {})       # 日期 → 存档哈希
+        self.basis = state.get("basis")         # 上次总结所依据的条目（变化才重新总结）
+        self.analysis = state.get("analysis")
+        self.pool = {}
+
+    def fold(self, date, data, digest):
+        """并入一天的存档（同一天里重复出现的条目只取第一次）"""
+        by_title = {e["t"]: key for key, e in self.pool.items() if e["t"]}
+        for cat, items in data.get("categories", {}).items():
+            for idx, item in enumerate(items):
+                if not isinstance(item, dict) or not item.get("链接"):
+                    continue
+                key, tkey = canonical_url(item["链接"]), title_key(item.get("标题"))
+                if key not in self.pool and tkey in by_title:
+                    key = by_title[tkey]
+                entry = self.pool.setdefault(key, {"t": tkey, "d": {}})
+                if date not in entry["d"]:
+                    entry["d"][date] = [engagement(item), cat, idx]
+                if tkey:
+                    by_title.setdefault(tkey, key)
+        self.days[date] = digest
+
+    def ranked(self):
+        """{分类: [(链接键, 最近一次出现的日期)]}，分类取最近一次出现时的分类"""
+        sections = {}
+        for key, e in self.pool.items():
+            last = max(e["d"])
+            recurrence = len(e["d"])
+            metric = max(m for m, _, _ in e["d"].values())
+            score = recurrence + ENGAGEMENT_WEIGHT * math.log10(1 + metric)
+            sections.setdefault(e["d"][last][1], []).append((score, last, key))
+        for rows in sections.values():
+            rows.sort(key=lambda r: r[2])
+            rows.sort(key=lambda r: (r[0], r[1]), reverse=True)  # 分数高、最近出现的在前
+        return {cat: [(key, last) for _, last, key in rows] for cat, rows in sections.items()}
+
+    def state(self):
+        return {"days": self.days, "basis": self.basis, "analysis": self.analysis}
+
+
+class RollupBuilder:
+    def __init__(self, data_dir=Path("data"), docs_dir=Path("docs"), summarize=None):
+        self.data_dir = data_dir
+        self.docs_dir = docs_dir
+        self.state_file = data_dir / ".state" / "rollups.json"
+        self.state = load_state(self.state_file)
+        self.summarize = summarize      # (categories, span) → {"summary", "trends"}；None 时只做本地统计
+        self._days = {}
+
+    def load_day(self, date):
+        if date not in self._days:
+            try:
+                text = (self.data_dir / f"digest_{date}.json").read_bytes()
+                data = json.loads(text)
+            except (OSError, ValueError):
+                text, data = b"", {}
+            if data.get("error"):
+                data = {}  # 出错占位的日报不参与汇总
+            self._days[date] = (hashlib.blake2b(text, digest_size=8).hexdigest(), data)
+        return self._days[date]
+
+    def update(self, full=False, today=None):
+        """更新有变化的周期，返回 [(目录名, 周期键)]"""
+        today = today or datetime.now()
+        archive = sorted(f.stem[len("digest_"):] for f in self.data_dir.glob("digest_*.json"))
+        cutoff = (today - timedelta(days=LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+        recent = archive if full else [d for d in archive if d >= cutoff]
+        updated = []
+        for kind in PERIODS:
+            store = self.state.setdefault(kind, {})
+            periods = {}
+            for d in recent:
+                key, start, end = period_of(kind, datetime.strptime(d, "%Y-%m-%d"))
+                periods[key] = (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+            for key, (start, end) in sorted(periods.items()):
+                # 周期内的全部存档日期（跨过回看窗口的周期也完整汇总）
+                dates = [d for d in archive if start <= d <= end]
+                rollup = Rollup(store.get(key))
+                stale = [d for d in dates if rollup.days.get(d) != self.load_day(d)[0]]
+                removed = [d for d in rollup.days if d not in dates]
+                if not stale and not removed and (self.data_dir / kind / f"digest_{key}.json").exists():
+                    continue
+                rollup.days = {}
+                for d in dates:
+                    digest, data = self.load_day(d)
+                    rollup.fold(d, data, digest)
+                self.write(kind, key, start, end, rollup)
+                store[key] = rollup.state()
+                updated.append((kind, key))
+            keep = (today - timedelta(days=STATE_KEEP_DAYS)).strftime("%Y-%m-%d")
+            for key in [k for k, v in store.items() if max(v["days"], default="") < keep]:
+                del store[key]
+        save_state(self.state_file, self.state)
+        return updated
+
+    def categories(self, rollup):
+        """排名靠前的条目（取最近一次出现时的译文），额外 前面标注上榜天数"""
+        result = {}
+        for cat, keys in rollup.ranked().items():
+            items = []
+            for key, last in keys[:CATEGORY_LIMIT]:
+                _, cat_at, idx = rollup.pool[key]["d"][last]
+                try:
+                    item = dict(self.load_day(last)[1]["categories"][cat_at][idx])
+                except (KeyError, IndexError):
+                    continue
+                n = len(rollup.pool[key]["d"])
+                if n > 1:
+                    item["额外"] = " | ".join(filter(None, [f"📆 上榜 {n} 天", item.get("额外")]))
+                items.append(item)
+            if items:
+                result[cat] = items
+        return result
+
+    def summary(self, kind, rollup, categories):
+        span = PERIODS[kind][0]
+        basis = hashlib.blake2b(json.dumps(
+            {cat: [it["链接"] for it in items[:SUMMARY_ITEMS]] for cat, items in categories.items()},
+            sort_keys=True).encode(), digest_size=8).hexdigest()
+        if rollup.analysis and basis == rollup.basis:
+            return rollup.analysis
+        if self.summarize and categories:
+            analysis = self.summarize({cat: items[:SUMMARY_ITEMS] for cat, items in categories.items()}, span)
+            if analysis.get("trends"):
+                rollup.basis, rollup.analysis = basis, analysis
+                return analysis
+        # 没有 LLM 或调用失败：本地统计，下次有条件时再总结
+        total = sum(len(items) for items in categories.values())
+        label = "本周" if span == "week" else "本月"
+        return {"summary": f"{label}汇总 {len(rollup.days)} 天存档，精选 {total} 条。", "trends": []}
+
+    def write(self, kind, key, start, end, rollup):
+        categories = self.categories(rollup)
+        result = {
+            "date": key,
+            "period": kind,
+            "start": start,
+            "end": end,
+            "title": PERIODS[kind][1],
+            "categories": categories,
+            "analysis": self.summary(kind, rollup, categories),
+        }
+        out_dir = self.data_dir / kind
+        latest = max([key] + [p.stem[len("digest_"):] for p in out_dir.glob("digest_*.json")])
+        out = write_digest(out_dir, result, latest=key == latest)
+        render_file(out, self.docs_dir / kind, index=key == latest, site_dir=self.docs_dir)
+        total = sum(len(v) for v in categories.values())
+        print(f"  ✅ {kind}/{key}（{start} ~ {end}）: 去重后 {len(rollup.pool)} 条，精选 {total} 条")
+
+
+def llm_summarizer():
+    """有 SILICONFLOW_API_KEY 时返回总结函数（复用日报的整体分析），否则 None"""
+    if not os.environ.get("SILICONFLOW_API_KEY"):
+        print("⚠️ 未配置 SILICONFLOW_API_KEY，周报/月报只做本地汇总")
+        return None
+    from openai import OpenAI
+    from generate_digest import AIDigestGenerator
+    generator = AIDigestGenerator()
+    client = OpenAI(api_key=generator.siliconflow_key, base_url="https://api.siliconflow.cn/v1")
+    return lambda categories, span: generator.analyze(client, categories, span=span)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    print("🗓️ 更新周报 / 月报...")
+    updated = RollupBuilder(summarize=llm_summarizer()).update(full="--all" in argv)
+    print(f"✅ 更新 {len(updated)} 个周期" if updated else "✅ 周报 / 月报没有变化")
+
+
+if __name__ == "__main__":
+    main()
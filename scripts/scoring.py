@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+统一热度打分（NumPy 向量化）
+- 各来源的原始热度（播放、点赞、星标、使用次数…）取 log 后按板块历史基线标准化
+- 按发布时间指数衰减
+- 全局与每个板块分别取 Top-K，把有限的 LLM 预算留给最值得看的条目
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from state import load_state, save_state
+
+HALF_LIFE_HOURS = 24.0
+BASELINE_DECAY = 0.9   # 历史基线的指数滑动权重（越大越依赖历史）
+MIN_STD = 0.5          # 防止样本太少时标准差过小
+
+
+class EngagementScorer:
+    def __init__(self, state_dir, half_life_hours=HALF_LIFE_HOURS):
+        self.half_life = half_life_hours
+        self.baseline_file = state_dir / "score_baselines.json"
+        self.baselines = load_state(self.baseline_file)
+
+    def score(self, items, now=None, update=False):
+        """
+        对所有条目一次性打分，返回 float 数组（与 items 对齐）。
+        update=True 时用本次样本滑动更新板块基线：只在每日完整运行的全量采集上更新，
+        日内增量、异步模式的分批打分样本小且有偏，不能让基线跟着漂移
+        """
+        n = len(items)
+        if n == 0:
+            return np.zeros(0)
+        now = now or datetime.now(timezone.utc)
+
+        names, codes = np.unique([it.section for it in items], return_inverse=True)
+
+        raw = np.array([np.nan if it.engagement is None else it.engagement for it in items], dtype=float)
+        has_eng = ~np.isnan(raw)
+        log_e = np.log1p(np.clip(np.nan_to_num(raw), 0, None))
+
+        # 每个板块的基线：有历史用历史，否则用本次样本
+        mu = np.zeros(len(names))
+        sd = np.ones(len(names))
+        for k, name in enumerate(names):
+            b = self.baselines.get(name)
+            mask = (codes == k) & has_eng
+            if b:
+                mu[k], sd[k] = b["mean"], max(b["std"], MIN_STD)
+            elif mask.any():
+                mu[k], sd[k] = log_e[mask].mean(), max(log_e[mask].std(), MIN_STD)
+
+        z = np.where(has_eng, (log_e - mu[codes]) / sd[codes], 0.0)
+        relevance = 1.0 / (1.0 + np.exp(-np.clip(z, -6, 6)))
+
+        ts = np.array([it.published.timestamp() if it.published else np.nan for it in items])
+        age_hours = np.clip(np.nan_to_num((now.timestamp() - ts) / 3600.0, nan=0.0), 0, None)
+        decay = np.power(0.5, age_hours / self.half_life)
+
+        if update:
+            self._update_baselines(names, codes, log_e, has_eng)
+        return relevance * decay
+
+    def _update_baselines(self, names, codes, log_e, has_eng):
+        """用本次样本滑动更新各板块的 log 热度均值/标准差"""
+        for k, name in enumerate(names):
+            mask = (codes == k) & has_eng
+            if not mask.any():
+                continue
+            m, s = float(log_e[mask].mean()), float(log_e[mask].std())
+            b = self.baselines.get(name)
+            if b:
+                m = BASELINE_DECAY * b["mean"] + (1 - BASELINE_DECAY) * m
+                s = BASELINE_DECAY * b["std"] + (1 - BASELINE_DECAY) * s
+            self.baselines[name] = {"mean": m, "std": s, "runs": (b or {}).get("runs", 0) + 1}
+
+    def save(self):
+        save_state(self.baseline_file, self.baselines)
+
+
+def select_top(items, scores, per_section=15, total=None):
+    """按分数降序取每个板块前 per_section 条，再取全局前 total 条（保持分数顺序）"""
+    order = np.argsort(-scores, kind="stable")
+    taken = {}
+    selected = []
+    for i in order:
+        sec = items[i].section
+        if taken.get(sec, 0) >= per_section:
+            continue
+        taken[sec] = taken.get(sec, 0) + 1
+        selected.append(int(i))
+        if total and len(selected) >= total:
+            break
+    return [items[i] for i in selected]
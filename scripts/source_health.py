@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+数据源健康表 + 熔断器
+- 每个端点（域名 + 路径）持久化：成功/失败次数、最近延迟样本、最后一次成功时间
+- 连续失败 FAIL_THRESHOLD 次后熔断，之后按指数退避只放行一次探测请求
+- 备用链按观测到的成功率和延迟重排，熔断中的端点直接跳过
+- 自适应超时：连接超时固定，读超时 = p99 × 系数（有上下限）；关键来源在超过 p90 仍未返回时对冲一次
+- 整个采集阶段有总预算，读超时不超过剩余预算，预算用完后不再发请求
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import requests
+
+from state import load_state, save_state
+
+FAIL_THRESHOLD = 3
+BASE_BACKOFF = timedelta(hours=6)
+MAX_BACKOFF = timedelta(days=7)
+MAX_SAMPLES = 50
+
+# 视为端点失效的状态码（401/403/429 等说明端点还活着，只是鉴权或限流）
+DEAD_STATUS = {404, 410}
+
+# 超时（秒）：样本不足 MIN_SAMPLES 时用上限，相当于原来的固定 30 秒
+CONNECT_TIMEOUT = 5.0
+READ_FACTOR = 3.0
+READ_FLOOR = 5.0
+READ_CAP = 30.0
+MIN_SAMPLES = 5
+
+
+class CircuitOpenError(requests.RequestException):
+    """端点处于熔断状态，本次不发请求"""
+
+
+class BudgetExhausted(requests.RequestException):
+    """采集阶段总预算已用完，本次不发请求"""
+
+
+def endpoint_key(url, with_query=False, tag=None):
+    """
+    端点键：域名 + 路径。with_query=True 时保留查询参数，用于区分同一地址下的不同 feed；
+    tag 区分同一 API 地址的不同调用方（查询参数每天变化，不能直接进键）
+    """
+    parts = urlsplit(url)
+    key = f"{parts.netloc}{parts.path}".rstrip("/")
+    if with_query and parts.query:
+        key = f"{key}?{parts.query}"
+    return f"{key}#{tag}" if tag else key
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+class SourceHealth:
+    def __init__(self, state_dir):
+        self.state_file = state_dir / "source_health.json"
+        self.table = load_state(self.state_file)
+        self.lock = threading.Lock()
+        self.deadline = None   # time.monotonic() 时刻，None 表示不限
+        self.hedges = 0
+
+    def start_budget(self, seconds):
+        """开始计时采集总预算（seconds <= 0 表示不限）"""
+        self.deadline = time.monotonic() + seconds if seconds > 0 else None
+
+    def remaining(self):
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def _entry(self, key):
+        return self.table.setdefault(key, {
+            "ok": 0, "fail": 0, "streak": 0, "latency_ms": [],
+            "last_ok": None, "last_error": None, "open_until": None,
+        })
+
+    # ---------- 熔断 ----------
+
+    def allow(self, key, now=None):
+        """熔断关闭，或退避期已过（半开，放行一次探测）时返回 True"""
+        with self.lock:
+            e = self.table.get(key)
+            if not e or not e.get("open_until"):
+                return True
+            now = now or datetime.now(timezone.utc)
+            return now >= datetime.fromisoformat(e["open_until"])
+
+    def record(self, key, ok, seconds, error=None, now=None):
+        now = now or datetime.now(timezone.utc)
+        with self.lock:
+            e = self._entry(key)
+            e["latency_ms"] = (e["latency_ms"] + [round(seconds * 1000)])[-MAX_SAMPLES:]
+            if ok:
+                e["ok"] += 1
+                e["streak"] = 0
+                e["open_until"] = None
+                e["last_ok"] = now.isoformat(timespec="seconds")
+            else:
+                e["fail"] += 1
+                e["streak"] += 1
+                e["last_error"] = (error or "")[:120]
+                if e["streak"] >= FAIL_THRESHOLD:
+                    backoff = min(BASE_BACKOFF * 2 ** (e["streak"] - FAIL_THRESHOLD), MAX_BACKOFF)
+                    e["open_until"] = (now + backoff).isoformat(timespec="seconds")
+
+    # ---------- 请求 ----------
+
+    def timeout(self, key):
+        """(连接超时, 读超时)：读超时由该端点的 p99 延迟推出，并受剩余预算限制"""
+        e = self.table.get(key)
+        samples = e["latency_ms"] if e else []
+        if len(samples) >= MIN_SAMPLES:
+            read = min(max(percentile(samples, 0.99) / 1000 * READ_FACTOR, READ_FLOOR), READ_CAP)
+        else:
+            read = READ_CAP
+        left = self.remaining()
+        if left is not None:
+            read = min(read, left)
+        return (min(CONNECT_TIMEOUT, read), read)
+
+    def hedge_delay(self, key):
+        """对冲等待时间（p90），样本不足时不对冲"""
+        e = self.table.get(key)
+        if not e or len(e["latency_ms"]) < MIN_SAMPLES:
+            return None
+        return percentile(e["latency_ms"], 0.9) / 1000
+
+    def get(self, url, key=None, hedge=False, dead_status=DEAD_STATUS, **kwargs):
+        """
+        带健康记录的 requests.get：
+        - 熔断中抛 CircuitOpenError，预算用完抛 BudgetExhausted
+        - 未指定 timeout 时使用自适应超时
+        - hedge=True 时，超过 p90 仍未返回就再发一次相同请求，取先返回的
+        - 5xx 和 dead_status（默认 404/410）计为失败但照常返回响应；
+          多个地址共用一个键时（如同一域名下的文章）传 dead_status=() 让单个地址失效不影响整个键
+        """
+        key = key or endpoint_key(url)
+        if not self.allow(key):
+            raise CircuitOpenError(f"{key} 熔断中")
+        left = self.remaining()
+        if left is not None and left < 1:
+            raise BudgetExhausted("采集预算已用完")
+        kwargs.setdefault("timeout", self.timeout(key))
+        delay = self.hedge_delay(key) if hedge else None
+        t0 = time.perf_counter()
+        try:
+            r = self._hedged(url, delay, kwargs) if delay else requests.get(url, **kwargs)
+        except requests.RequestException as e:
+            self.record(key, False, time.perf_counter() - t0, f"{type(e).__name__}: {e}")
+            raise
+        ok = r.status_code < 500 and r.status_code not in dead_status
+        self.record(key, ok, time.perf_counter() - t0, None if ok else f"HTTP {r.status_code}")
+        return r
+
+    def _hedged(self, url, delay, kwargs):
+        """先发一次，等 delay 秒还没返回就再发一次，返回先成功的响应（落后的请求在后台自然结束）"""
+        pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            pending = {pool.submit(requests.get, url, **kwargs)}
+            done, pending = wait(pending, timeout=delay)
+            if not done:
+                with self.lock:
+                    self.hedges += 1
+                pending.add(pool.submit(requests.get, url, **kwargs))
+            error = None
+            while done or pending:
+                for f in done:
+                    try:
+                        return f.result()
+                    except requests.RequestException as e:
+                        error = e
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            raise error
+        finally:
+            pool.shutdown(wait=False)
+
+    # ---------- 统计 ----------
+
+    def success_rate(self, key):
+        e = self.table.get(key)
+        if not e or not (e["ok"] + e["fail"]):
+            return None
+        return e["ok"] / (e["ok"] + e["fail"])
+
+    def latency(self, key, q=0.5):
+        e = self.table.get(key)
+        return percentile(e["latency_ms"], q) if e else None
+
+    def order(self, urls, keys=None):
+        """
+        备用链重排：跳过熔断中的端点；有记录的按成功率降序、p50 延迟升序，没有记录的保持原位置靠前尝试。
+        keys：{地址: 端点键}，没列出的地址用 endpoint_key(地址)
+        """
+        keys = keys or {}
+        usable = [u for u in urls if self.allow(keys.get(u) or endpoint_key(u))]
+
+        def rank(pair):
+            pos, url = pair
+            key = keys.get(url) or endpoint_key(url)
+            rate = self.success_rate(key)
+            if rate is None:
+                return (0, 0, pos)
+            return (1, -round(rate, 1), self.latency(key) or 0)
+
+        return [u for _, u in sorted(enumerate(usable), key=rank)]
+
+    def report(self):
+        """健康表（按成功率升序，问题端点在前）"""
+        rows = []
+        for key, e in self.table.items():
+            total = e["ok"] + e["fail"]
+            rows.append({
+                "endpoint": key,
+                "calls": total,
+                "success": e["ok"] / total if total else 0.0,
+                "p50": percentile(e["latency_ms"], 0.5),
+                "p90": percentile(e["latency_ms"], 0.9),
+                "p99": percentile(e["latency_ms"], 0.99),
+                "read_timeout": self.timeout(key)[1],
+                "last_ok": e["last_ok"],
+                "open_until": e["open_until"],
+            })
+        rows.sort(key=lambda r: (r["success"], r["endpoint"]))
+        return rows
+
+    def save(self):
+        with self.lock:
+            save_state(self.state_file, self.table)
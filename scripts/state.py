@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""跨运行持久化的小型 JSON 状态文件（data/.state/ 下）"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write(path, data, fsync=True):
+    """
+    原子写入字节：同目录临时文件写完（并 fsync）后 os.replace 覆盖目标，
+    读者要么看到旧文件，要么看到完整的新文件；fsync=True 时同时 fsync 目录，断电也不丢改名
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def load_state(path, default=None):
+    """读取状态文件，不存在或损坏时返回默认值"""
+    path = Path(path)
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {} if default is None else default
+
+
+def save_state(path, data):
+    """原子写入状态文件（自动创建目录）"""
+    atomic_write(path, json.dumps(data, ensure_ascii=False, indent=1).encode("utf-8"))
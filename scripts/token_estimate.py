@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""粗略 token 估算与截断（不依赖分词器，正文补全和 LLM 预算共用）"""
+
+import re
+
+_CJK = re.compile(r"[一-鿿]")
+
+
+def estimate_tokens(text):
+    """粗略 token 数：中文每字 1 个，其他每 4 个字符 1 个"""
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk) // 4
+
+
+def truncate_tokens(text, budget):
+    """按 token 预算截断（在句末或空白处断开）"""
+    if estimate_tokens(text) <= budget:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    stop = max(cut.rfind(ch) for ch in "。.!?！？\n ")
+    return (cut[:stop + 1] if stop > lo // 2 else cut).rstrip() + "…"
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+多专题 / 多语言版本
+- 专题 = 搜索词 + 关键词过滤；版本 = 专题 + 语言（DIGEST_EDITIONS="robotics,chips,ai:en"）
+- 所有版本共用一次采集：按搜索词抓取的来源把各专题的搜索词合并后只抓一遍
+- 条目按关键词分发到各版本，翻译摘要按条目 id 共享，重复条目只送 LLM 一次
+- 主日报（ai:zh）仍写在 data/ 根目录，其他版本写在 data/<版本>/
+"""
+
+import re
+
+# 按搜索词抓取的板块：搜索词被其他专题放宽后，需要按关键词过滤
+QUERY_SECTIONS = {"YouTube热点", "Twitter热点", "TikTok热点"}
+
+
+class Topic:
+    def __init__(self, key, name_zh, name_en, emoji, query, keywords, curated=False):
+        self.key = key
+        self.name_zh = name_zh
+        self.name_en = name_en
+        self.emoji = emoji
+        self.query = query          # 送给 YouTube/Twitter/TikTok 的搜索词
+        self.curated = curated      # True: 固定来源（RSS、GitHub…）本身就属于该专题，不过滤
+        # 英文关键词按词边界匹配，中文关键词按子串匹配
+        en = [re.escape(k) for k in keywords if k.isascii()]
+        zh = [re.escape(k) for k in keywords if not k.isascii()]
+        parts = ([r"\b(?:%s)\b" % "|".join(en)] if en else []) + zh
+        self.pattern = re.compile("|".join(parts), re.IGNORECASE)
+
+    def matches(self, item):
+        return bool(self.pattern.search(f"{item.title} {item.content}"))
+
+
+TOPICS = {
+    "ai": Topic(
+        "ai", "AI", "AI", "🤖", "AI",
+        ["AI", "LLM", "LLMs", "GPT", "ChatGPT", "OpenAI", "Anthropic", "Claude", "Gemini",
+         "DeepSeek", "machine learning", "neural", "agent", "agents", "model", "models",
+         "人工智能", "大模型", "模型", "智能体", "机器学习"],
+        curated=True,
+    ),
+    "robotics": Topic(
+        "robotics", "机器人", "Robotics", "🦾", "robotics",
+        ["robot", "robots", "robotics", "robotic", "humanoid", "embodied", "Boston Dynamics",
+         "Unitree", "Figure AI", "Optimus", "drone", "drones", "autonomous",
+         "机器人", "人形", "具身", "宇树", "无人机", "自动驾驶"],
+    ),
+    "chips": Topic(
+        "chips", "芯片", "Chips", "🔌", "AI chips",
+        ["chip", "chips", "GPU", "GPUs", "TPU", "NPU", "semiconductor", "semiconductors",
+         "Nvidia", "TSMC", "AMD", "Intel", "Qualcomm", "ASML", "HBM", "wafer", "foundry",
+         "datacenter", "data center", "CUDA",
+         "芯片", "半导体", "算力", "晶圆", "英伟达", "台积电", "光刻", "数据中心"],
+    ),
+}
+
+LOCALES = ("zh", "en")
+
+# 英文版的分类名（固定分类体系 + 板块名）
+CATEGORY_EN = {
+    "模型与产品发布": "Models & Products",
+    "研究与技术突破": "Research",
+    "商业与投融资": "Business & Funding",
+    "政策与监管": "Policy & Regulation",
+    "芯片与算力": "Chips & Compute",
+    "社会与伦理": "Society & Ethics",
+    "行业应用": "Applications",
+    "新闻": "News",
+    "油管博主": "YouTube Creators",
+    "YouTube热点": "YouTube Trending",
+    "Twitter热点": "Twitter Trending",
+    "明星公司动态": "Company Updates",
+    "TikTok热点": "TikTok Trending",
+    "GitHub今日热门": "GitHub Trending Today",
+    "GitHub本周热门": "GitHub Trending This Week",
+    "AI Agent热门": "AI Agents",
+    "MCP工具热门": "MCP Tools",
+    "AI Skills热门": "AI Skills",
+    "HuggingFace热门": "HuggingFace Trending",
+}
+
+
+class Edition:
+    def __init__(self, topic, locale="zh"):
+        if locale not in LOCALES:
+            raise ValueError(f"不支持的语言: {locale}")
+        self.topic = topic
+        self.locale = locale
+
+    @property
+    def key(self):
+        """版本目录名（主日报为空串）"""
+        if self.is_main:
+            return ""
+        return self.topic.key if self.locale == "zh" else f"{self.topic.key}-{self.locale}"
+
+    @property
+    def is_main(self):
+        return self.topic.key == "ai" and self.locale == "zh"
+
+    @property
+    def title(self):
+        if self.locale == "en":
+            return f"{self.topic.emoji} {self.topic.name_en} Daily Digest"
+        sep = " " if self.topic.name_zh.isascii() else ""
+        return f"{self.topic.emoji} {self.topic.name_zh}{sep}资讯日报"
+
+    def accepts(self, item, widened=True):
+        """条目是否属于该版本（widened=False 表示搜索词未被其他专题放宽）"""
+        if item.section in QUERY_SECTIONS:
+            return not widened or self.topic.matches(item)
+        return self.topic.curated or self.topic.matches(item)
+
+    def category(self, name):
+        return CATEGORY_EN.get(name, name) if self.locale == "en" else name
+
+    def __repr__(self):
+        return f"Edition({self.topic.key}:{self.locale})"
+
+
+MAIN = Edition(TOPICS["ai"], "zh")
+
+
+def parse_editions(spec):
+    """"robotics,chips,ai:en" → 额外版本列表（不含主日报，未知专题报错）"""
+    editions, seen = [], {MAIN.key}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, _, locale = part.partition(":")
+        if key not in TOPICS:
+            raise ValueError(f"未知专题: {key}（可选 {', '.join(TOPICS)}）")
+        edition = Edition(TOPICS[key], locale or "zh")
+        if edition.key not in seen:
+            seen.add(edition.key)
+            editions.append(edition)
+    return editions
+
+
+def merged_queries(base, editions):
+    """主搜索词 + 各专题搜索词（去重保序）"""
+    queries = list(base)
+    for ed in editions:
+        if ed.topic.query not in queries:
+            queries.append(ed.topic.query)
+    return queries
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+基于历史存档的趋势检测
+- 每天的实体/词频计数（GitHub 仓库、HuggingFace 模型、英文专有名词）持久化
+- 每次运行只补充新日期的存档并覆盖当天计数
+- 突发度 = 今日计数相对前 N 天均值的泊松 z 分数，附带近 14 天折线数据
+"""
+
+import json
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from state import load_state, save_state
+
+WINDOW_DAYS = 7
+SPARK_DAYS = 14
+
+_GITHUB = re.compile(r"github\.com/(?:repos/)?([\w.-]+/[\w.-]+)")
+_HF = re.compile(r"huggingface\.co/([\w.-]+/[\w.-]+)")
+_NAME = re.compile(r"\b[A-Z][A-Za-z0-9]*(?:[-.][A-Za-z0-9]+)*\b")
+
+STOPWORDS = {
+    "AI", "The", "A", "An", "And", "For", "With", "In", "On", "Of", "To", "Is", "Are",
+    "How", "What", "Why", "This", "That", "New", "Its", "It", "At", "By", "From",
+    "We", "You", "Your", "Our", "I", "My", "Can", "Will", "Now", "Just", "Not",
+    "Python", "TypeScript", "JavaScript", "Unknown", "MCP", "API",
+}
+
+
+def extract_terms(item):
+    """条目 → 实体键列表（repo:/model:/term: 前缀区分类型）"""
+    link = item.get("链接", "")
+    keys = []
+    if m := _GITHUB.search(link):
+        keys.append(f"repo:{m.group(1).lower()}")
+    elif m := _HF.search(link):
+        keys.append(f"model:{m.group(1).lower()}")
+    text = f"{item.get('标题', '')} {item.get('内容', '')}"
+    names = {n for n in _NAME.findall(text) if n not in STOPWORDS and len(n) >= 3}
+    keys.extend(f"term:{n}" for n in names)
+    return keys
+
+
+def count_items(items):
+    counts = Counter()
+    for it in items:
+        counts.update(set(extract_terms(it)))  # 一条内重复出现只计一次
+    return counts
+
+
+class TrendEngine:
+    def __init__(self, data_dir, state_dir):
+        self.data_dir = Path(data_dir)
+        self.state_file = Path(state_dir) / "trend_counts.json"
+        self.state = load_state(self.state_file, {"days": {}})
+        self.days = self.state.setdefault("days", {})
+
+    def sync_archive(self, skip_date=None):
+        """补充尚未计数的存档日期"""
+        for f in sorted(self.data_dir.glob("digest_*.json")):
+            date = f.stem[len("digest_"):]
+            if date in self.days or date == skip_date:
+                continue
+            try:
+                data = json.loads(f.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if data.get("error"):
+                continue
+            items = [it for items in data.get("categories", {}).values() for it in items
+                     if isinstance(it, dict)]
+            self.days[date] = dict(count_items(items))
+
+    def update(self, date, items):
+        """用当天条目覆盖当天计数（同日重跑不会重复累加）"""
+        self.sync_archive(skip_date=date)
+        self.days[date] = dict(count_items(items))
+
+    def series(self, key, end_date, n):
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        dates = [(end - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n - 1, -1, -1)]
+        return [self.days.get(d, {}).get(key, 0) for d in dates]
+
+    def top(self, date, limit=10, min_count=2):
+        """当天突发度最高的实体"""
+        today = self.days.get(date, {})
+        ranked = []
+        for key, c in today.items():
+            kind, name = key.split(":", 1)
+            # 仓库/模型出现一次即有意义，普通词至少出现 min_count 次
+            if kind == "term" and c < min_count:
+                continue
+            history = self.series(key, date, WINDOW_DAYS + 1)[:-1]
+            mean = sum(history) / WINDOW_DAYS
+            score = (c - mean) / (mean + 1) ** 0.5
+            if score <= 0:
+                continue
+            ranked.append({
+                "name": name,
+                "kind": kind,
+                "count": c,
+                "score": round(score, 2),
+                "sparkline": self.series(key, date, SPARK_DAYS),
+            })
+        ranked.sort(key=lambda r: (-r["score"], -r["count"], r["name"]))
+        return ranked[:limit]
+
+    def save(self):
+        save_state(self.state_file, self.state)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Twitter 增量抓取（twitterapi.io）
+- 每个账号持久化 since_id、每个搜索词持久化已见 ID，只输出上次之后的新推文
+- 抓到的推文先记在 pending 里，日报写出成功后 commit() 才推进 since_id / 已见 ID；
+  中途崩溃或 LLM 失败时下次重新抓取，不会丢推文
+- 跟随分页游标，直到越过 24 小时窗口边界
+- 多账号并发抓取，整体受全局限速约束
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+
+import requests
+
+from state import load_state, save_state
+
+SEARCH_URL = "https://api.twitterapi.io/twitter/tweet/advanced_search"
+USER_TWEETS_URL = "https://api.twitterapi.io/twitter/user/last_tweets"
+
+MAX_PAGES = 5  # 单个账号/搜索词最多翻页数，防止异常时无限翻页
+
+
+def parse_created_at(value):
+    """解析 twitterapi.io 的 createdAt（如 "Tue Dec 10 07:00:30 +0000 2024"）"""
+    if not value:
+        return None
+    for fmt in ("%a %b %d %H:%M:%S %z %Y", "%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
+        try:
+            return datetime.strptime(value.replace("Z", "+0000"), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def tweet_id(t):
+    try:
+        return int(t.get("id", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class RateLimiter:
+    """线程安全的最小间隔限速器"""
+
+    def __init__(self, qps):
+        self.interval = 1.0 / qps if qps > 0 else 0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TwitterIncrementalFetcher:
+    def __init__(self, api_key, state_dir, qps=1.0, workers=4, get=None):
+        self.api_key = api_key
+        self.get = get or partial(requests.get, timeout=30)  # 可替换为带健康记录/自适应超时的 get
+        self.limiter = RateLimiter(qps)
+        self.workers = workers
+        self.state_file = state_dir / "twitter_cursors.json"
+        self.state = load_state(self.state_file, {"accounts": {}, "queries": {}})
+        self.state.setdefault("accounts", {})
+        self.state.setdefault("queries", {})
+        # 已输出、还没随日报落盘的推文：{"accounts": {账号: {id: 链接}}, "queries": {搜索词: {id: [发布时间, 链接]}}}
+        self.pending = self.state.setdefault("pending", {"accounts": {}, "queries": {}})
+        self.lock = threading.Lock()
+
+    def _get(self, url, params):
+        self.limiter.wait()
+        r = self.get(url, headers={"x-api-key": self.api_key}, params=params)
+        return r.json()
+
+    def _paginate(self, url, params, extract, is_old, boundary, stop_on_old=False):
+        """翻页直到越过时间边界（或按时间排序时遇到已见过的推文），返回新推文"""
+        new = []
+        cursor = ""
+        for _ in range(MAX_PAGES):
+            data = self._get(url, {**params, "cursor": cursor} if cursor else params)
+            tweets = extract(data)
+            reached_end = False
+            for t in tweets:
+                created = parse_created_at(t.get("createdAt", ""))
+                if created and created < boundary:
+                    reached_end = True
+                    continue
+                if is_old(t):
+                    reached_end = reached_end or stop_on_old
+                    continue
+                new.append(t)
+            cursor = data.get("next_cursor") or data.get("data", {}).get("next_cursor") or ""
+            has_next = data.get("has_next_page", data.get("data", {}).get("has_next_page", False))
+            if reached_end or not tweets or not has_next or not cursor:
+                break
+        return new
+
+    def search(self, query, boundary, query_type="Top"):
+        """
+        增量搜索：查询语句带 since_time 限定窗口，已输出过的推文 ID 不再返回。
+        Top 排序不是按时间的，所以这里记录已见 ID 而不是 since_id，
+        否则稍早发布、后来才变热的推文会被漏掉。
+        """
+        entry = self.state["queries"].get(query, {})
+        seen = set(entry.get("seen", {}))
+        q = f"{query} since_time:{int(boundary.timestamp())}"
+        return self._paginate(SEARCH_URL, {"query": q, "queryType": query_type},
+                              lambda d: d.get("tweets", []),
+                              lambda t: str(t.get("id", "")) in seen, boundary)
+
+    def mark_seen(self, query, tweets):
+        """记录已输出的搜索结果（commit() 后才生效）"""
+        with self.lock:
+            pending = self.pending["queries"].setdefault(query, {})
+            for t in tweets:
+                pending[str(t.get("id", ""))] = [t.get("createdAt", ""), (t.get("url") or "").strip()]
+
+    def account_tweets(self, user, boundary):
+        """账号时间线按时间倒序，用 since_id 截断（新的 since_id 在 commit() 时推进）"""
+        since_id = int(self.state["accounts"].get(user, {}).get("since_id", 0))
+        tweets = self._paginate(USER_TWEETS_URL, {"userName": user},
+                                lambda d: d.get("tweets") or d.get("data", {}).get("tweets", []),
+                                lambda t: tweet_id(t) <= since_id, boundary, stop_on_old=True)
+        if tweets:
+            with self.lock:
+                pending = self.pending["accounts"].setdefault(user, {})
+                pending.update({str(tweet_id(t)): (t.get("url") or "").strip() for t in tweets})
+        return tweets
+
+    def commit(self, boundary, retry_urls=()):
+        """
+        日报写出后推进游标：账号 since_id 推进到已输出的最新推文，搜索词记入已见 ID 并清理窗口外的旧 ID。
+        retry_urls 中的推文（增量更新没并入的）不推进，下次重新抓取
+        """
+        retry_urls = set(retry_urls)
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.lock:
+            for user, fetched in self.pending["accounts"].items():
+                ids = sorted(int(i) for i in fetched)
+                retry = [int(i) for i, url in fetched.items() if url in retry_urls]
+                if retry:
+                    ids = [i for i in ids if i < min(retry)]  # since_id 只能推进到第一条要重试的推文之前
+                if ids:
+                    entry = self.state["accounts"].setdefault(user, {})
+                    entry["since_id"] = str(max(int(entry.get("since_id", 0)), ids[-1]))
+                    entry["updated_at"] = now
+            for query, fetched in self.pending["queries"].items():
+                entry = self.state["queries"].setdefault(query, {})
+                seen = entry.get("seen", {})
+                seen.update({i: created for i, (created, url) in fetched.items() if url not in retry_urls})
+                entry["seen"] = {
+                    k: v for k, v in seen.items()
+                    if (parse_created_at(v) or boundary) >= boundary
+                }
+                entry["updated_at"] = now
+            self.pending = self.state["pending"] = {"accounts": {}, "queries": {}}
+
+    def fetch_accounts(self, users, boundary):
+        """并发抓取多个账号，返回 {user: tweets 或 Exception}"""
+        def run(user):
+            try:
+                return user, self.account_tweets(user, boundary)
+            except Exception as e:
+                return user, e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(users)))) as pool:
+            return dict(pool.map(run, users))
+
+    def save(self):
+        with self.lock:
+            save_state(self.state_file, self.state)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+YouTube 配额感知的抓取规划器
+- 多个搜索词的视频 ID 合并成 50 个一批的 videos.list 请求
+- 配额账本持久化（按太平洋时间日重置，与 Google 一致）
+- 视频统计短期缓存，避免重复消耗配额
+- 按历史产出（通过播放量筛选的条数）给搜索词排序
+"""
+
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from zoneinfo import ZoneInfo
+
+import requests
+
+from state import load_state, save_state
+
+SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+SEARCH_COST = 100       # search.list 每次 100 单位
+VIDEOS_COST = 1         # videos.list 每次 1 单位（最多 50 个 ID）
+DAILY_QUOTA = 10000
+VIDEOS_BATCH = 50
+
+
+class YouTubeFetchPlanner:
+    def __init__(self, api_key, state_dir, run_budget=1000, stats_ttl_hours=6, get=None):
+        self.api_key = api_key
+        self.get = get or partial(requests.get, timeout=30)  # 可替换为带健康记录/自适应超时的 get
+        self.run_budget = run_budget
+        self.stats_ttl = timedelta(hours=stats_ttl_hours)
+
+        self.ledger_file = state_dir / "youtube_quota.json"
+        self.cache_file = state_dir / "youtube_stats_cache.json"
+        self.yield_file = state_dir / "youtube_query_yield.json"
+
+        self.ledger = load_state(self.ledger_file)
+        self.stats_cache = load_state(self.cache_file)
+        self.query_yield = load_state(self.yield_file)
+
+        # 配额在太平洋时间午夜重置
+        quota_day = datetime.now(ZoneInfo("America/Los_Angeles")).strftime("%Y-%m-%d")
+        if self.ledger.get("date") != quota_day:
+            self.ledger = {"date": quota_day, "used": 0, "runs": []}
+        self.run_used = 0
+
+    # ---------- 配额 ----------
+
+    def remaining(self):
+        """本次运行还能用的配额（同时受每日总额限制）"""
+        day_left = DAILY_QUOTA - self.ledger["used"]
+        return max(0, min(self.run_budget - self.run_used, day_left))
+
+    def _charge(self, units):
+        self.run_used += units
+        self.ledger["used"] += units
+
+    # ---------- 规划 ----------
+
+    def prioritized(self, queries):
+        """按历史产出率排序（拉普拉斯平滑，新词排在中间）"""
+        def score(q):
+            y = self.query_yield.get(q, {})
+            return (y.get("passed", 0) + 1) / (y.get("runs", 0) + 2)
+        return sorted(queries, key=score, reverse=True)
+
+    def plan(self, queries):
+        """在剩余配额内能执行的搜索词（为 videos.list 预留配额）"""
+        ordered = self.prioritized(queries)
+        planned = []
+        budget = self.remaining()
+        for q in ordered:
+            # 每个搜索最多 50 个新 ID，对应至多 1 次 videos.list
+            cost = SEARCH_COST + VIDEOS_COST
+            if budget < cost:
+                break
+            planned.append(q)
+            budget -= cost
+        return planned
+
+    # ---------- API ----------
+
+    def search(self, query, published_after, max_results=10, region="US"):
+        """search.list，返回原始 items"""
+        self._charge(SEARCH_COST)
+        r = self.get(SEARCH_URL, params={
+            "key": self.api_key,
+            "part": "snippet",
+            "q": query,
+            "order": "relevance",
+            "maxResults": max_results,
+            "regionCode": region,
+            "type": "video",
+            "publishedAfter": published_after
+        })
+        data = r.json()
+        if "items" not in data:
+            raise RuntimeError(data.get("error", {}).get("message", "错误"))
+        return data["items"]
+
+    def statistics(self, video_ids):
+        """批量获取视频统计（命中缓存的不再请求）"""
+        now = datetime.now(timezone.utc)
+        result, missing = {}, []
+        for vid in dict.fromkeys(video_ids):
+            cached = self.stats_cache.get(vid)
+            if cached and now - datetime.fromisoformat(cached["fetched_at"]) < self.stats_ttl:
+                result[vid] = cached["statistics"]
+            else:
+                missing.append(vid)
+
+        for i in range(0, len(missing), VIDEOS_BATCH):
+            if self.remaining() < VIDEOS_COST:
+                print("  ⚠️ YouTube 配额不足，部分视频缺少统计")
+                break
+            chunk = missing[i:i + VIDEOS_BATCH]
+            self._charge(VIDEOS_COST)
+            r = self.get(VIDEOS_URL, params={
+                "key": self.api_key,
+                "part": "statistics",
+                "id": ",".join(chunk)
+            })
+            for item in r.json().get("items", []):
+                result[item["id"]] = item["statistics"]
+                self.stats_cache[item["id"]] = {
+                    "fetched_at": now.isoformat(),
+                    "statistics": item["statistics"]
+                }
+        return result
+
+    def record_yield(self, query, passed):
+        y = self.query_yield.setdefault(query, {"runs": 0, "passed": 0})
+        y["runs"] += 1
+        y["passed"] += passed
+
+    # ---------- 持久化 ----------
+
+    def save(self):
+        now = datetime.now(timezone.utc)
+        self.stats_cache = {
+            vid: c for vid, c in self.stats_cache.items()
+            if now - datetime.fromisoformat(c["fetched_at"]) < self.stats_ttl
+        }
+        self.ledger["runs"].append({"at": now.isoformat(timespec="seconds"), "used": self.run_used})
+        save_state(self.ledger_file, self.ledger)
+        save_state(self.cache_file, self.stats_cache)
+        save_state(self.yield_file, self.query_yield)
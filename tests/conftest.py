@@ -0,0 +1,6 @@
+"""scripts/ 下的模块是平铺的（脚本之间直接 import），测试时同样从 scripts/ 导入"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
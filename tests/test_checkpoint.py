@@ -0,0 +1,49 @@
+import pytest
+
+from checkpoint import CheckpointStore
+from generate_digest import AIDigestGenerator
+from items import DigestItem
+
+
+def test_store_roundtrip_and_clear(tmp_path):
+    ckpt = CheckpointStore(tmp_path / "2026-03-01")
+    assert ckpt.stages() == []
+    assert not ckpt.has("collect")
+
+    ckpt.save("collect", [{"title": "中文标题"}])
+    ckpt.save("batch_0", {"a1": {"标题": "译文"}})
+    assert ckpt.has("collect")
+    assert ckpt.load("collect") == [{"title": "中文标题"}]
+    assert ckpt.stages() == ["batch_0", "collect"]
+    assert not list(ckpt.root.glob("*.tmp"))
+
+    ckpt.clear()
+    assert ckpt.stages() == []
+    assert not ckpt.root.exists()
+
+
+def test_collect_stage_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    gen = AIDigestGenerator()
+    item = DigestItem(title="Resumed", url="https://example.com/a", source="RSS",
+                      section="新闻", published="2026-03-01T08:00:00+00:00",
+                      content="summary", extra="⭐ 1,200", engagement=1200)
+    ckpt = gen.checkpoints()
+    ckpt.save("collect", [item.to_record()])
+
+    def collect():
+        pytest.fail("有采集检查点时不应重新采集")
+
+    monkeypatch.setattr(gen, "collect", collect)
+    gen.collect_stage(gen.checkpoints())
+
+    [restored] = gen.all_items
+    assert restored.to_dict() == item.to_dict()
+    assert restored.engagement == 1200
+
+
+def test_fresh_discards_checkpoints(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    gen = AIDigestGenerator()
+    gen.checkpoints().save("collect", [])
+    assert gen.checkpoints(fresh=True).stages() == []
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from digest_io import DigestSchemaError, latest_path, validate_digest, write_digest
+
+
+def sample(day="2026-03-01", **extra):
+    return {
+        "date": day,
+        "categories": {"新闻": [{"id": "a1", "标题": "标题", "链接": "https://example.com/a",
+                                "内容": "摘要", "来源": "RSS", "日期": "", "额外": None}]},
+        "analysis": {"summary": "总结", "trends": []},
+        **extra,
+    }
+
+
+@pytest.mark.parametrize("day", ["2026-03-01", "2026-W10", "2026-03"])
+def test_validate_accepts_daily_and_rollup_dates(day):
+    validate_digest(sample(day, usage={"prompt_tokens": 1, "completion_tokens": 2,
+                                       "calls": 1, "cost_cny": 0.01}))
+
+
+@pytest.mark.parametrize("mutate, message", [
+    (lambda d: d.pop("analysis"), "缺少字段 analysis"),
+    (lambda d: d.update(date="../latest"), "无效的日期"),
+    (lambda d: d.update(categories=[]), "digest.categories"),
+    (lambda d: d["analysis"].update(summary=None), "analysis.summary"),
+    (lambda d: d.update(usage={"calls": 1}), "usage: 缺少字段"),
+    (lambda d: d["categories"].update(新闻={}), "应为列表"),
+    (lambda d: d["categories"]["新闻"][0].pop("链接"), r"categories\[新闻\]\[0\]: 缺少字段 链接"),
+    (lambda d: d["categories"]["新闻"][0].update(标题=3), r"categories\[新闻\]\[0\]\.标题"),
+])
+def test_validate_rejects(mutate, message):
+    data = sample()
+    mutate(data)
+    with pytest.raises(DigestSchemaError, match=message):
+        validate_digest(data)
+
+
+def test_validate_ignores_unknown_fields():
+    data = sample(extra_field=1)
+    data["categories"]["新闻"][0]["新字段"] = []
+    validate_digest(data)
+
+
+def test_write_digest_same_bytes_and_no_partial_files(tmp_path):
+    out = write_digest(tmp_path, sample())
+    assert out == tmp_path / "digest_2026-03-01.json"
+    assert out.read_bytes() == (tmp_path / "latest.json").read_bytes()
+    assert json.loads(out.read_text(encoding="utf-8")) == sample()
+
+    write_digest(tmp_path, sample("2026-W10"), latest=False)
+    assert json.loads((tmp_path / "latest.json").read_text(encoding="utf-8"))["date"] == "2026-03-01"
+
+    with pytest.raises(DigestSchemaError):
+        write_digest(tmp_path, sample("2026-03-02", analysis={}))
+    assert not (tmp_path / "digest_2026-03-02.json").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "digest_2026-03-01.json", "digest_2026-W10.json", "latest.json"]
+
+
+def test_latest_path_missing_files(tmp_path):
+    assert latest_path(tmp_path) is None
+    (tmp_path / "digest_2026-03-01.json").write_text("{}")
+    assert latest_path(tmp_path) == tmp_path / "digest_2026-03-01.json"
+    (tmp_path / "latest.json").write_text("{}")
+    assert latest_path(tmp_path) == tmp_path / "latest.json"
+
+
+def test_latest_path_prefers_newer_dated_file_after_interrupted_write(tmp_path):
+    write_digest(tmp_path, sample("2026-03-01"))
+    write_digest(tmp_path, sample("2026-03-02"), latest=False)  # 写完当日文件、latest.json 还没写
+    assert latest_path(tmp_path) == tmp_path / "digest_2026-03-02.json"
+
+    write_digest(tmp_path, sample("2026-03-02"))
+    assert latest_path(tmp_path) == tmp_path / "latest.json"
+
+
+def test_latest_path_keeps_newer_latest_placeholder(tmp_path):
+    write_digest(tmp_path, sample("2026-03-01"))
+    (tmp_path / "latest.json").write_text(json.dumps({"date": "2026-03-02", "error": "boom"}))
+    assert latest_path(tmp_path) == tmp_path / "latest.json"
@@ -0,0 +1,69 @@
+import json
+from datetime import date, timedelta
+
+from feeds import FEED_DAYS, FeedWindow, write_feeds
+
+
+def digest(day, *items, cat="新闻"):
+    data = {"date": day, "categories": {cat: [{"标题": t, "链接": link} for t, link in items]}}
+    return data, json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def days(n):
+    start = date(2026, 3, 1)
+    return [(start + timedelta(days=i)).isoformat() for i in range(n)]
+
+
+def test_window_keeps_last_feed_days(tmp_path):
+    window = FeedWindow(tmp_path)
+    for day in days(FEED_DAYS + 2):
+        assert window.add_day(*digest(day, (day, f"https://example.com/{day}")))
+
+    assert sorted(window.state["days"]) == days(FEED_DAYS + 2)[2:]
+    assert [e["title"] for e in window.entries()] == days(FEED_DAYS + 2)[:1:-1]
+    assert set(window.state["seen"]) == {e["id"] for e in window.entries()}
+
+
+def test_unchanged_or_error_day_is_ignored(tmp_path):
+    window = FeedWindow(tmp_path)
+    assert window.add_day(*digest("2026-03-01", ("A", "https://example.com/a")))
+    assert not window.add_day(*digest("2026-03-01", ("A", "https://example.com/a")))
+    assert not window.add_day({"date": "2026-03-02", "error": "boom", "categories": {}}, b"{}")
+    assert list(window.state["days"]) == ["2026-03-01"]
+
+
+def test_duplicates_keep_latest_version_and_first_seen_time(tmp_path):
+    window = FeedWindow(tmp_path)
+    window.add_day(*digest("2026-03-01", ("Old title", "https://www.example.com/a/?utm_source=x")))
+    stamp = dict(window.state["seen"]["https://example.com/a"])
+
+    window.add_day(*digest("2026-03-02", ("Other", "https://example.com/b")))
+    assert window.state["seen"]["https://example.com/a"] == stamp  # 内容没变，时间戳不变
+
+    window.add_day(*digest("2026-03-03", ("New title", "https://example.com/a"), cat="论文"))
+    entries = window.entries()
+    assert [e["title"] for e in entries] == ["New title", "Other"]
+    assert entries[0]["category"] == "论文"
+    assert window.state["seen"]["https://example.com/a"]["published"] == stamp["published"]
+    assert window.state["seen"]["https://example.com/a"]["sig"] != stamp["sig"]
+
+
+def test_write_feeds_skips_unchanged(tmp_path):
+    window = FeedWindow(tmp_path / "state")
+    window.add_day(*digest("2026-03-01", ("A", "https://example.com/a")))
+    written = []
+
+    def write(path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        written.append(path.name)
+
+    docs = tmp_path / "docs"
+    assert write_feeds(window, docs, "https://digest.example.com/", write)
+    assert written == ["feed.xml", "feed.json"]
+    assert json.loads((docs / "feed.json").read_text(encoding="utf-8"))["items"][0]["id"] == "https://example.com/a"
+
+    window.save()
+    reloaded = FeedWindow(tmp_path / "state")
+    assert not write_feeds(reloaded, docs, "https://digest.example.com/", write)
+    assert len(written) == 2
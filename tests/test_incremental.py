@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+from incremental import LATE_GRACE, DigestWatermark, merge_delta
+from items import DigestItem
+
+T0 = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make(name, published=None, section="新闻"):
+    return DigestItem(title=name, url=f"https://example.com/{name}", source="test",
+                      section=section, published=published)
+
+
+def row(item_id, link=None):
+    return {"id": item_id, "标题": item_id, "链接": link or f"https://example.com/{item_id}"}
+
+
+# ---------- DigestWatermark.fresh ----------
+
+def test_fresh_without_watermark_keeps_everything(tmp_path):
+    mark = DigestWatermark(tmp_path, "2026-03-01")
+    items = [make("a", T0 - timedelta(days=3)), make("b")]
+    assert mark.fresh(items) == items
+
+
+def test_fresh_skips_seen_known_and_stale(tmp_path):
+    mark = DigestWatermark(tmp_path, "2026-03-01")
+    seen, in_digest, by_link, stale = make("seen"), make("digest"), make("link"), make("stale", T0 - LATE_GRACE * 2)
+    late, undated = make("late", T0 - LATE_GRACE / 2), make("undated")
+    mark.advance([seen], T0)
+
+    fresh = mark.fresh([seen, in_digest, by_link, stale, late, undated],
+                       known={in_digest.id, by_link.url})
+    assert fresh == [late, undated]
+
+
+def test_watermark_persists_within_the_day_only(tmp_path):
+    mark = DigestWatermark(tmp_path, "2026-03-01")
+    item = make("a")
+    mark.advance([item], T0, scores={item.id: 0.5})
+    mark.save()
+
+    again = DigestWatermark(tmp_path, "2026-03-01")
+    assert again.watermark == T0
+    assert again.fresh([item]) == []
+    assert again.scores == {item.id: 0.5}
+
+    tomorrow = DigestWatermark(tmp_path, "2026-03-02")
+    assert tomorrow.watermark is None
+    assert tomorrow.fresh([item]) == [item]
+
+
+# ---------- merge_delta ----------
+
+def test_merge_delta_reranks_by_score_and_caps():
+    categories = {"新闻": [row("a"), row("b")]}
+    scores = {"a": 0.5, "b": 0.1, "c": 0.9, "d": 0.05}
+    merged, changed = merge_delta(categories, {"新闻": [row("c"), row("d")]}, scores, limit=3)
+    assert [it["id"] for it in merged["新闻"]] == ["c", "a", "b"]
+    assert changed == ["新闻"]
+    assert [it["id"] for it in categories["新闻"]] == ["a", "b"]  # 不改动传入的数据
+
+
+def test_merge_delta_dedupes_by_id_and_link():
+    categories = {"新闻": [row("a")]}
+    additions = {"新闻": [row("a"), row("x", link="https://example.com/a")]}
+    merged, changed = merge_delta(categories, additions, {"x": 1.0})
+    assert merged == categories
+    assert changed == []
+
+
+def test_merge_delta_unscored_existing_items_sink_in_order():
+    categories = {"新闻": [row("old1"), row("old2")]}
+    merged, _ = merge_delta(categories, {"新闻": [row("new")]}, {"new": 0.2})
+    assert [it["id"] for it in merged["新闻"]] == ["new", "old1", "old2"]
+
+
+def test_merge_delta_new_category_and_rejected_additions():
+    categories = {"新闻": [row("a")]}
+    additions = {"开源": [row("r")], "新闻": [row("low")]}
+    merged, changed = merge_delta(categories, additions, {"a": 0.9, "low": 0.1}, limit=1)
+    assert merged == {"新闻": [row("a")], "开源": [row("r")]}
+    assert changed == ["开源"]
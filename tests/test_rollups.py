@@ -0,0 +1,60 @@
+from datetime import date
+
+from rollups import Rollup, period_of
+
+
+def test_period_of_iso_week():
+    assert period_of("weekly", date(2026, 3, 4)) == ("2026-W10", date(2026, 3, 2), date(2026, 3, 8))
+    # 年初几天属于上一年的最后一周
+    assert period_of("weekly", date(2027, 1, 1)) == ("2026-W53", date(2026, 12, 28), date(2027, 1, 3))
+
+
+def test_period_of_month():
+    assert period_of("monthly", date(2026, 2, 14)) == ("2026-02", date(2026, 2, 1), date(2026, 2, 28))
+    assert period_of("monthly", date(2024, 2, 29)) == ("2024-02", date(2024, 2, 1), date(2024, 2, 29))
+    assert period_of("monthly", date(2026, 12, 31)) == ("2026-12", date(2026, 12, 1), date(2026, 12, 31))
+
+
+def item(title, link, extra=None):
+    d = {"标题": title, "链接": link}
+    if extra:
+        d["额外"] = extra
+    return d
+
+
+def test_ranked_recurrence_then_engagement():
+    roll = Rollup()
+    roll.fold("2026-03-02", {"categories": {"开源": [
+        item("Recurring project", "https://github.com/a/recurring"),
+        item("Popular project", "https://github.com/b/popular", "⭐ 90,000"),
+    ]}}, "h1")
+    roll.fold("2026-03-03", {"categories": {"开源": [
+        item("Recurring project", "https://www.github.com/A/Recurring/"),
+        item("Quiet project", "https://github.com/c/quiet", "⭐ 10"),
+    ]}}, "h2")
+
+    ranked = roll.ranked()["开源"]
+    # 两天上榜计 2 分，不如一天上榜的 9 万星项目（1 + 0.5 × log10(90001) ≈ 3.5）
+    assert [key for key, _ in ranked] == ["github.com/b/popular", "github.com/a/recurring", "github.com/c/quiet"]
+    assert dict(ranked)["github.com/a/recurring"] == "2026-03-03"
+    assert roll.state()["days"] == {"2026-03-02": "h1", "2026-03-03": "h2"}
+
+
+def test_fold_merges_by_title_and_uses_latest_category():
+    roll = Rollup()
+    roll.fold("2026-03-02", {"categories": {"新闻": [item("Same headline everywhere", "https://a.example.com/x")]}}, "h1")
+    roll.fold("2026-03-03", {"categories": {"论文": [item("Same headline everywhere!", "https://b.example.com/y")]}}, "h2")
+
+    assert roll.ranked() == {"论文": [("a.example.com/x", "2026-03-03")]}
+
+
+def test_fold_skips_items_without_link_and_same_day_duplicates():
+    roll = Rollup()
+    roll.fold("2026-03-02", {"categories": {"新闻": [
+        item("No link", ""),
+        item("Twice", "https://example.com/t", "🔥 5"),
+        item("Twice", "https://example.com/t", "🔥 500"),
+    ]}}, "h1")
+
+    assert list(roll.pool) == ["example.com/t"]
+    assert roll.pool["example.com/t"]["d"] == {"2026-03-02": [5, "新闻", 1]}
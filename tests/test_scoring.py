@@ -0,0 +1,53 @@
+import numpy as np
+
+from items import DigestItem
+from scoring import EngagementScorer, select_top
+
+
+def make(section, n):
+    return [DigestItem(title=f"{section} {i}", url=f"https://example.com/{section}/{i}",
+                       source="test", section=section) for i in range(n)]
+
+
+def test_select_top_per_section_keeps_highest_scores():
+    items = make("新闻", 4)
+    selected = select_top(items, np.array([0.1, 0.9, 0.5, 0.7]), per_section=2)
+    assert [it.title for it in selected] == ["新闻 1", "新闻 3"]
+
+
+def test_select_top_caps_each_section_independently():
+    items = make("新闻", 3) + make("开源", 3)
+    scores = np.array([0.9, 0.8, 0.7, 0.3, 0.2, 0.1])
+    selected = select_top(items, scores, per_section=2)
+    assert [it.title for it in selected] == ["新闻 0", "新闻 1", "开源 0", "开源 1"]
+
+
+def test_select_top_total_applies_after_section_limit():
+    items = make("新闻", 3) + make("开源", 3)
+    scores = np.array([0.9, 0.8, 0.7, 0.85, 0.2, 0.1])
+    selected = select_top(items, scores, per_section=2, total=3)
+    assert [it.title for it in selected] == ["新闻 0", "开源 0", "新闻 1"]
+
+
+def test_select_top_ties_keep_input_order():
+    items = make("新闻", 3)
+    selected = select_top(items, np.zeros(3), per_section=3)
+    assert selected == items
+
+
+def test_select_top_empty():
+    assert select_top([], np.zeros(0)) == []
+
+
+def test_score_updates_baselines_only_when_asked(tmp_path):
+    items = [DigestItem(title=f"t{i}", url=f"https://example.com/{i}", source="test",
+                        section="新闻", engagement=10 ** i) for i in range(4)]
+    scorer = EngagementScorer(tmp_path)
+    scorer.score(items)
+    assert scorer.baselines == {}
+
+    scorer.score(items, update=True)
+    assert scorer.baselines["新闻"]["runs"] == 1
+    before = dict(scorer.baselines["新闻"])
+    scorer.score(items[:1])
+    assert scorer.baselines["新闻"] == before
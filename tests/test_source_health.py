@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import source_health
+from source_health import (BASE_BACKOFF, FAIL_THRESHOLD, CircuitOpenError, SourceHealth,
+                           endpoint_key)
+
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+KEY = "api.example.com/v1"
+
+
+def fail(health, n, now=T0):
+    for _ in range(n):
+        health.record(KEY, False, 0.1, "HTTP 500", now=now)
+
+
+def test_breaker_opens_after_threshold(tmp_path):
+    health = SourceHealth(tmp_path)
+    fail(health, FAIL_THRESHOLD - 1)
+    assert health.allow(KEY, now=T0)
+    fail(health, 1)
+    assert not health.allow(KEY, now=T0)
+    assert not health.allow(KEY, now=T0 + BASE_BACKOFF / 2)
+
+
+def test_probe_after_backoff_and_doubling_on_failure(tmp_path):
+    health = SourceHealth(tmp_path)
+    fail(health, FAIL_THRESHOLD)
+    probe_at = T0 + BASE_BACKOFF
+    assert health.allow(KEY, now=probe_at)  # 半开：放行一次探测
+
+    fail(health, 1, now=probe_at)
+    assert not health.allow(KEY, now=probe_at + BASE_BACKOFF)
+    assert health.allow(KEY, now=probe_at + BASE_BACKOFF * 2)
+
+
+def test_success_closes_breaker(tmp_path):
+    health = SourceHealth(tmp_path)
+    fail(health, FAIL_THRESHOLD)
+    health.record(KEY, True, 0.1, now=T0 + BASE_BACKOFF)
+    assert health.allow(KEY, now=T0 + BASE_BACKOFF)
+    fail(health, FAIL_THRESHOLD - 1, now=T0 + BASE_BACKOFF)
+    assert health.allow(KEY, now=T0 + BASE_BACKOFF)  # 连续失败重新计数
+
+
+def test_state_survives_save(tmp_path):
+    health = SourceHealth(tmp_path)
+    fail(health, FAIL_THRESHOLD)
+    health.save()
+    assert not SourceHealth(tmp_path).allow(KEY, now=T0)
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+@pytest.fixture
+def respond(monkeypatch):
+    """把 requests.get 换成按给定状态码返回的假响应"""
+    status = {"code": 200}
+    monkeypatch.setattr(source_health.requests, "get", lambda url, **kw: FakeResponse(status["code"]))
+    return status
+
+
+def test_get_counts_dead_status_unless_disabled(tmp_path, respond):
+    health = SourceHealth(tmp_path)
+    respond["code"] = 404
+    for _ in range(FAIL_THRESHOLD):
+        health.get("https://example.com/articles/1", key="example.com/*", dead_status=())
+    assert health.allow("example.com/*")
+
+    for _ in range(FAIL_THRESHOLD):
+        health.get("https://api.example.com/v1")
+    with pytest.raises(CircuitOpenError):
+        health.get("https://api.example.com/v1")
+
+
+def test_get_rate_limit_keeps_endpoint_alive(tmp_path, respond):
+    health = SourceHealth(tmp_path)
+    respond["code"] = 429
+    for _ in range(FAIL_THRESHOLD + 1):
+        assert health.get("https://api.example.com/v1").status_code == 429
+    assert health.success_rate(KEY) == 1.0
+
+
+def test_endpoint_key_query_and_tag():
+    url = "https://api.github.com/search/repositories?q=stars:>1000&sort=stars"
+    assert endpoint_key(url) == "api.github.com/search/repositories"
+    assert endpoint_key(url, with_query=True) == "api.github.com/search/repositories?q=stars:>1000&sort=stars"
+    assert endpoint_key(url, tag="agents") == "api.github.com/search/repositories#agents"
+    assert endpoint_key(url, tag="agents") != endpoint_key(url, tag="trending")
+
+
+def test_order_skips_open_and_uses_explicit_keys(tmp_path):
+    health = SourceHealth(tmp_path)
+    dead, search = "https://mirror.example.com/trending", "https://api.github.com/search/repositories?q=x"
+    for _ in range(FAIL_THRESHOLD):
+        health.record("mirror.example.com/trending", False, 1.0)
+        health.record("api.github.com/search/repositories#agents", False, 1.0)
+    health.record("api.github.com/search/repositories#trending", True, 0.2)
+
+    keys = {search: endpoint_key(search, tag="trending")}
+    assert health.order([dead, search], keys) == [search]
+    assert health.order([dead, search], {search: endpoint_key(search, tag="agents")}) == []